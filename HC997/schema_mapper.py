@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+schema_mapper.py
+––––––––––––––––
+Spec-driven mapping of an extracted HC997 table (Excel sheet) onto the
+Prisma schema fields, shared by the extract_table*_for_prisma.py scripts.
+
+A spec is a plain dict:
+
+    SPEC = {
+        "excel":  "table_1_and_1a_data.xlsx",
+        "sheet":  "Table 1",
+        "output": "table1_mapped_to_schema.json",
+        "fields": {                       # schema field → (Excel column, type)
+            "rateADAmount":   ("Going rate (SW – options A and D) - Amount", "money"),
+            "eligibleForPhD": ("Eligible for PhD points (SW)?", "yes_no"),
+        },
+    }
+
+• unitGroup / groupTitle always come from the first column ("1111 Chief
+  executives …") and lead every record, followed by `fields` in order.
+• Types: money ("£88,100" → 88100.0), yes_no (→ True/False), text, int.
+  Every coercion is a whole-column operation; blanks and "Not applicable"
+  become null.
+• Records are encoded with orjson when it is installed, else json.
+• Output format follows the file suffix: .json (one indented array, the
+  default), .ndjson (one compact record per line) or .msgpack (packed
+  records back to back; needs the msgpack package).  The mapped table is
+  held in memory as a DataFrame either way – a sheet is a few hundred
+  rows – and only the dicts are built a chunk at a time.  read_records()
+  reads .ndjson / .msgpack back one record at a time.
+
+Usage
+-----
+    from schema_mapper import export, map_table, run, read_records
+    run(SPEC)                     # read → map → write, prints a summary
+    run(SPEC, fmt="ndjson")       # table1_mapped_to_schema.ndjson
+    export(map_table(df, SPEC["fields"]), SPEC)   # df already in memory
+    for rec in read_records("table1_mapped_to_schema.ndjson"): ...
+
+    python extract_table1_for_prisma.py --format ndjson
+"""
+
+from __future__ import annotations
+
+import argparse, json, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lazy_modules import lazy_import  # noqa: E402
+from workbook_cache import read_sheet  # noqa: E402
+
+pd = lazy_import("pandas")
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - only needed for .msgpack
+    msgpack = None
+
+
+NULL_TOKENS = ["Not applicable", "N/A", "n/a", "NA", ""]
+FORMATS = ("json", "ndjson", "msgpack")
+CHUNK_ROWS = 10_000
+
+
+# ------------------------------------------------------------------
+# 1. Column coercions
+# ------------------------------------------------------------------
+def money(col: pd.Series) -> pd.Series:
+    """'£1,234.5' / 1234.5 → 1234.5 (float, 2 dp); anything else → NaN."""
+    cleaned = col.astype(str).str.replace(r"[£,]", "", regex=True).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce").astype(float).round(2)
+
+
+def yes_no(col: pd.Series) -> pd.Series:
+    """'Yes' → True, other text → False, missing → None."""
+    flags = col.astype(str).str.strip().str.lower() == "yes"
+    return flags.astype(object).where(col.notna(), None)
+
+
+def text(col: pd.Series) -> pd.Series:
+    return col.astype(object).where(col.notna(), None)
+
+
+def integer(col: pd.Series) -> pd.Series:
+    return pd.to_numeric(col, errors="coerce").astype("Int64")
+
+
+COERCE = {"money": money, "yes_no": yes_no, "text": text, "int": integer}
+
+
+# ------------------------------------------------------------------
+# 2. Map
+# ------------------------------------------------------------------
+def split_code_title(col: pd.Series) -> pd.DataFrame:
+    """'1111 Chief\\nexecutives' → unitGroup 1111, groupTitle 'Chief executives'."""
+    flat = col.astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    out = flat.str.extract(r"^(?P<unitGroup>[0-9]{4})\s+(?P<groupTitle>.*)$")
+    return out.dropna()
+
+
+def map_table(df: pd.DataFrame, fields: dict) -> pd.DataFrame:
+    """Raw extracted sheet → one typed column per schema field."""
+    df = df.dropna(how="all").dropna(axis=1, how="all")
+    keys = split_code_title(df[df.columns[0]])
+    df = df.loc[keys.index].replace(NULL_TOKENS, None)
+
+    out = pd.DataFrame({
+        "unitGroup": keys["unitGroup"].astype(int),
+        "groupTitle": keys["groupTitle"].astype(object),
+    })
+    for field, (column, kind) in fields.items():
+        if column in df.columns:
+            out[field] = COERCE[kind](df[column])
+        else:
+            out[field] = None
+    return out.reset_index(drop=True)
+
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    """Plain-Python records, NaN/NA → None."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def iter_records(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """to_records() one chunk at a time: the frame is already in memory, the dicts need not all be."""
+    for start in range(0, len(df), chunk_rows):
+        yield from to_records(df.iloc[start : start + chunk_rows])
+
+
+# ------------------------------------------------------------------
+# 3. Write / read
+# ------------------------------------------------------------------
+def dumps(records: list[dict]) -> bytes:
+    """Same layout as json.dump(indent=2, ensure_ascii=False)."""
+    if orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_INDENT_2)
+    return json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _dumpline(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _need_msgpack():
+    if msgpack is None:
+        raise ImportError("❌ .msgpack 输出需要 msgpack：pip install msgpack")
+
+
+def write_records(records, path: str | Path) -> int:
+    """Write an iterable of records; format from the suffix. Returns count."""
+    path = Path(path)
+    n = 0
+    if path.suffix == ".json":
+        records = list(records)
+        path.write_bytes(dumps(records))
+        return len(records)
+    if path.suffix == ".msgpack":
+        _need_msgpack()
+        packer = msgpack.Packer()
+        with open(path, "wb") as fh:
+            for rec in records:
+                fh.write(packer.pack(rec))
+                n += 1
+        return n
+    with open(path, "wb") as fh:
+        for rec in records:
+            fh.write(_dumpline(rec))
+            n += 1
+    return n
+
+
+def read_records(path: str | Path):
+    """Records back from .ndjson / .msgpack one at a time (a .json array is read whole)."""
+    path = Path(path)
+    if path.suffix == ".json":
+        yield from json.loads(path.read_text(encoding="utf-8"))
+    elif path.suffix == ".msgpack":
+        _need_msgpack()
+        with open(path, "rb") as fh:
+            yield from msgpack.Unpacker(fh, raw=False)
+    else:
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(path, "rb") as fh:
+            for line in fh:
+                if line.strip():
+                    yield loads(line)
+
+
+def run(spec: dict, base: Path | None = None, fmt: str = "json") -> int:
+    """Read spec["excel"]/spec["sheet"], map and write spec["output"] as `fmt`."""
+    base = Path.cwd() if base is None else Path(base)
+    excel_path = base / spec["excel"]
+    if not excel_path.exists():
+        raise FileNotFoundError(f"❌ 文件不存在: {excel_path.resolve()}")
+
+    mapped = map_table(read_sheet(excel_path, spec["sheet"]), spec["fields"])
+    return export(mapped, spec, base, fmt)
+
+
+def export(mapped: pd.DataFrame, spec: dict, base: Path | None = None, fmt: str = "json") -> int:
+    """Write an already-mapped table to spec["output"] (suffix from `fmt`)."""
+    base = Path.cwd() if base is None else Path(base)
+    output_path = (base / spec["output"]).with_suffix(f".{fmt}")
+    n = write_records(iter_records(mapped), output_path)
+
+    print(f"✅ 已成功写入：{output_path.resolve()}")
+    print(f"📊 共导出 {n} 条记录，字段数：{len(mapped.columns)}")
+    return n
+
+
+def main(spec: dict, argv=None):
+    ap = argparse.ArgumentParser(description=f"{spec['sheet']} → Prisma schema records")
+    ap.add_argument("--format", choices=FORMATS, default="json",
+                    help="json: indented array (default); ndjson: one record per line; msgpack: packed records")
+    args = ap.parse_args(argv)
+    run(spec, fmt=args.format)
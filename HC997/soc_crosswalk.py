@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+soc_crosswalk.py
+––––––––––––––––
+SOC 2010 ↔ SOC 2020 crosswalk built from the "Equivalent SOC 2010
+occupation code(s)" column of every sheet in table_2_and_related_data.xlsx
+(Tables 2, 2aa, 2a, 2b and 3a, as written by extract_table2.py).
+
+• parse_equivalents() turns "1121, 1190,\\n3545" into one edge per code.
+• Crosswalk holds the edges twice, sorted by each side, as CSR arrays
+  (keys / offsets / targets), so a lookup is one searchsorted.
+• to_soc2020() / to_soc2010() translate a whole column at once: the
+  distinct codes are resolved, then broadcast back to the rows.
+• An ambiguous code (one SOC 2010 code split over several SOC 2020 unit
+  groups) comes back as NA plus its candidate count; translate_all()
+  returns every candidate with an even weight instead.
+
+Usage
+-----
+    python soc_crosswalk.py 1121 3545               # SOC 2010 → 2020
+    python soc_crosswalk.py --reverse 1150
+    python soc_crosswalk.py --file legacy.csv --column soc2010 --out legacy_soc2020.csv
+"""
+
+from __future__ import annotations
+
+import argparse, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lazy_modules import lazy_import  # noqa: E402
+from workbook_cache import read_sheets, sheet_names  # noqa: E402
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+TABLE2_XLSX = Path(__file__).resolve().parent / "table_2_and_related_data.xlsx"
+CODE_COL = "SOC 2020 occupation code"
+EQUIV_COL = "Equivalent SOC 2010 occupation code(s)"
+
+
+# ------------------------------------------------------------------
+# 1. Parse
+# ------------------------------------------------------------------
+def parse_equivalents(df: pd.DataFrame) -> pd.DataFrame:
+    """soc2020, soc2010 edges from one extracted sheet."""
+    soc2020 = df[CODE_COL].astype(str).str.extract(r"^\s*(\d{4})", expand=False)
+    edges = (
+        pd.DataFrame({"soc2020": soc2020, "soc2010": df[EQUIV_COL].astype(str).str.findall(r"\b\d{4}\b")})
+        .dropna(subset=["soc2020"])
+        .explode("soc2010")
+        .dropna()
+    )
+    return edges.astype(int)
+
+
+def load_edges(path: str | Path = TABLE2_XLSX) -> pd.DataFrame:
+    """Distinct edges across every sheet that carries the equivalence column."""
+    sheets = read_sheets(path, sheet_names(path))
+    parts = [parse_equivalents(df) for df in sheets.values() if {CODE_COL, EQUIV_COL} <= set(df.columns)]
+    return pd.concat(parts, ignore_index=True).drop_duplicates().reset_index(drop=True)
+
+
+# ------------------------------------------------------------------
+# 2. Index
+# ------------------------------------------------------------------
+class _Side:
+    """CSR view of the edges keyed by one side."""
+
+    def __init__(self, src: np.ndarray, dst: np.ndarray):
+        order = np.lexsort((dst, src))
+        src, self.targets = src[order], dst[order]
+        self.keys, starts = np.unique(src, return_index=True)
+        self.offsets = np.append(starts, len(src))
+
+    def positions(self, codes: np.ndarray) -> np.ndarray:
+        """Row of each code in `keys`, -1 if unknown."""
+        pos = np.searchsorted(self.keys, codes)
+        pos[pos >= len(self.keys)] = 0
+        return np.where(self.keys[pos] == codes, pos, -1) if len(self.keys) else np.full(len(codes), -1)
+
+    def lookup(self, code: int) -> list[int]:
+        p = self.positions(np.array([code]))[0]
+        return [] if p < 0 else self.targets[self.offsets[p] : self.offsets[p + 1]].tolist()
+
+    def translate(self, codes) -> pd.DataFrame:
+        """Per row: the single target (NA if none or ambiguous) + candidate count."""
+        codes = pd.Series(codes)
+        uniq, inverse = _factorize_codes(codes)
+        pos = self.positions(uniq)
+        n = np.where(pos >= 0, self.offsets[pos + 1] - self.offsets[pos], 0)
+        first = self.targets[self.offsets[np.maximum(pos, 0)]] if len(self.targets) else n
+        # trailing sentinel so invalid rows (inverse == -1) read "no match"
+        n, first = np.append(n, 0), np.append(first, 0)
+        out_code = pd.array(first[inverse], dtype="Int64")
+        out_code[n[inverse] != 1] = pd.NA
+        return pd.DataFrame({"code": out_code, "candidates": n[inverse]}, index=codes.index)
+
+    def translate_all(self, codes) -> pd.DataFrame:
+        """Long form: row, code, weight (1/candidates) for every candidate."""
+        codes = pd.Series(codes)
+        uniq, inverse = _factorize_codes(codes)
+        row_pos = np.append(self.positions(uniq), -1)[inverse]
+        hit = np.flatnonzero(row_pos >= 0)
+        p = row_pos[hit]
+        lo, n = self.offsets[p], self.offsets[p + 1] - self.offsets[p]
+        rows = np.repeat(hit, n)
+        within = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        return pd.DataFrame({
+            "row": codes.index.to_numpy()[rows],
+            "code": self.targets[np.repeat(lo, n) + within],
+            "weight": 1.0 / np.repeat(n, n),
+        })
+
+
+def _factorize_codes(codes: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct codes as ints (-1 where not a code) + each row's index into them."""
+    inverse, uniq = pd.factorize(codes)  # missing → -1
+    nums = pd.to_numeric(pd.Series(uniq, dtype=object).astype(str).str.strip(), errors="coerce")
+    nums = nums.where(nums == nums.round()).fillna(-1)
+    return nums.to_numpy(np.int64), inverse
+
+
+class Crosswalk:
+    """Many-to-many SOC 2010 ↔ SOC 2020, indexed both ways."""
+
+    def __init__(self, edges: pd.DataFrame):
+        self.edges = edges
+        s2010 = edges["soc2010"].to_numpy(np.int64)
+        s2020 = edges["soc2020"].to_numpy(np.int64)
+        self.forward = _Side(s2010, s2020)   # 2010 → 2020
+        self.backward = _Side(s2020, s2010)  # 2020 → 2010
+
+    @classmethod
+    def load(cls, path: str | Path = TABLE2_XLSX) -> "Crosswalk":
+        return cls(load_edges(path))
+
+    def __len__(self):
+        return len(self.edges)
+
+    def soc2020_for(self, soc2010: int) -> list[int]:
+        return self.forward.lookup(int(soc2010))
+
+    def soc2010_for(self, soc2020: int) -> list[int]:
+        return self.backward.lookup(int(soc2020))
+
+    def to_soc2020(self, codes) -> pd.DataFrame:
+        return self.forward.translate(codes).rename(columns={"code": "soc2020"})
+
+    def to_soc2010(self, codes) -> pd.DataFrame:
+        return self.backward.translate(codes).rename(columns={"code": "soc2010"})
+
+    def translate_all(self, codes, reverse: bool = False) -> pd.DataFrame:
+        side, name = (self.backward, "soc2010") if reverse else (self.forward, "soc2020")
+        return side.translate_all(codes).rename(columns={"code": name})
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SOC 2010 ↔ SOC 2020 crosswalk from the HC997 tables")
+    ap.add_argument("codes", nargs="*")
+    ap.add_argument("--reverse", action="store_true", help="SOC 2020 → SOC 2010")
+    ap.add_argument("--file", help="CSV to translate")
+    ap.add_argument("--column", default="soc2010")
+    ap.add_argument("--out")
+    ap.add_argument("--xlsx", default=str(TABLE2_XLSX))
+    args = ap.parse_args(argv)
+
+    cw = Crosswalk.load(args.xlsx)
+    if args.file:
+        df = pd.read_csv(args.file, dtype={args.column: str})
+        res = cw.to_soc2010(df[args.column]) if args.reverse else cw.to_soc2020(df[args.column])
+        out = pd.concat([df, res], axis=1)
+        out.to_csv(args.out or sys.stdout, index=False)
+        if args.out:
+            amb = int((res["candidates"] > 1).sum())
+            miss = int((res["candidates"] == 0).sum())
+            print(f"✅ {len(df):,} rows → {args.out} ({amb:,} ambiguous, {miss:,} unmatched)")
+        return
+
+    lookup = cw.soc2010_for if args.reverse else cw.soc2020_for
+    for code in args.codes:
+        print(f"{code} → {', '.join(map(str, lookup(code))) or '(none)'}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
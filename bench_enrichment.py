@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+bench_enrichment.py
+–––––––––––––––––––
+Companies House enrichment (illegal_penalties_workflow.enrich) end to end
+against ch_mock_server.py – no CH_KEY, no network.
+
+• Builds ROWS synthetic penalty rows over UNIQUE distinct employers (so
+  repeat offenders exercise ch_get's memo cache), a share of them in the
+  "Mr X trading as Y" form.
+• Starts the mock server in-process with the given latency / 429 share /
+  quota, points the workflow at it (CH_API_URL, CH_DELAY=0 unless
+  --delay) and runs enrich() with a throw-away journal.
+• Reports rows/second, requests per endpoint as the server saw them,
+  429s served and retried, the client-side cache hit rate and the share
+  of rows that got a company number.
+
+Usage
+-----
+    python bench_enrichment.py
+    python bench_enrichment.py --rows 2000 --unique 800 --latency 40 --rate-429 0.05
+    python bench_enrichment.py --quota 600 --window 300      # real API limits
+"""
+
+import argparse, random, sys, tempfile, time
+from pathlib import Path
+
+from ch_mock_server import MockCompaniesHouse
+from lazy_modules import lazy_import
+
+pd = lazy_import("pandas")
+
+FIRST = ["Ali", "Sanjay", "Wei", "Mehmet", "Ioana", "Piotr", "Chinedu", "Farhan", "Reza", "Sunil"]
+LAST = ["Khan", "Patel", "Chen", "Yilmaz", "Popescu", "Nowak", "Okafor", "Rahman", "Ahmadi", "Perera"]
+TRADE = ["Spice", "Golden", "Royal", "Express", "Star", "City", "Corner", "Village", "Crown", "Lucky"]
+KIND = ["Kitchen", "Stores", "Car Wash", "Takeaway", "Nails", "Barbers", "Supermarket", "Restaurant"]
+SUFFIX = ["Ltd", "Limited", "Ltd.", ""]
+
+
+def synthetic_penalties(rows: int, unique: int, seed: int = 1) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    parties = []
+    for i in range(unique):
+        trade = f"{rnd.choice(TRADE)} {rnd.choice(KIND)} {i} {rnd.choice(SUFFIX)}".strip()
+        if rnd.random() < 0.3:
+            trade = f"Mr {rnd.choice(FIRST)} {rnd.choice(LAST)} trading as {trade}"
+        parties.append(trade)
+    picks = parties + [rnd.choice(parties) for _ in range(rows - unique)]
+    rnd.shuffle(picks)
+    return pd.DataFrame({
+        "liable_party": picks,
+        "business_name": picks,
+        "address": [f"{i} High Street" for i in range(len(picks))],
+        "postcode": ["E1 6AN"] * len(picks),
+        "penalty_value": [float(rnd.choice([15_000, 20_000, 45_000, 60_000])) for _ in picks],
+    })
+
+
+def run(rows: int, unique: int, latency: float, jitter: float, rate_429: float,
+        quota: int, window: float, retry_after: float, delay: float) -> dict:
+    import illegal_penalties_workflow as wf
+
+    df = synthetic_penalties(rows, unique)
+    with MockCompaniesHouse(latency=latency, jitter=jitter, rate_429=rate_429, quota=quota,
+                            window=window, retry_after=retry_after) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        wf.CH_KEY, wf.CH_API_URL, wf.CH_DELAY, wf.CH_BULK_INDEX = "mock", server.url, delay, None
+        wf.ch_bulk_index.cache_clear()
+        wf.ch_session.cache_clear()
+        wf._ch_cache.clear()
+        wf.CH_STATS.clear()
+
+        t0 = time.perf_counter()
+        out = wf.enrich(df, journal_path=str(Path(tmp) / "bench.journal.jsonl"))
+        seconds = time.perf_counter() - t0
+        served = server.stats()
+
+    return {
+        "rows": len(df), "seconds": seconds, "served": served, "client": wf.ch_cache_stats(),
+        "matched": float((out["company_number"].fillna("") != "").mean()),
+    }
+
+
+def report(r: dict) -> str:
+    c, s = r["client"], r["served"]
+    per_endpoint = ", ".join(f"{k} {s.get(k, 0):,}" for k in ("search", "company", "officers"))
+    return "\n".join([
+        f"rows           {r['rows']:,} in {r['seconds']:.2f}s → {r['rows'] / r['seconds']:,.1f} rows/s",
+        f"server saw     {sum(s.get(k, 0) for k in ('search', 'company', 'officers')):,} requests ({per_endpoint})",
+        f"               {s.get('status_200', 0):,} × 200, {s.get('status_429', 0):,} × 429",
+        f"client         {c['requests']:,} HTTP calls, {c['throttled']:,} throttled + retried, {c['failed']:,} failed",
+        f"memo cache     {c['cache_hits']:,} hits / {c['cache_misses']:,} misses → {c['hit_rate']:.1%} hit rate",
+        f"matched        {r['matched']:.1%} of rows got a company number",
+    ])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Companies House enrichment benchmark against the mock server")
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--unique", type=int, default=200, help="distinct employers among the rows")
+    ap.add_argument("--latency", type=float, default=20.0, help="server ms per request")
+    ap.add_argument("--jitter", type=float, default=10.0, help="up to this many extra ms")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="share of requests refused")
+    ap.add_argument("--quota", type=int, default=0, help="requests per window (0 = unlimited)")
+    ap.add_argument("--window", type=float, default=300.0)
+    ap.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on random 429s")
+    ap.add_argument("--delay", type=float, default=0.0, help="CH_DELAY between rows (live default 0.2)")
+    args = ap.parse_args(argv)
+    if not 0 < args.unique <= args.rows:
+        ap.error("--unique must be between 1 and --rows")
+
+    r = run(args.rows, args.unique, args.latency / 1000, args.jitter / 1000, args.rate_429,
+            args.quota, args.window, args.retry_after, args.delay)
+    print(report(r))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
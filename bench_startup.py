@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py
+––––––––––––––––
+Start-up cost of the command-line paths that should do (almost) nothing:
+`--help`, a dry run, a cache hit.
+
+• Each case runs `python cli.py …` in a fresh interpreter REPEAT times;
+  the median wall time is reported against BUDGET (1 s by default).
+• One extra run per case under `python -X importtime` lists which heavy
+  libraries (HEAVY) were imported and what they cost – with lazy imports
+  (lazy_modules.py) none of them should appear for these paths.
+• The cache-hit cases are warmed first (one untimed run), so e.g.
+  soc-build is measured with its inputs unchanged.
+
+Usage
+-----
+    python bench_startup.py                # table + exit 1 if over budget
+    python bench_startup.py --repeat 10 --budget 0.5
+"""
+
+import argparse, re, statistics, subprocess, sys, time
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+HEAVY = ("pandas", "numpy", "pyarrow", "openpyxl", "pdfplumber", "bs4", "requests", "tqdm", "orjson")
+
+# label → (cli args, warm up first?)
+CASES = {
+    "cli (list)":            ([], False),
+    "pipeline --dry-run":    (["pipeline", "--dry-run"], False),
+    "soc-build (cached)":    (["soc-build"], True),
+    "hc997 --help":          (["hc997", "--help"], False),
+    "validate-rates --help": (["validate-rates", "--help"], False),
+    "crosswalk --help":      (["crosswalk", "--help"], False),
+    "soc-index --help":      (["soc-index", "--help"], False),
+    "map-table1 --help":     (["map-table1", "--help"], False),
+    "workbook-cache --help": (["workbook-cache", "--help"], False),
+    "penalty-store --help":  (["penalty-store", "--help"], False),
+    "penalty-cube --help":   (["penalty-cube", "--help"], False),
+}
+
+
+def _run(args: list, importtime: bool = False) -> subprocess.CompletedProcess:
+    flags = ["-X", "importtime"] if importtime else []
+    return subprocess.run([sys.executable, *flags, str(HERE / "cli.py"), *args],
+                          cwd=HERE, capture_output=True, text=True)
+
+
+def heavy_imports(stderr: str) -> dict:
+    """{top-level heavy package: cumulative import seconds} from -X importtime."""
+    found = {}
+    for m in re.finditer(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)\s*$", stderr, re.M):
+        name = m.group(2)
+        if name in HEAVY:
+            found[name] = int(m.group(1)) / 1e6
+    return found
+
+
+def bench(args: list, repeat: int) -> tuple[float, int]:
+    times, code = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        code = _run(args).returncode or code
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), code
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Start-up cost of --help, dry runs and cache hits")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=1.0, help="seconds allowed per case")
+    ap.add_argument("cases", nargs="*", help=f"subset of: {', '.join(CASES)}")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"])
+    baseline = time.perf_counter() - t0
+
+    print(f"{'case':<24} {'median':>8}  {'heavy imports':<40} exit")
+    over = []
+    for label, (cli_args, warm) in CASES.items():
+        if args.cases and label not in args.cases:
+            continue
+        if warm:
+            _run(cli_args)
+        median, code = bench(cli_args, args.repeat)
+        heavy = heavy_imports(_run(cli_args, importtime=True).stderr)
+        loaded = ", ".join(f"{k} {v:.2f}s" for k, v in sorted(heavy.items(), key=lambda kv: -kv[1])) or "–"
+        flag = "" if median <= args.budget else "  ⚠️ over budget"
+        print(f"{label:<24} {median:7.3f}s  {loaded:<40} {code}{flag}")
+        if flag:
+            over.append(label)
+
+    print(f"\n(bare interpreter start-up: {baseline:.3f}s; budget {args.budget:.2f}s per case)")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
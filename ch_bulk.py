@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+ch_bulk.py
+––––––––––
+Offline Companies House lookups from the free bulk snapshot
+("Free Company Data Product" → BasicCompanyDataAsOneFile-YYYY-MM-DD.zip).
+
+• build_index() streams the CSV (or the zip it ships in) into a compact
+  SQLite file: one row per company, keyed by company number, with an
+  index on a normalised name key.
+• BulkIndex resolves names, company numbers, SIC codes and status locally,
+  so the live API is only needed for officer nationalities.
+• The name key is name_matching.normalize(), so its first token doubles as
+  the blocking key for bulk fuzzy matching (rebuild older indexes).
+• The bulk file's CompanyStatus ("Active - Proposal to Strike off") is
+  mapped to the API's company_status vocabulary ("active", plus
+  company_status_detail), so callers see one set of values either way.
+
+Usage
+-----
+    python ch_bulk.py BasicCompanyDataAsOneFile-2024-10-01.zip ch_bulk.sqlite
+    export CH_BULK_INDEX=ch_bulk.sqlite
+"""
+
+import argparse, csv, io, sqlite3, sys, time, zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from name_matching import CandidateSet, normalize as name_key
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    company_number TEXT PRIMARY KEY,
+    name           TEXT NOT NULL,
+    name_key       TEXT NOT NULL,
+    status         TEXT,
+    sic_codes      TEXT,
+    postcode       TEXT
+) WITHOUT ROWID;
+"""
+NAME_KEY_INDEX = "CREATE INDEX IF NOT EXISTS companies_name_key ON companies(name_key)"
+
+SIC_COLUMNS = [f"SICCode.SicText_{i}" for i in range(1, 5)]
+BATCH_SIZE = 50_000
+
+# bulk CompanyStatus (lower-cased) → API company_status [, company_status_detail]
+STATUSES = {
+    "active": ("active", None),
+    "active - proposal to strike off": ("active", "active-proposal-to-strike-off"),
+    "live but receiver manager on at least one charge": ("active", None),
+    "dissolved": ("dissolved", None),
+    "liquidation": ("liquidation", None),
+    "in administration": ("administration", None),
+    "administration order": ("administration", None),
+    "administrative receiver": ("receivership", None),
+    "receiver manager / administrative receiver": ("receivership", None),
+    "receivership": ("receivership", None),
+    "receiver action": ("receivership", None),
+    "voluntary arrangement": ("voluntary-arrangement", None),
+    "voluntary arrangement / administrative receiver": ("voluntary-arrangement", None),
+    "voluntary arrangement / receiver manager": ("voluntary-arrangement", None),
+    "insolvency proceedings": ("insolvency-proceedings", None),
+    "converted / closed": ("converted-closed", None),
+    "converted/closed": ("converted-closed", None),
+    "open": ("open", None),
+    "closed": ("closed", None),
+    "registered": ("registered", None),
+    "removed": ("removed", None),
+}
+
+
+# ------------------------------------------------------------------
+# 1. Build the index from the bulk CSV
+# ------------------------------------------------------------------
+@contextmanager
+def _open_csv(path: Path):
+    """Yield a text stream for a .csv or the single CSV inside a .zip."""
+    if path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            member = next(n for n in zf.namelist() if n.lower().endswith(".csv"))
+            with io.TextIOWrapper(zf.open(member), encoding="utf-8", newline="") as fh:
+                yield fh
+    else:
+        with open(path, encoding="utf-8", newline="") as fh:
+            yield fh
+
+
+def api_status(status: str) -> tuple[str, str | None]:
+    """Bulk CompanyStatus → (API company_status, company_status_detail)."""
+    s = " ".join(status.split()).lower()
+    return STATUSES.get(s, (s.replace(" / ", "-").replace(" ", "-"), None))
+
+
+def _sic_code(text: str) -> str:
+    """'62020 - Information technology …' → '62020' ('None Supplied' → '')."""
+    code = text.split(" - ", 1)[0].strip()
+    return code if code.isdigit() else ""
+
+
+def iter_rows(path: Path):
+    """Yield (number, name, name_key, status, sic_codes, postcode) tuples."""
+    with _open_csv(path) as fh:
+        reader = csv.reader(fh)
+        # the published header has stray leading spaces (" CompanyNumber")
+        header = [h.strip() for h in next(reader)]
+        col = {h: i for i, h in enumerate(header)}
+        i_name, i_num = col["CompanyName"], col["CompanyNumber"]
+        i_status, i_pc = col["CompanyStatus"], col["RegAddress.PostCode"]
+        i_sic = [col[c] for c in SIC_COLUMNS if c in col]
+
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            name = row[i_name].strip()
+            sics = ";".join(c for c in (_sic_code(row[i]) for i in i_sic) if c)
+            yield (
+                row[i_num].strip(),
+                name,
+                name_key(name),
+                row[i_status].strip(),
+                sics,
+                row[i_pc].strip(),
+            )
+
+
+def build_index(csv_path: str | Path, index_path: str | Path) -> int:
+    """(Re)build the SQLite index; returns the number of companies loaded."""
+    index_path = Path(index_path)
+    tmp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp_path)
+    con.executescript(
+        "PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA
+    )
+    n, batch = 0, []
+    for rec in iter_rows(Path(csv_path)):
+        batch.append(rec)
+        if len(batch) >= BATCH_SIZE:
+            con.executemany("INSERT OR REPLACE INTO companies VALUES (?,?,?,?,?,?)", batch)
+            n += len(batch)
+            batch.clear()
+    if batch:
+        con.executemany("INSERT OR REPLACE INTO companies VALUES (?,?,?,?,?,?)", batch)
+        n += len(batch)
+    # build the secondary index once, after the bulk insert
+    con.execute(NAME_KEY_INDEX)
+    con.commit()
+    con.execute("VACUUM")
+    con.close()
+    tmp_path.replace(index_path)
+    return n
+
+
+# ------------------------------------------------------------------
+# 2. Lookups
+# ------------------------------------------------------------------
+class BulkIndex:
+    """Read-only view over an index built by build_index()."""
+
+    def __init__(self, index_path: str | Path):
+        uri = f"file:{Path(index_path).resolve()}?mode=ro&immutable=1"
+        self.con = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def by_number(self, number: str) -> dict | None:
+        row = self.con.execute(
+            "SELECT company_number, name, status, sic_codes, postcode "
+            "FROM companies WHERE company_number = ?",
+            (number.strip().upper(),),
+        ).fetchone()
+        return self._as_dict(row)
+
+    def by_name(self, name: str) -> dict | None:
+        """Exact match on the normalised name; prefers active companies."""
+        row = self.con.execute(
+            "SELECT company_number, name, status, sic_codes, postcode "
+            "FROM companies WHERE name_key = ? "
+            "ORDER BY status != 'Active', company_number LIMIT 1",
+            (name_key(name),),
+        ).fetchone()
+        return self._as_dict(row)
+
+    def candidates(self, block_keys) -> CandidateSet:
+        """All companies whose name key starts with one of `block_keys`."""
+        cands = CandidateSet()
+        for key in sorted(set(k for k in block_keys if k)):
+            # name_key is indexed, so a first-token block is a range scan
+            rows = self.con.execute(
+                "SELECT company_number, name FROM companies "
+                "WHERE name_key = ? OR (name_key >= ? AND name_key < ?)",
+                (key, key + " ", key + "!"),
+            )
+            for num, name in rows:
+                cands.add(num, name)
+        return cands
+
+    def close(self):
+        self.con.close()
+
+    @staticmethod
+    def _as_dict(row) -> dict | None:
+        if row is None:
+            return None
+        number, name, status, sics, postcode = row
+        company_status, detail = api_status(status or "")
+        out = {
+            "company_number": number,
+            "title": name,
+            "company_status": company_status,
+            "sic_codes": sics.split(";") if sics else [],
+            "postcode": postcode,
+        }
+        if detail:
+            out["company_status_detail"] = detail
+        return out
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline Companies House lookups from the free bulk snapshot")
+    ap.add_argument("csv", help="BasicCompanyData CSV or the zip it ships in")
+    ap.add_argument("index", nargs="?", default="ch_bulk.sqlite")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    n = build_index(args.csv, args.index)
+    print(f"Indexed {n:,} companies → {args.index} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+ch_mock_server.py
+–––––––––––––––––
+Local stand-in for the three Companies House API endpoints that
+illegal_penalties_workflow.ch_get() calls:
+
+    GET /search/companies?q=…&items_per_page=n
+    GET /company/{number}
+    GET /company/{number}/officers?items_per_page=n
+
+• Answers are synthetic but deterministic (hash of the query / number):
+  MATCH_SHARE of search queries have a registered company whose title is
+  the query + " LIMITED", next to a few near-miss distractors; companies
+  get SIC codes, a status and 1–4 officers with nationalities.
+• Behaviour knobs: latency (+ jitter) per request, a random share of 429
+  answers, and a quota of N requests per rolling window (the real API
+  allows 600 per 5 minutes) answered with 429 + Retry-After once used up.
+  Retry-After is whole seconds, rounded up, as the real API sends it.
+• Requests without HTTP basic auth get 401, as on the real service.
+• GET /_stats returns request counts per endpoint and status.
+
+Usage
+-----
+    python ch_mock_server.py --port 8765 --latency 40 --quota 600 --window 300
+    CH_API_URL=http://127.0.0.1:8765 CH_KEY=test python illegal_penalties_workflow.py
+
+    from ch_mock_server import MockCompaniesHouse
+    with MockCompaniesHouse(latency=0.02, rate_429=0.05) as server:
+        ... server.url, server.stats()
+"""
+
+import argparse, hashlib, json, math, random, sys, threading, time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+MATCH_SHARE = 0.8
+SIC_CODES = ["10710", "47110", "56101", "56102", "56103", "55100", "81210", "86230",
+             "45200", "96020", "49410", "43390", "47730", "88100", "62020"]
+NATIONALITIES = ["British", "Indian", "Pakistani", "Bangladeshi", "Chinese", "Turkish",
+                 "Romanian", "Polish", "Nigerian", "Sri Lankan", "Afghan", "Iranian"]
+STATUSES = ["active"] * 8 + ["dissolved", "liquidation"]
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def company_number(name: str) -> str:
+    return f"{_seed(name.upper()) % 10**8:08d}"
+
+
+# ------------------------------------------------------------------
+# 1. Synthetic data
+# ------------------------------------------------------------------
+def search(q: str, n: int) -> dict:
+    q = " ".join(q.upper().split())
+    rnd = random.Random(_seed(q))
+    items = []
+    if q and rnd.random() < MATCH_SHARE:
+        items.append({"company_number": company_number(q), "title": f"{q} LIMITED"})
+    words = q.split() or ["UNKNOWN"]
+    for i in range(rnd.randint(1, 4)):
+        other = " ".join(words[:-1] + [rnd.choice(["HOLDINGS", "SERVICES", "TRADING", "GROUP"])])
+        title = f"{other} {i + 1} LTD"
+        items.append({"company_number": company_number(title), "title": title})
+    return {"items": items[:n], "total_results": len(items), "items_per_page": n}
+
+
+def company(number: str) -> dict:
+    rnd = random.Random(_seed("company:" + number))
+    return {
+        "company_number": number,
+        "company_status": rnd.choice(STATUSES),
+        "sic_codes": rnd.sample(SIC_CODES, rnd.randint(1, 2)),
+    }
+
+
+def officers(number: str, n: int) -> dict:
+    rnd = random.Random(_seed("officers:" + number))
+    items = [{"name": f"OFFICER {i + 1}", "officer_role": "director",
+              "nationality": rnd.choice(NATIONALITIES)} for i in range(rnd.randint(1, 4))]
+    return {"items": items[:n], "total_results": len(items)}
+
+
+# ------------------------------------------------------------------
+# 2. Server
+# ------------------------------------------------------------------
+class MockCompaniesHouse:
+    """Threaded HTTP server on 127.0.0.1; port 0 picks a free one."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 rate_429: float = 0.0, quota: int = 0, window: float = 300.0,
+                 retry_after: float = 1.0, seed: int = 0):
+        self.latency, self.jitter = latency, jitter
+        self.rate_429, self.retry_after = rate_429, retry_after
+        self.quota, self.window = quota, window
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._served = deque()  # timestamps inside the quota window
+        self.counts = Counter()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    # ── throttling ──────────────────────────────────────────────────────
+    def _throttle(self) -> float | None:
+        """Retry-After seconds if this request is refused, else None."""
+        now = time.monotonic()
+        with self._lock:
+            if self.quota:
+                while self._served and now - self._served[0] >= self.window:
+                    self._served.popleft()
+                if len(self._served) >= self.quota:
+                    return max(self.window - (now - self._served[0]), 0.0)
+            if self.rate_429 and self._rnd.random() < self.rate_429:
+                return self.retry_after
+            if self.quota:
+                self._served.append(now)
+        return None
+
+    def _answer(self, path: str, query: dict):
+        n = int(query.get("items_per_page", ["20"])[0])
+        parts = path.strip("/").split("/")
+        if parts == ["search", "companies"]:
+            return "search", search(query.get("q", [""])[0], n)
+        if len(parts) == 2 and parts[0] == "company":
+            return "company", company(parts[1])
+        if len(parts) == 3 and parts[0] == "company" and parts[2] == "officers":
+            return "officers", officers(parts[1], n)
+        return "unknown", None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True  # else headers + body cost a 40 ms delayed ACK
+
+            def _send(self, status: int, body: dict, headers: dict | None = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+                if not self.path.startswith("/_stats"):
+                    with server._lock:
+                        server.counts[f"status_{status}"] += 1
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == "/_stats":
+                    return self._send(200, server.stats())
+                endpoint, body = server._answer(url.path, parse_qs(url.query))
+                with server._lock:
+                    server.counts[endpoint] += 1
+
+                if not self.headers.get("Authorization", "").startswith("Basic "):
+                    self._send(401, {"error": "Invalid Authorization"})
+                elif (wait := server._throttle()) is not None:
+                    self._send(429, {"error": "Too Many Requests"}, {"Retry-After": str(max(math.ceil(wait), 1))})
+                else:
+                    if server.latency or server.jitter:
+                        time.sleep(server.latency + server._rnd.random() * server.jitter)
+                    if body is None:
+                        self._send(404, {"errors": [{"error": "not-found"}]})
+                    else:
+                        self._send(200, body)
+
+            def log_message(self, *args):  # keep the benchmark output clean
+                pass
+
+        return Handler
+
+    # ── lifecycle ───────────────────────────────────────────────────────
+    def start(self) -> "MockCompaniesHouse":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local mock of the Companies House API endpoints the workflow calls")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="ms added to every answer")
+    ap.add_argument("--jitter", type=float, default=0.0, help="up to this many extra ms")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="share of requests refused at random")
+    ap.add_argument("--quota", type=int, default=0, help="requests per window (0 = unlimited)")
+    ap.add_argument("--window", type=float, default=300.0, help="quota window, seconds")
+    args = ap.parse_args(argv)
+
+    server = MockCompaniesHouse(args.port, args.latency / 1000, args.jitter / 1000,
+                                args.rate_429, args.quota, args.window)
+    print(f"Mock Companies House on {server.url} – CH_API_URL={server.url} CH_KEY=anything")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
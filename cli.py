@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+cli.py
+––––––
+One command for every script in the repo, without importing any of them
+until a command is chosen:
+
+    python cli.py                          # list commands (stdlib only)
+    python cli.py soc-build                # = cd soc2020 && python getdata.py
+    python cli.py validate-rates --csv v.csv
+    python cli.py pipeline --dry-run
+
+• COMMANDS maps a name to (script, directory it runs in, one-line help).
+  The chosen script runs as __main__ in that directory with the remaining
+  arguments, exactly as if it had been started by hand – its own argparse,
+  --profile switch (profiling.py) and exit code included.
+• Nothing heavy is imported here, and the scripts load pandas, numpy,
+  pdfplumber, bs4 … through lazy_modules, so `--help`, a dry run or a
+  cache hit returns before any of them is touched.  bench_startup.py
+  measures it.
+• Scripts without an argument parser (the extractors, scraper, getdata,
+  the penalties workflow) would start working on `--help`; for those the
+  help line is printed here instead.
+"""
+
+import os, runpy, sys
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+
+# name → (script, cwd, takes arguments?, help)
+COMMANDS = {
+    "pipeline":         ("pipeline.py", ".", True, "run every stale stage (stage DAG, cached by input hash)"),
+    "scrape":           ("scraper.py", "soc2020", False, "GOV.UK eligible occupations → soc2020/eligible_occupations.xlsx"),
+    "soc-build":        ("soc2020/getdata.py", "soc2020", False, "SOC 2020 workbooks → schema.prisma, seed.ts, soc2020.ndjson (--force)"),
+    "soc-index":        ("soc2020/soc_index.py", "soc2020", True, "SOC 2020 hierarchy + going-rate rollups"),
+    "soc-search":       ("soc2020/search_index.py", "soc2020", True, "BM25 / prefix search over unit-group descriptions and tasks"),
+    "occupation-db":    ("soc2020/occupation_db.py", "soc2020", True, "one indexed SQLite row per unit group: SOC + every going rate"),
+    "bulkload":         ("soc2020/bulkload.py", "soc2020", True, "load soc2020.ndjson into SQLite / Postgres"),
+    "extract-table":    ("extract_table.py", ".", False, "legacy Table 1 / Table 2 extractor"),
+    "extract-table1":   ("extract_table1.py", ".", False, "PDF → Table 1 / 1a workbook [output.xlsx]"),
+    "extract-table2":   ("extract_table2.py", ".", False, "PDF → Table 2 / 2aa / 2a / 2b / 3a workbook [output.xlsx]"),
+    "map-table1":       ("HC997/extract_table1_for_prisma.py", "HC997", True, "Table 1 workbook → schema records"),
+    "map-table2":       ("HC997/extract_table2_for_prisma.py", "HC997", True, "Table 2 workbook → schema records"),
+    "hc997":            ("hc997_pipeline.py", ".", True, "PDF → validated schema records in one process"),
+    "validate-rates":   ("rate_validator.py", ".", True, "going-rate consistency rules over every table"),
+    "rate-diff":        ("rate_diff.py", ".", True, "going-rate changes between two extracted rule versions"),
+    "crosswalk":        ("HC997/soc_crosswalk.py", "HC997", True, "SOC 2010 ↔ SOC 2020 lookups"),
+    "penalties":        ("illegal_penalties_workflow.py", ".", False, "scrape + enrich the illegal-working penalties quarter"),
+    "penalty-store":    ("penalty_store.py", ".", True, "partitioned Parquet store of penalty quarters"),
+    "penalty-cube":     ("penalty_cube.py", ".", True, "SIC × nationality × region cube"),
+    "penalty-forecast": ("penalty_forecast.py", ".", True, "scenario forecast cube"),
+    "postcode-index":   ("postcode_index.py", ".", True, "build / query the ONSPD postcode index"),
+    "ch-bulk":          ("ch_bulk.py", ".", True, "Companies House bulk snapshot index"),
+    "ch-mock":          ("ch_mock_server.py", ".", True, "local mock of the Companies House API (latency, 429, quota)"),
+    "bench-enrichment": ("bench_enrichment.py", ".", True, "enrichment rows/s, requests and cache hits against ch-mock"),
+    "workbook-cache":   ("workbook_cache.py", ".", True, "warm / prune the Feather sheet cache"),
+    "export":           ("table_export.py", ".", True, "re-export a workbook's sheets as xlsx / csv / parquet"),
+    "profile":          ("profiling.py", ".", True, "print or compare profile reports"),
+    "bench-startup":    ("bench_startup.py", ".", True, "time --help / dry-run / cache-hit start-up"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: python cli.py COMMAND [args …]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_}" for name, (_, _, _, help_) in COMMANDS.items()]
+    lines += ["", "`python cli.py COMMAND --help` for a command's own options."]
+    return "\n".join(lines)
+
+
+def run_command(name: str, args: list) -> int:
+    script, cwd, takes_args, help_ = COMMANDS[name]
+    if not takes_args and {"-h", "--help"} & set(args):
+        print(f"{name}: {help_}\n  runs {script} in {cwd}/ (also accepts --profile)")
+        return 0
+
+    path = HERE / script
+    os.chdir(HERE / cwd)
+    sys.argv = [str(path), *args]
+    sys.path.insert(0, str(path.parent))
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"unknown command {name!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    return run_command(name, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
-import pdfplumber
-import pandas as pd
 import os
 import re
 
+from lazy_modules import lazy_import
+from profiling import run, stage
+from table_export import export
+
+# heavy imports only load when a table is actually extracted
+pdfplumber = lazy_import("pdfplumber")
+pd = lazy_import("pandas")
+
 # Define the correct absolute path for the PDF file
 pdf_path = os.path.abspath("E03394848_-_HC_997_-_Immigration_Rules_Changes__Web_Accessible_.pdf")
 
@@ -88,31 +94,38 @@ def extract_table_data(pdf_path, table_name, start_marker, end_marker, output_fi
         df = df[df['SOC 2020 occupation code'].astype(str).str.match(r"^\s*\d{4}")]
 
         output_excel_path = output_filename
-        df.to_excel(output_excel_path, index=False)
+        export({"Sheet1": df}, output_excel_path)
 
         print(f"{table_name} data has been successfully extracted and saved to {output_excel_path}")
     else:
         print(f"Could not find or extract {table_name} from the PDF.")
 
 
-# Main execution
-if not os.path.exists(pdf_path):
-    print(f"Error: The file {pdf_path} was not found.")
-else:
+def main():
+    if not os.path.exists(pdf_path):
+        print(f"Error: The file {pdf_path} was not found.")
+        return
+
     # Extract Table 1
-    extract_table_data(
-        pdf_path,
-        "Table 1",
-        "Table 1: Eligible SOC 2020 occupation codes",
-        "Table 2: Eligible SOC 2020 occupation codes for Health and Care Worker visa",
-        "table_1_data.xlsx"
-    )
+    with stage("Table 1"):
+        extract_table_data(
+            pdf_path,
+            "Table 1",
+            "Table 1: Eligible SOC 2020 occupation codes",
+            "Table 2: Eligible SOC 2020 occupation codes for Health and Care Worker visa",
+            "table_1_data.xlsx"
+        )
 
     # Extract Table 2
-    extract_table_data(
-        pdf_path,
-        "Table 2",
-        "Table 2: Eligible SOC 2020 occupation codes for Health and Care Worker visa",
-        None, # No explicit end marker found, extract until end of document
-        "table_2_data.xlsx"
-    )
+    with stage("Table 2"):
+        extract_table_data(
+            pdf_path,
+            "Table 2",
+            "Table 2: Eligible SOC 2020 occupation codes for Health and Care Worker visa",
+            None, # No explicit end marker found, extract until end of document
+            "table_2_data.xlsx"
+        )
+
+
+if __name__ == "__main__":
+    run("extract_table", main)
@@ -1,7 +1,14 @@
-import pdfplumber
-import pandas as pd
 import os
 import re
+import sys
+
+from lazy_modules import lazy_import
+from profiling import run, stage
+from table_export import export
+
+# heavy imports only load when a table is actually extracted
+pdfplumber = lazy_import("pdfplumber")
+pd = lazy_import("pandas")
 
 # Define the correct absolute path for the PDF file
 pdf_path = os.path.abspath("E03394848_-_HC_997_-_Immigration_Rules_Changes__Web_Accessible_.pdf")
@@ -165,41 +172,44 @@ def extract_table_data(pdf_path, start_page, end_page, table_name, first_row_pat
     
     return final_df
 
-def extract_table1_and_table1a(pdf_path, output_filename):
-    """Extract both Table 1 and Table 1a data and save to Excel"""
+def extract_table1_and_table1a(pdf_path, output_filename=None):
+    """Extract both Table 1 and Table 1a data (saved to Excel if output_filename is given)"""
     
     # Extract Table 1 (pages 13-40, but stop at 3556)
-    table1_df = extract_table_data(
-        pdf_path, 
-        start_page=12,  # Page 13 (0-indexed)
-        end_page=40,    # Page 40 (0-indexed, exclusive) - extended range
-        table_name="Table 1",
-        first_row_pattern=r"1111.*Chief executives",
-        last_row_pattern=r"3556.*Sales"  # Simplified pattern
-    )
+    with stage("Table 1"):
+        table1_df = extract_table_data(
+            pdf_path, 
+            start_page=12,  # Page 13 (0-indexed)
+            end_page=40,    # Page 40 (0-indexed, exclusive) - extended range
+            table_name="Table 1",
+            first_row_pattern=r"1111.*Chief executives",
+            last_row_pattern=r"3556.*Sales"  # Simplified pattern
+        )
     
     # Extract Table 1a (pages 29-70, extended to find 9249)
-    table1a_df = extract_table_data(
-        pdf_path,
-        start_page=28,  # Page 29 (0-indexed) 
-        end_page=70,    # Page 70 (0-indexed, exclusive) - extended range
-        table_name="Table 1a",
-        first_row_pattern=r"1150.*Managers.*retail.*wholesale",  # Should start with this
-        last_row_pattern=r"9249.*Elementary.*sales"
-    )
+    with stage("Table 1a"):
+        table1a_df = extract_table_data(
+            pdf_path,
+            start_page=28,  # Page 29 (0-indexed) 
+            end_page=70,    # Page 70 (0-indexed, exclusive) - extended range
+            table_name="Table 1a",
+            first_row_pattern=r"1150.*Managers.*retail.*wholesale",  # Should start with this
+            last_row_pattern=r"9249.*Elementary.*sales"
+        )
     
     # Manual adjustment for Table 1a if it doesn't start correctly
     if table1a_df.empty or not table1a_df['SOC 2020 occupation code'].iloc[0].startswith('1150'):
         print("Table 1a didn't start with 1150, trying alternative extraction...")
         # Try starting from after 3556 in the full extraction with extended range
-        all_data_df = extract_table_data(
-            pdf_path,
-            start_page=12,  # Start from beginning
-            end_page=70,    # Go to end (extended range)
-            table_name="Full data",
-            first_row_pattern=r"1111.*Chief executives", 
-            last_row_pattern=r"9249.*Elementary.*sales"
-        )
+        with stage("Full data (fallback)"):
+            all_data_df = extract_table_data(
+                pdf_path,
+                start_page=12,  # Start from beginning
+                end_page=70,    # Go to end (extended range)
+                table_name="Full data",
+                first_row_pattern=r"1111.*Chief executives", 
+                last_row_pattern=r"9249.*Elementary.*sales"
+            )
         
         if not all_data_df.empty:
             # Find where 3556 ends and split
@@ -218,39 +228,48 @@ def extract_table1_and_table1a(pdf_path, output_filename):
                 print(f"Manual split: Table 1 ends at 3556 ({len(table1_df)} rows)")
                 print(f"Manual split: Table 1a starts at 1150 ({len(table1a_df)} rows)")
     
-    # Save to Excel with multiple sheets
-    with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-        if not table1_df.empty:
-            table1_df.to_excel(writer, sheet_name='Table 1', index=False)
-            print(f"Table 1 saved with {len(table1_df)} rows")
-        else:
-            print("Table 1 is empty - not saved")
-            
-        if not table1a_df.empty:
-            table1a_df.to_excel(writer, sheet_name='Table 1a', index=False)
-            print(f"Table 1a saved with {len(table1a_df)} rows")
+    if output_filename:
+        with stage("save"):
+            save_tables({'Table 1': table1_df, 'Table 1a': table1a_df}, output_filename)
+    
+    return table1_df, table1a_df
+
+def save_tables(tables, output_filename):
+    """Save {sheet name: DataFrame} to one Excel workbook, skipping empty tables"""
+    for sheet_name, df in tables.items():
+        if not df.empty:
+            print(f"{sheet_name} saved with {len(df)} rows")
         else:
-            print("Table 1a is empty - not saved")
+            print(f"{sheet_name} is empty - not saved")
+    export({name: df for name, df in tables.items() if not df.empty}, output_filename)
     
     print(f"Data successfully saved to {output_filename}")
+
+def main(argv=None):
+    # optional output path, e.g. HC997/table_1_and_1a_data.xlsx (pipeline.py)
+    argv = sys.argv[1:] if argv is None else argv
+    output_file = argv[0] if argv else "table_1_and_1a_data.xlsx"
+    if output_file.startswith("-"):
+        print("usage: python extract_table1.py [output.xlsx]   (default table_1_and_1a_data.xlsx; --profile to profile)")
+        return
+    if not os.path.exists(pdf_path):
+        print(f"Error: The file {pdf_path} was not found.")
+        return
+
+    # Extract both tables
+    table1_df, table1a_df = extract_table1_and_table1a(pdf_path, output_file)
     
-    return table1_df, table1a_df
+    # Print summary
+    print("\n=== 提取总结 ===")
+    print(f"Table 1: {len(table1_df)} 行")
+    print(f"Table 1a: {len(table1a_df)} 行")
+    print(f"总计: {len(table1_df) + len(table1a_df)} 行")
+    
+    if not table1_df.empty:
+        print(f"Table 1 SOC代码范围: {table1_df.iloc[0, 0]} 到 {table1_df.iloc[-1, 0]}")
+    if not table1a_df.empty:
+        print(f"Table 1a SOC代码范围: {table1a_df.iloc[0, 0]} 到 {table1a_df.iloc[-1, 0]}")
 
 # Main execution
 if __name__ == "__main__":
-    if not os.path.exists(pdf_path):
-        print(f"Error: The file {pdf_path} was not found.")
-    else:
-        # Extract both tables
-        table1_df, table1a_df = extract_table1_and_table1a(pdf_path, "table_1_and_1a_data.xlsx")
-        
-        # Print summary
-        print("\n=== 提取总结 ===")
-        print(f"Table 1: {len(table1_df)} 行")
-        print(f"Table 1a: {len(table1a_df)} 行")
-        print(f"总计: {len(table1_df) + len(table1a_df)} 行")
-        
-        if not table1_df.empty:
-            print(f"Table 1 SOC代码范围: {table1_df.iloc[0, 0]} 到 {table1_df.iloc[-1, 0]}")
-        if not table1a_df.empty:
-            print(f"Table 1a SOC代码范围: {table1a_df.iloc[0, 0]} 到 {table1a_df.iloc[-1, 0]}") 
\ No newline at end of file
+    run("extract_table1", main)
@@ -1,7 +1,14 @@
-import pdfplumber
-import pandas as pd
 import os
 import re
+import sys
+
+from lazy_modules import lazy_import
+from profiling import run, stage
+from table_export import export
+
+# heavy imports only load when a table is actually extracted
+pdfplumber = lazy_import("pdfplumber")
+pd = lazy_import("pandas")
 
 # Define the correct absolute path for the PDF file
 pdf_path = os.path.abspath("E03394848_-_HC_997_-_Immigration_Rules_Changes__Web_Accessible_.pdf")
@@ -174,9 +181,9 @@ def extract_table_data(pdf_path, start_page, end_page, table_name, expected_cols
                 if full_row and full_row[0]:
                     first_clean = str(full_row[0]).strip()
                     print(f"  - First column clean: '{first_clean}'")
-                    print(f"  - Matches 4-digit pattern: {bool(re.match(r'^\d{4}', first_clean))}")
                     # Show the regex match details
                     match = re.match(r'^\d{4}', first_clean)
+                    print(f"  - Matches 4-digit pattern: {bool(match)}")
                     if match:
                         print(f"    Matched: '{match.group()}'")
                     else:
@@ -353,8 +360,9 @@ def process_other_table_data(rows, table_name, expected_cols):
     df = pd.DataFrame(processed_rows, columns=header)
     return df
 
-def extract_all_tables(pdf_path, output_filename):
-    """Extract all required tables and save to Excel with multiple sheets"""
+def extract_all_tables(pdf_path, output_filename=None):
+    """Extract all required tables; returns {sheet name: DataFrame} and, if
+    output_filename is given, also saves them to Excel with multiple sheets"""
     
     # Table definitions based on requirements
     tables_config = [
@@ -400,14 +408,13 @@ def extract_all_tables(pdf_path, output_filename):
         }
     ]
     
-    # Create Excel writer object
-    with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
+    tables = {}
+    for table_config in tables_config:
+        print(f"\n{'='*50}")
+        print(f"Extracting {table_config['name']}")
+        print(f"{'='*50}")
         
-        for table_config in tables_config:
-            print(f"\n{'='*50}")
-            print(f"Extracting {table_config['name']}")
-            print(f"{'='*50}")
-            
+        with stage(table_config["name"]):
             # Extract raw table data
             rows = extract_table_data(
                 pdf_path,
@@ -418,28 +425,30 @@ def extract_all_tables(pdf_path, output_filename):
                 table_config["first_row"],
                 table_config["last_row"]
             )
-            
+        
             if rows:
                 # Process data based on table type
                 if table_config["name"] == "Table 2":
                     df = process_table2_data(rows)
                 else:
                     df = process_other_table_data(rows, table_config["name"], table_config["expected_cols"])
-                
+            
                 if df is not None and not df.empty:
                     # Clean the data
-                    df = df.dropna(how='all')
-                    
-                    # Save to Excel sheet
-                    sheet_name = table_config["name"]
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    tables[table_config["name"]] = df.dropna(how='all')
                     print(f"{table_config['name']} extracted successfully: {len(df)} rows")
                 else:
                     print(f"No valid data found for {table_config['name']}")
             else:
                 print(f"Could not extract {table_config['name']}")
     
-    print(f"\nAll tables have been extracted and saved to {output_filename}")
+    if output_filename:
+        # Save each table to its own Excel sheet
+        with stage("save"):
+            export(tables, output_filename)
+        print(f"\nAll tables have been extracted and saved to {output_filename}")
+    
+    return tables
 
 def search_3556_in_pdf(pdf_path):
     """Search for '3556' throughout the entire PDF to find where it is located"""
@@ -481,13 +490,24 @@ def search_3556_in_pdf(pdf_path):
     
     return found_pages
 
-# Main execution
-if __name__ == "__main__":
+def main(argv=None):
+    # optional output path, e.g. HC997/table_2_and_related_data.xlsx (pipeline.py)
+    argv = sys.argv[1:] if argv is None else argv
+    output_file = argv[0] if argv else "table_2_and_related_data.xlsx"
+    if output_file.startswith("-"):
+        print("usage: python extract_table2.py [output.xlsx]   (default table_2_and_related_data.xlsx; --profile to profile)")
+        return
     if not os.path.exists(pdf_path):
         print(f"Error: The file {pdf_path} was not found.")
-    else:
-        # First, search for '3556' throughout the PDF
+        return
+
+    # First, search for '3556' throughout the PDF
+    with stage("search 3556"):
         found_pages = search_3556_in_pdf(pdf_path)
-        
-        # Extract all tables
-        extract_all_tables(pdf_path, "table_2_and_related_data.xlsx") 
\ No newline at end of file
+    
+    # Extract all tables
+    extract_all_tables(pdf_path, output_file)
+
+# Main execution
+if __name__ == "__main__":
+    run("extract_table2", main)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+hc997_pipeline.py
+–––––––––––––––––
+PDF → Prisma schema records in one process, without the Excel round-trip:
+
+    extract_table1 / extract_table2  (pdfplumber → DataFrames)
+      → HC997/schema_mapper.map_table  (the same specs as the *_for_prisma scripts)
+      → HC997/table{1,2}_mapped_to_schema.{json,ndjson,msgpack}
+
+• The extracted frames go straight into the mapper, so nothing is written
+  to and re-parsed from xlsx; money strings are parsed exactly once.
+• The extracted tables are checked with rate_validator before mapping;
+  violations are printed (--strict aborts instead of writing).
+• --excel additionally writes table_1_and_1a_data.xlsx /
+  table_2_and_related_data.xlsx as side outputs (same sheets as before),
+  for anyone who still reads the workbooks.
+• --profile (or PROFILE=1) adds a cProfile / tracemalloc report under
+  .profiles/ (profiling.py); extract / validate / map are its stages.
+
+Usage
+-----
+    python hc997_pipeline.py                       # JSON, no workbooks
+    python hc997_pipeline.py --format ndjson --excel
+"""
+
+import argparse, sys, time
+from pathlib import Path
+
+from profiling import run as profiled, stage
+
+HERE = Path(__file__).resolve().parent
+HC997_DIR = HERE / "HC997"
+sys.path.insert(0, str(HC997_DIR))
+
+from schema_mapper import FORMATS, export, map_table  # noqa: E402
+from extract_table1_for_prisma import SPEC as TABLE1_SPEC  # noqa: E402
+from extract_table2_for_prisma import SPEC as TABLE2_SPEC  # noqa: E402
+
+PDF_FILE = HERE / "E03394848_-_HC_997_-_Immigration_Rules_Changes__Web_Accessible_.pdf"
+
+
+def extract(pdf_path, excel: bool = False) -> dict:
+    """{sheet name: raw extracted DataFrame} for Tables 1, 1a, 2, 2aa, 2a, 2b, 3a."""
+    import extract_table1, extract_table2
+
+    table1_xlsx = HC997_DIR / TABLE1_SPEC["excel"] if excel else None
+    table2_xlsx = HC997_DIR / TABLE2_SPEC["excel"] if excel else None
+    table1_df, table1a_df = extract_table1.extract_table1_and_table1a(str(pdf_path), table1_xlsx)
+    tables = {"Table 1": table1_df, "Table 1a": table1a_df}
+    tables.update(extract_table2.extract_all_tables(str(pdf_path), table2_xlsx))
+    return tables
+
+
+def run(pdf_path=PDF_FILE, fmt: str = "json", excel: bool = False, out_dir=HC997_DIR,
+        strict: bool = False) -> dict:
+    """Extract, validate, map and write both schema tables; returns {output: row count}."""
+    from rate_validator import summary, validate_tables
+
+    timings = {}
+    t0 = time.perf_counter()
+    with stage("extract"):
+        tables = extract(pdf_path, excel)
+    timings["extract"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with stage("validate"):
+        violations = validate_tables(tables)
+    timings["validate"] = time.perf_counter() - t0
+    print(summary(violations))
+    if strict and not violations.empty:
+        print(violations.to_string(index=False))
+        raise SystemExit("❌ going-rate rules failed (--strict); nothing written")
+
+    counts = {}
+    t0 = time.perf_counter()
+    for spec in (TABLE1_SPEC, TABLE2_SPEC):
+        raw = tables.get(spec["sheet"])
+        if raw is None or raw.empty:
+            print(f"⚠️ {spec['sheet']} 未提取到数据，跳过 {spec['output']}")
+            continue
+        with stage(f"map {spec['sheet']}"):
+            counts[spec["output"]] = export(map_table(raw, spec["fields"]), spec, out_dir, fmt)
+    timings["map + write"] = time.perf_counter() - t0
+
+    print("⏱  " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+    return counts
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="HC997 PDF → Prisma schema records in one process")
+    ap.add_argument("--pdf", default=str(PDF_FILE))
+    ap.add_argument("--format", choices=FORMATS, default="json")
+    ap.add_argument("--excel", action="store_true", help="also write the intermediate workbooks")
+    ap.add_argument("--out-dir", default=str(HC997_DIR))
+    ap.add_argument("--strict", action="store_true", help="abort if any going-rate rule fails")
+    args = ap.parse_args(argv)
+
+    if not Path(args.pdf).exists():
+        ap.error(f"PDF not found: {args.pdf}")
+    run(args.pdf, args.format, args.excel, args.out_dir, args.strict)
+
+
+if __name__ == "__main__":
+    sys.exit(profiled("hc997_pipeline", main))
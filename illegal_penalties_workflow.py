@@ -7,25 +7,60 @@ illegal_penalties_workflow.py
 • Parses the table into a DataFrame.
 • Enriches each row with:
     – Companies-House company number
+      (offline from the bulk snapshot when CH_BULK_INDEX is set)
     – SIC (industry) codes
     – All director nationalities
+• Journals each enriched row as it goes, so an interrupted run resumes
+  where it stopped instead of repeating finished API calls.
+• API calls share one keep-alive session, are memoised per endpoint
+  (repeat employers cost nothing; ch_cache_stats() has the hit rate) and
+  back off and retry on 429.  CH_API_URL points them elsewhere, e.g. at
+  ch_mock_server.py (bench_enrichment.py drives that end to end).
+• Adds region, local authority and coordinates from the local postcode
+  index (postcode_index.py) when POSTCODE_INDEX is set.
+• Appends the quarter to the partitioned Parquet store (penalty_store.py);
+  quarters already in the store are not re-scraped (the workbook is
+  written from the stored rows instead), and the SIC ×
+  nationality × region cube (penalty_cube.py) gains the new quarter.
 • Writes the enriched data to Excel (sheet 1).
 • Generates a back-of-the-envelope forecast for 2025 Q1 & Q2
   using simple growth factors; saves that in sheet 2.
+• --profile (or PROFILE=1) writes a cProfile / tracemalloc / per-stage
+  report to .profiles/ (see profiling.py).
 
 Dependencies
 ------------
-    pip install requests beautifulsoup4 pandas openpyxl tqdm
+    pip install requests beautifulsoup4 pandas openpyxl pyarrow tqdm
 
 Environment
 -----------
     export CH_KEY="YOUR_COMPANIES_HOUSE_API_KEY"
+    export CH_API_URL="http://127.0.0.1:8765"  # optional, e.g. ch_mock_server.py
+    export CH_DELAY=0                       # optional pause between API rows (default 0.2 s)
+    export CH_BULK_INDEX="ch_bulk.sqlite"   # optional, built by ch_bulk.py
+    export POSTCODE_INDEX="postcode_index"  # optional, built by postcode_index.py
 """
 
-import os, re, time, requests, pandas as pd
-from bs4 import BeautifulSoup
+from __future__ import annotations
+
+import os, re, json, time, hashlib
+from collections import Counter
+from functools import lru_cache
 from urllib.parse import quote_plus
-from tqdm import tqdm
+
+from name_matching import CandidateSet, block_key, match_names, variants
+from penalty_forecast import forecast_cube
+from penalty_store import STORE_DIR, append_quarter, load, quarters
+from penalty_cube import refresh_cube
+from lazy_modules import lazy_import
+from profiling import run, stage
+from table_export import export
+
+# not loaded at all when the quarter is already in the store
+bs4 = lazy_import("bs4")
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+tqdm = lazy_import("tqdm")
 
 
 GOV_URL = (
@@ -33,7 +68,15 @@ GOV_URL = (
     "illegal-working-penalties-uk-report/"
     "illegal-working-civil-penalties-for-uk-employers-1-july-to-30-september-2024"
 )
+QUARTER = "2024_Q3"  # period covered by GOV_URL; the store partition key
 CH_KEY = os.getenv("CH_KEY")  # Companies House API key (free –  calls are rate-limited)
+CH_API_URL = os.getenv("CH_API_URL", "https://api.company-information.service.gov.uk").rstrip("/")
+CH_DELAY = float(os.getenv("CH_DELAY", "0.2"))  # politeness pause per API-matched row
+CH_RETRIES = 5  # attempts after a 429 before giving up on one call
+CH_BULK_INDEX = os.getenv("CH_BULK_INDEX")  # offline snapshot index (see ch_bulk.py)
+CH_SEARCH_PAGE = 10  # search hits scored per name when matching via the API
+POSTCODE_INDEX = os.getenv("POSTCODE_INDEX")  # memory-mapped ONSPD lookup
+JOURNAL_FILE = "illegal_working_Q3_2024.journal.jsonl"  # enrichment checkpoint
 
 
 # ------------------------------------------------------------------
@@ -43,7 +86,7 @@ def fetch_rows(url: str = GOV_URL) -> list[list[str]]:
     """Return every row from the HTML table."""
     r = requests.get(url, timeout=30)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = bs4.BeautifulSoup(r.text, "html.parser")
     table = soup.find("table")
     if not table:
         raise RuntimeError("No table found – GOV.UK changed the page layout?")
@@ -94,25 +137,132 @@ def parse(row: list[str]) -> dict | None:
 # ------------------------------------------------------------------
 # 3. Companies House helpers
 # ------------------------------------------------------------------
+_ch_cache: dict[str, dict | None] = {}
+CH_STATS = Counter()  # requests, throttled, cache_hits, cache_misses, failed
+
+
+class ChUnavailable(RuntimeError):
+    """The API didn't answer (5xx, 429 after every retry, network error) –
+    unlike a 404 this says nothing about the company, so don't record it."""
+
+
+@lru_cache(maxsize=None)
+def ch_session():
+    s = requests.Session()
+    s.auth = (CH_KEY, "")
+    return s
+
+
+def _retry_after(r, attempt: int) -> float:
+    """Retry-After, but never less than the exponential back-off step."""
+    backoff = min(0.5 * 2**attempt, 30.0)
+    try:
+        return max(float(r.headers.get("Retry-After", "")), backoff)
+    except ValueError:
+        return backoff
+
+
 def ch_get(endpoint: str):
+    """
+    GET CH_API_URL + endpoint → JSON, or None if it isn't there (404).
+    200 and 404 answers are memoised; 429 is retried after Retry-After
+    or the exponential back-off step, whichever is longer.  Anything else raises
+    ChUnavailable and is not cached.
+    """
     if not CH_KEY:
         return None
-    url = f"https://api.company-information.service.gov.uk{endpoint}"
-    r = requests.get(url, auth=(CH_KEY, ""), timeout=20)
-    return r.json() if r.status_code == 200 else None
+    if endpoint in _ch_cache:
+        CH_STATS["cache_hits"] += 1
+        return _ch_cache[endpoint]
+    CH_STATS["cache_misses"] += 1
+
+    for attempt in range(CH_RETRIES + 1):
+        try:
+            r = ch_session().get(CH_API_URL + endpoint, timeout=20)
+        except requests.RequestException as e:
+            CH_STATS["failed"] += 1
+            raise ChUnavailable(f"{endpoint}: {e}") from e
+        CH_STATS["requests"] += 1
+        if r.status_code != 429:
+            break
+        CH_STATS["throttled"] += 1
+        if attempt < CH_RETRIES:
+            time.sleep(_retry_after(r, attempt))
+    else:
+        CH_STATS["failed"] += 1
+        raise ChUnavailable(f"{endpoint}: still 429 after {CH_RETRIES} retries")
+
+    if r.status_code not in (200, 404):
+        CH_STATS["failed"] += 1
+        raise ChUnavailable(f"{endpoint}: HTTP {r.status_code}")
+    _ch_cache[endpoint] = result = r.json() if r.status_code == 200 else None
+    return result
+
+
+def ch_cache_stats() -> dict:
+    out = {k: CH_STATS[k] for k in ("requests", "throttled", "failed", "cache_hits", "cache_misses")}
+    looked_up = out["cache_hits"] + out["cache_misses"]
+    out["hit_rate"] = out["cache_hits"] / looked_up if looked_up else 0.0
+    return out
+
+
+@lru_cache(maxsize=None)
+def ch_bulk_index():
+    """Open the offline bulk index once, or None when CH_BULK_INDEX is unset."""
+    if not CH_BULK_INDEX or not os.path.exists(CH_BULK_INDEX):
+        return None
+    from ch_bulk import BulkIndex
+
+    return BulkIndex(CH_BULK_INDEX)
+
+
+def ch_search_candidates(name: str) -> CandidateSet:
+    """Search-API hits for every variant of `name` ("X trading as Y" → Y, X)."""
+    cands = CandidateSet(blocking=False)  # a few hits: score them all
+    for v in variants(name):
+        res = ch_get(f"/search/companies?q={quote_plus(v)}&items_per_page={CH_SEARCH_PAGE}")
+        for item in (res or {}).get("items", []):
+            cands.add(item["company_number"], item.get("title", ""))
+    return cands
+
+
+def ch_match_all(names) -> pd.DataFrame:
+    """
+    Match every liable party at once → company_number, official_title,
+    match_confidence (one row per name, same order).
+    """
+    names = list(names)
+    bulk = ch_bulk_index()
+    if bulk:
+        # one indexed range scan per distinct blocking key, then score in bulk
+        cands = bulk.candidates(block_key(v) for nm in names for v in variants(nm))
+        return match_names(names, cands)
+
+    seen: dict[str, dict] = {}
+    for nm in dict.fromkeys(names):
+        seen[nm] = match_names([nm], ch_search_candidates(nm)).iloc[0].to_dict()
+        time.sleep(CH_DELAY)  # stay polite to the API
+    return pd.DataFrame([seen[nm] for nm in names])
 
 
 def ch_match_company(name: str) -> tuple[str | None, str]:
     """Return (company_number, official_title) or (None, "")."""
-    res = ch_get(f"/search/companies?q={quote_plus(name)}&items_per_page=1")
-    if not res or not res.get("items"):
-        return None, ""
-    item = res["items"][0]
-    return item["company_number"], item.get("title", "")
+    m = ch_match_all([name]).iloc[0]
+    return (m["company_number"] or None), m["official_title"]
+
+
+# every Companies House column enrich() returns, as for a row without a match
+NO_MATCH = {
+    "company_number": "", "official_title": "", "match_confidence": 0.0,
+    "sic_codes": "", "director_nationalities": "", "status": "",
+}
 
 
 def ch_company_details(num: str) -> dict:
-    data = ch_get(f"/company/{num}") or {}
+    # SIC codes and status come from the snapshot when we have one;
+    # the API is still needed for officers
+    bulk = ch_bulk_index()
+    data = (bulk.by_number(num) if bulk else ch_get(f"/company/{num}")) or {}
     officers = ch_get(f"/company/{num}/officers?items_per_page=100") or {}
     nats = {
         o.get("nationality", "").title()
@@ -126,69 +276,165 @@ def ch_company_details(num: str) -> dict:
     }
 
 
+# ------------------------------------------------------------------
+# 3b. Checkpointed enrichment
+# ------------------------------------------------------------------
+def row_key(row: dict) -> str:
+    """Stable hash of the scraped fields, used as the journal key."""
+    raw = "\x1f".join(
+        str(row[c])
+        for c in ("liable_party", "business_name", "address", "postcode", "penalty_value")
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load_journal(path: str = JOURNAL_FILE) -> dict[str, dict]:
+    """Finished rows from earlier runs; torn or foreign lines are ignored."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and "key" in rec:
+                done[rec.pop("key")] = rec
+    return done
+
+
+def repair_journal(path: str = JOURNAL_FILE) -> None:
+    """Cut a torn last line (a run killed mid-write) so appends start clean."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as fh:
+        data = fh.read()
+        if data and not data.endswith(b"\n"):
+            fh.truncate(data.rfind(b"\n") + 1)
+
+
+def enrich(df: pd.DataFrame, journal_path: str = JOURNAL_FILE) -> pd.DataFrame:
+    """
+    Companies House columns for every row of `df` (same order), appending
+    each finished row to the journal and skipping rows already in it.
+    Rows the API couldn't answer (ChUnavailable) come back unmatched and
+    stay out of the journal, so the next run retries them.
+    """
+    done = load_journal(journal_path)
+    keys = [row_key(r) for r in df.to_dict("records")]
+    todo = [i for i, k in enumerate(keys) if k not in done]
+    if len(todo) < len(keys):
+        print(f"Resuming from {journal_path}: {len(keys) - len(todo):,} rows already enriched")
+
+    # bulk matching is local and cheap, so match all pending rows up front;
+    # API matching runs row by row so every search lands in the journal
+    names = df["liable_party"].tolist()
+    pre = ch_match_all([names[i] for i in todo]) if todo and ch_bulk_index() else None
+
+    repair_journal(journal_path)
+    failed = {}
+    with open(journal_path, "a", encoding="utf-8") as fh:
+        for j, i in enumerate(tqdm.tqdm(todo, desc="Companies House")):
+            try:
+                m = (pre.iloc[j] if pre is not None else ch_match_all([names[i]]).iloc[0]).to_dict()
+                num = m["company_number"]
+                rec = {**NO_MATCH, **m, **(ch_company_details(num) if num else {})}
+            except ChUnavailable:
+                failed[keys[i]] = dict(NO_MATCH)
+                continue
+            fh.write(json.dumps({"key": keys[i], **rec}, ensure_ascii=False) + "\n")
+            fh.flush()
+            done[keys[i]] = rec
+            if num and CH_KEY:
+                time.sleep(CH_DELAY)  # stay polite to the API
+
+    if failed:
+        print(f"⚠️ {len(failed):,} rows not enriched (Companies House unavailable) – rerun to retry them")
+    rows = [done[k] if k in done else failed[k] for k in keys]
+    return pd.DataFrame(rows, columns=list(NO_MATCH)).fillna(NO_MATCH)
+
+
 # ------------------------------------------------------------------
 # 4. Forecast (very crude)
 # ------------------------------------------------------------------
-def forecast(df: pd.DataFrame, q1_growth=0.15, q2_growth=0.25) -> pd.DataFrame:
-    base = df["penalty_value"].sum()
-    regional_share = df.groupby("postcode")["penalty_value"].sum() / base
-    records = []
-    for label, g in [("2025_Q1", q1_growth), ("2025_Q2", q2_growth)]:
-        total = base * (1 + g)
-        for pc, share in regional_share.items():
-            records.append(
-                {
-                    "period": label,
-                    "postcode": pc or "n/a",
-                    "forecast_penalty": round(total * share, 2),
-                }
-            )
-    return pd.DataFrame.from_records(records)
+FORECAST_LEVEL = "postcode"  # area | district | sector | unit | postcode (the full one)
+
+
+def forecast(
+    df: pd.DataFrame, q1_growth=0.15, q2_growth=0.25, level: str = FORECAST_LEVEL
+) -> pd.DataFrame:
+    """2025 Q1/Q2 totals split by regional share; see penalty_forecast.py for grids."""
+    scenarios = pd.DataFrame(
+        {"period": ["2025_Q1", "2025_Q2"], "factor": [1 + q1_growth, 1 + q2_growth]}
+    )
+    fc = forecast_cube(df, scenarios, level=level)
+    return fc.rename(columns={"region": "postcode"})
 
 
 # ------------------------------------------------------------------
 # 5. Main orchestration
 # ------------------------------------------------------------------
-def main():
+def ingest():
+    """Fetch, enrich and store QUARTER; the enriched frame, or None if nothing parsed."""
     print("Downloading GOV-UK page …")
-    raw_rows = fetch_rows()
-    parsed = [p for r in raw_rows if (p := parse(r))]
-    df = pd.DataFrame(parsed)
+    with stage("fetch + parse"):
+        raw_rows = fetch_rows()
+        parsed = [p for r in raw_rows if (p := parse(r))]
+        df = pd.DataFrame(parsed)
     print(f"Parsed {len(df):,} rows")
 
     if df.empty:
         print("No data parsed from GOV-UK page, cannot proceed.")
-        return
+        return None
 
     # — Companies House enrichment —
-    if CH_KEY:
-        extra = []
-        for nm in tqdm(df["liable_party"], desc="Companies House"):
-            num, official = ch_match_company(nm)
-            dets = ch_company_details(num) if num else {}
-            extra.append(
-                {
-                    "company_number": num or "",
-                    "official_title": official,
-                    **dets,
-                }
-            )
-            time.sleep(0.2)  # stay polite to the API
-        df = pd.concat([df.reset_index(drop=True), pd.DataFrame(extra)], axis=1)
+    if CH_KEY or ch_bulk_index():
+        with stage("companies house"):
+            df = pd.concat([df.reset_index(drop=True), enrich(df)], axis=1)
+        if CH_STATS["requests"]:
+            st = ch_cache_stats()
+            print(f"Companies House API: {st['requests']:,} requests, {st['hit_rate']:.0%} cache hits, "
+                  f"{st['throttled']:,} throttled, {st['failed']:,} failed")
     else:
-        print("CH_KEY not set – skipping Companies House enrichment")
+        print("CH_KEY / CH_BULK_INDEX not set – skipping Companies House enrichment")
+
+    # — Postcode geography (local join, no API) —
+    if POSTCODE_INDEX and os.path.isdir(POSTCODE_INDEX):
+        from postcode_index import PostcodeIndex, geo_enrich
+
+        with stage("postcode geography"):
+            df = geo_enrich(df, PostcodeIndex(POSTCODE_INDEX))
+        print(f"Postcode index matched {df['region_code'].notna().sum():,}/{len(df):,} rows")
+
+    # — Store (append-only, one partition per quarter) —
+    with stage("store + cube"):
+        append_quarter(df, QUARTER, STORE_DIR)
+        print(f"{QUARTER} appended → {STORE_DIR}/")
+        refresh_cube(STORE_DIR)
+    return df
+
+
+def main():
+    if QUARTER in quarters(STORE_DIR):
+        # nothing new to fetch; the workbook is rebuilt from the stored quarter
+        print(f"{QUARTER} already in {STORE_DIR}/ – writing the workbook from the store")
+        with stage("load stored quarter"):
+            df = load(STORE_DIR, [QUARTER]).drop(columns="quarter")
+    elif (df := ingest()) is None:
+        return
 
     # — Forecast —
-    fc = forecast(df)
+    with stage("forecast"):
+        fc = forecast(df)
 
     # — Write Excel —
     out_file = "illegal_working_Q3_2024_enriched.xlsx"
-    with pd.ExcelWriter(out_file, engine="openpyxl") as xls:
-        df.to_excel(xls, sheet_name="2024_Q3_enriched", index=False)
-        fc.to_excel(xls, sheet_name="forecast_2025_Q1_Q2", index=False)
+    with stage("write excel"):
+        export({"2024_Q3_enriched": df, "forecast_2025_Q1_Q2": fc}, out_file)
 
     print(f"Excel written → {out_file}")
 
 
 if __name__ == "__main__":
-    main()
+    run("illegal_penalties_workflow", main)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+lazy_modules.py
+–––––––––––––––
+Import a module now, execute it on first attribute access.
+
+    pd = lazy_import("pandas")      # cheap: finds the module, runs nothing
+    ...
+    pd.DataFrame(...)               # pandas is actually imported here
+
+• The entry points import pandas / numpy / pdfplumber / bs4 / requests
+  this way, so `--help`, cache hits and other early exits don't pay
+  ~0.5 s of imports for libraries they never touch.
+• A missing package still fails at the import line (ModuleNotFoundError),
+  so `try: … except ImportError:` fallbacks keep working.
+• Modules that use the lazy name in annotations need
+  `from __future__ import annotations`, otherwise every `df: pd.DataFrame`
+  triggers the real import when the def runs.
+• Submodules ("pyarrow.feather") would import their parent to be found;
+  import those inside the function that needs them instead.
+
+bench_startup.py measures what this saves.
+"""
+
+import importlib.util, sys
+
+
+def lazy_import(name: str):
+    """`import name`, deferred until the module is first used."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+name_matching.py
+––––––––––––––––
+Bulk matching of liable-party names against Companies House names.
+
+• normalize() folds case, punctuation, honorifics and company suffixes
+  ("Ltd", "Limited", "PLC", …) so "A & B Stores Ltd." == "A and B Stores".
+• variants() splits "Mr X trading as Y Ltd" into the business ("Y") and
+  the person ("X"), business first.
+• CandidateSet holds the names we may match against, bucketed by a
+  blocking key (first normalised token), and match_names() scores the
+  whole penalty list against it in one go: every distinct variant is
+  scored against its block in one rapidfuzz cdist call per block.
+• A handful of search-API hits is better scored without blocking
+  (CandidateSet(blocking=False)): the search already narrowed them, and
+  "The X Ltd" must still find "X Ltd".
+
+Scoring uses rapidfuzz when it is installed and falls back to difflib.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from lazy_modules import lazy_import
+
+pd = lazy_import("pandas")
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # difflib fallback, same 0–100 scale
+    fuzz = process = None
+
+
+SUFFIXES = {
+    "LTD", "LIMITED", "PLC", "LLP", "LP", "CIC", "CIO", "INC", "CO",
+    "COMPANY", "CORP", "CORPORATION", "UK", "GB", "CYF", "CYFYNGEDIG",
+    "CCC", "PAC",
+}
+LEADING = {"THE", "MR", "MRS", "MS", "MISS", "DR", "SIR", "MX"}
+TRADING_AS = re.compile(
+    r"\s+(?:trading\s+as|also\s+trading\s+as|t\s*/\s*as?)\s+",
+    re.I,
+)
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+MIN_CONFIDENCE = 0.85
+
+
+# ------------------------------------------------------------------
+# 1. Normalisation
+# ------------------------------------------------------------------
+def normalize(name: str) -> str:
+    """Canonical form used both for exact keys and for fuzzy scoring."""
+    s = str(name or "").upper().replace("&", " AND ")
+    s = _SPACES.sub(" ", _PUNCT.sub(" ", s)).strip()
+    tokens = s.split()
+    while tokens and tokens[0] in LEADING:
+        tokens.pop(0)
+    while len(tokens) > 1 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def variants(raw: str) -> list[str]:
+    """Candidate names for one liable party, business name first."""
+    parts = [p.strip() for p in TRADING_AS.split(str(raw or "")) if p.strip()]
+    # "Mr X trading as Y" → the company is usually Y
+    ordered = parts[1:] + parts[:1]
+    seen, out = set(), []
+    for p in ordered:
+        n = normalize(p)
+        if n and n not in seen:
+            seen.add(n)
+            out.append(n)
+    return out
+
+
+def block_key(normalized: str) -> str:
+    return normalized.split(" ", 1)[0] if normalized else ""
+
+
+# ------------------------------------------------------------------
+# 2. Scoring
+# ------------------------------------------------------------------
+def _score_block(queries: list[str], choices: list[str]) -> list[tuple[int, float]]:
+    """(best index, score 0–1) in `choices` for every query – one cdist call."""
+    if process is not None:
+        scores = process.cdist(queries, choices, scorer=fuzz.token_sort_ratio, workers=-1)
+        best = scores.argmax(axis=1)
+        return [(int(j), float(scores[i, j]) / 100) for i, j in enumerate(best)]
+    return [_difflib_best(q, choices) for q in queries]
+
+
+def _difflib_best(query: str, choices: list[str]) -> tuple[int, float]:
+    q = " ".join(sorted(query.split()))
+    best, best_i = -1.0, -1
+    for i, c in enumerate(choices):
+        sm = SequenceMatcher(None, q, " ".join(sorted(c.split())), autojunk=False)
+        if sm.real_quick_ratio() <= best or sm.quick_ratio() <= best:
+            continue
+        r = sm.ratio()
+        if r > best:
+            best, best_i = r, i
+    return best_i, max(best, 0.0)
+
+
+# ------------------------------------------------------------------
+# 3. Candidate set + bulk matcher
+# ------------------------------------------------------------------
+class CandidateSet:
+    """Company (number, name) pairs bucketed by blocking key (one bucket if not `blocking`)."""
+
+    def __init__(self, pairs=(), blocking: bool = True):
+        self.blocking = blocking
+        self.numbers: list[str] = []
+        self.names: list[str] = []
+        self.keys: list[str] = []
+        self.blocks: dict[str, list[int]] = defaultdict(list)
+        self.exact: dict[str, int] = {}
+        for num, name in pairs:
+            self.add(num, name)
+
+    def add(self, number: str, name: str):
+        key = normalize(name)
+        if not key:
+            return
+        i = len(self.numbers)
+        self.numbers.append(number)
+        self.names.append(name)
+        self.keys.append(key)
+        self.blocks[self.block_of(key)].append(i)
+        self.exact.setdefault(key, i)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def block_of(self, key: str) -> str:
+        return block_key(key) if self.blocking else ""
+
+    def best_all(self, queries) -> dict[str, tuple[int, float]]:
+        """{query: (candidate index or -1, score 0–1)}, scored block by block."""
+        out, by_block = {}, defaultdict(list)
+        for q in dict.fromkeys(queries):
+            if q in self.exact:
+                out[q] = self.exact[q], 1.0
+            elif self.blocks.get(self.block_of(q)):
+                by_block[self.block_of(q)].append(q)
+            else:
+                out[q] = -1, 0.0
+        for block, qs in by_block.items():
+            idx = self.blocks[block]
+            for q, (j, score) in zip(qs, _score_block(qs, [self.keys[i] for i in idx])):
+                out[q] = (idx[j], score) if j >= 0 else (-1, 0.0)
+        return out
+
+    def best(self, query: str) -> tuple[int, float]:
+        return self.best_all([query])[query]
+
+
+def match_names(
+    names, candidates: CandidateSet, min_confidence: float = MIN_CONFIDENCE
+) -> pd.DataFrame:
+    """
+    Match every raw name against `candidates`.
+
+    Returns one row per input (same order) with company_number,
+    official_title and match_confidence; numbers below `min_confidence`
+    are blanked but the best score is still reported.
+    """
+    names = list(names)
+    per_name = [variants(raw) for raw in names]
+    scored = candidates.best_all(v for vs in per_name for v in vs)
+    out = []
+    for vs in per_name:
+        best_i, best_s = -1, 0.0
+        for v in vs:
+            i, s = scored[v]
+            if s > best_s:
+                best_i, best_s = i, s
+        ok = best_i >= 0 and best_s >= min_confidence
+        out.append(
+            {
+                "company_number": candidates.numbers[best_i] if ok else "",
+                "official_title": candidates.names[best_i] if ok else "",
+                "match_confidence": round(best_s, 3),
+            }
+        )
+    return pd.DataFrame(out, index=range(len(names)))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+penalty_cube.py
+–––––––––––––––
+Pre-aggregated SIC section × director nationality × region × quarter cube
+over the penalty store (penalty_store.py).
+
+    penalty_store/
+      company_sic.parquet           company_number, sic_code, sic_section
+      company_nationality.parquet   company_number, nationality
+      cube/quarter=2024_Q3/part-0.parquet
+      cube/_state.json              companies.parquet hash + measures built
+
+• explode_companies() splits the ";"-joined sic_codes and
+  director_nationalities once per company into the two bridge tables.
+• refresh_cube() builds cube partitions only for quarters that lack one,
+  and rebuilds them all when companies.parquet (re-enrichment) or the
+  measures change.
+• A penalty with several SIC codes / nationalities touches several cells:
+  `penalties` and `penalty_total` count it in each of them, while
+  `penalties_allocated` and `penalty_allocated` split it evenly (1/n of
+  the penalty and of its value per cell) so they sum to the true count
+  and total.
+• Only the allocated measures add up, so slice_cube() reports
+  `penalties` / `penalty_total` at the full cube grain (every dimension
+  in --by) and just the allocated ones for coarser roll-ups.
+
+Usage
+-----
+    python penalty_cube.py refresh
+    python penalty_cube.py slice --by sic_section nationality --quarter 2024_Q3
+"""
+
+from __future__ import annotations
+
+import argparse, hashlib, json, shutil, sys
+from functools import cache
+from pathlib import Path
+
+from lazy_modules import lazy_import
+from penalty_store import STORE_DIR, load, quarters
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+DIMENSIONS = ["quarter", "sic_section", "nationality", "region"]
+MEASURES = ["penalties", "penalties_allocated", "penalty_total", "penalty_allocated"]
+ADDITIVE = ["penalties_allocated", "penalty_allocated"]  # sum correctly past the cube grain
+UNKNOWN = "Unknown"
+
+# SIC 2007 division (first two digits) → section
+_SECTIONS = [
+    ("A", 1, 3), ("B", 5, 9), ("C", 10, 33), ("D", 35, 35), ("E", 36, 39),
+    ("F", 41, 43), ("G", 45, 47), ("H", 49, 53), ("I", 55, 56), ("J", 58, 63),
+    ("K", 64, 66), ("L", 68, 68), ("M", 69, 75), ("N", 77, 82), ("O", 84, 84),
+    ("P", 85, 85), ("Q", 86, 88), ("R", 90, 93), ("S", 94, 96), ("T", 97, 98),
+    ("U", 99, 99),
+]
+
+
+@cache
+def section_of_division() -> np.ndarray:
+    """Division 0–99 → section letter (built on first use: numpy stays lazy)."""
+    out = np.full(100, UNKNOWN, dtype=object)
+    for sec, lo, hi in _SECTIONS:
+        out[lo : hi + 1] = sec
+    return out
+
+
+# ------------------------------------------------------------------
+# 1. Normalised bridge tables
+# ------------------------------------------------------------------
+def _explode(df: pd.DataFrame, col: str, out: str) -> pd.DataFrame:
+    s = df.set_index("company_number")[col].fillna("").astype(str).str.split(";")
+    long = s.explode().str.strip()
+    return long[long != ""].rename(out).reset_index().drop_duplicates()
+
+
+def sic_section(codes: pd.Series) -> pd.Series:
+    """'56101' → 'I' (vectorised)."""
+    div = pd.to_numeric(codes.str[:2], errors="coerce").fillna(-1).astype(int).to_numpy()
+    ok = (div >= 0) & (div < 100)
+    out = np.full(len(div), UNKNOWN, dtype=object)
+    out[ok] = section_of_division()[div[ok]]
+    return pd.Series(out, index=codes.index)
+
+
+def explode_companies(root: Path = STORE_DIR) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Write and return (company_sic, company_nationality)."""
+    root = Path(root)
+    path = root / "companies.parquet"
+    if not path.exists():
+        empty_sic = pd.DataFrame(columns=["company_number", "sic_code", "sic_section"])
+        return empty_sic, pd.DataFrame(columns=["company_number", "nationality"])
+
+    comp = pd.read_parquet(path, columns=["company_number", "sic_codes", "director_nationalities"])
+    sic = _explode(comp, "sic_codes", "sic_code")
+    sic["sic_section"] = sic_section(sic["sic_code"])
+    nat = _explode(comp, "director_nationalities", "nationality")
+    nat["nationality"] = nat["nationality"].str.title()
+
+    sic.to_parquet(root / "company_sic.parquet", index=False)
+    nat.to_parquet(root / "company_nationality.parquet", index=False)
+    return sic, nat
+
+
+# ------------------------------------------------------------------
+# 2. Cube
+# ------------------------------------------------------------------
+def _cube_dir(root: Path) -> Path:
+    return Path(root) / "cube"
+
+
+def build_quarter(
+    quarter: str, sic: pd.DataFrame, nat: pd.DataFrame, root: Path = STORE_DIR
+) -> pd.DataFrame:
+    """Aggregate one quarter of penalties into cube cells."""
+    pen = load(
+        root, [quarter],
+        columns=["penalty_value", "postcode", "region", "company_number"],
+        with_companies=False,
+    ).reset_index(names="penalty_id")
+
+    from penalty_forecast import postcode_level
+
+    pen["region"] = pen["region"].fillna(postcode_level(pen["postcode"], "area"))
+
+    # one (section, nationality) pair per penalty × SIC section × nationality;
+    # unmatched companies fall into the "Unknown" members
+    secs = sic[["company_number", "sic_section"]].drop_duplicates()
+    long = (
+        pen.merge(secs, on="company_number", how="left")
+        .merge(nat, on="company_number", how="left")
+        .fillna({"sic_section": UNKNOWN, "nationality": UNKNOWN})
+    )
+    fan_out = long.groupby("penalty_id")["penalty_id"].transform("size")
+    long["penalties_allocated"] = 1 / fan_out
+    long["penalty_allocated"] = long["penalty_value"] / fan_out
+
+    return (
+        long.groupby(["sic_section", "nationality", "region"], dropna=False)
+        .agg(
+            penalties=("penalty_id", "nunique"),
+            penalties_allocated=("penalties_allocated", "sum"),
+            penalty_total=("penalty_value", "sum"),
+            penalty_allocated=("penalty_allocated", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def _state(root: Path) -> dict:
+    """What the cube cells depend on besides the penalties themselves."""
+    companies = Path(root) / "companies.parquet"
+    digest = hashlib.sha256(companies.read_bytes()).hexdigest() if companies.exists() else ""
+    return {"companies": digest, "measures": MEASURES}
+
+
+def refresh_cube(root: Path = STORE_DIR, rebuild: bool = False) -> list[str]:
+    """
+    Build cube partitions for new quarters – all of them if `rebuild`, or
+    if the company table (SIC codes, nationalities) changed since.
+    """
+    root = Path(root)
+    state, state_file = _state(root), _cube_dir(root) / "_state.json"
+    if state_file.exists() and json.loads(state_file.read_text(encoding="utf-8")) != state:
+        rebuild = True
+    have = set() if rebuild else {
+        p.name.split("=", 1)[1] for p in _cube_dir(root).glob("quarter=*")
+    }
+    if have and not state_file.exists():
+        have = set()  # built before the state was recorded
+    todo = [q for q in quarters(root) if q not in have]
+    if not todo:
+        return []
+
+    sic, nat = explode_companies(root)
+    for q in todo:
+        cells = build_quarter(q, sic, nat, root)
+        part = _cube_dir(root) / f"quarter={q}"
+        tmp = part.with_name("_tmp-" + part.name)
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        cells.to_parquet(tmp / "part-0.parquet", index=False)
+        shutil.rmtree(part, ignore_errors=True)
+        tmp.rename(part)
+    state_file.write_text(json.dumps(state), encoding="utf-8")
+    return todo
+
+
+def slice_cube(
+    root: Path = STORE_DIR, by: list[str] = ("quarter",), **equals
+) -> pd.DataFrame:
+    """
+    Roll the cube up to `by`, keeping only cells matching `equals`
+    (e.g. slice_cube(by=["nationality"], quarter="2024_Q3", sic_section="I")).
+    Coarser than the cube grain only the allocated measures are summed:
+    a penalty in several cells would be counted again in `penalties` and
+    `penalty_total`.
+    """
+    filters = [(k, "=", v) for k, v in equals.items() if v is not None] or None
+    cube = pd.read_parquet(_cube_dir(root), filters=filters)
+    cube["quarter"] = cube["quarter"].astype(str)
+    cols = {m: "sum" for m in (MEASURES if set(DIMENSIONS) <= set(by) else ADDITIVE)}
+    return cube.groupby(list(by), dropna=False).agg(cols).reset_index()
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SIC section × nationality × region × quarter penalty cube")
+    ap.add_argument("command", choices=["refresh", "rebuild", "slice"])
+    ap.add_argument("--by", nargs="+", default=["quarter"], choices=DIMENSIONS)
+    for dim in DIMENSIONS:
+        ap.add_argument(f"--{dim.replace('_', '-')}", dest=dim)
+    ap.add_argument("--root", default=str(STORE_DIR))
+    args = ap.parse_args(argv)
+
+    if args.command == "slice":
+        equals = {d: getattr(args, d) for d in DIMENSIONS}
+        print(slice_cube(args.root, args.by, **equals).to_string(index=False))
+    else:
+        built = refresh_cube(args.root, rebuild=args.command == "rebuild")
+        print(f"Cube built for {', '.join(built)}" if built else "Cube up to date")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
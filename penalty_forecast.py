@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+penalty_forecast.py
+–––––––––––––––––––
+Vectorised scenario forecasting for the illegal-working penalty list.
+
+• postcode_level() cuts free-text postcodes down to area ("E"),
+  district ("E1"), sector ("E1 6") or unit ("E1 6AN") in one regex pass.
+• scenario_grid() expands growth rates × horizons (quarters ahead) into
+  one row per scenario with its compound factor.
+• Any other column already on the frame (e.g. "region" or "la_code" from
+  postcode_index.py) can be used as the aggregation level directly.
+• forecast_cube() broadcasts factors × regional shares, so thousands of
+  scenarios cost one array multiply instead of nested Python loops.
+
+Usage
+-----
+    python penalty_forecast.py illegal_working_Q3_2024_enriched.xlsx \
+        --growth 0:0.5:0.01 --horizons 1-8 --level sector --out cube.parquet
+"""
+
+from __future__ import annotations
+
+import argparse, sys
+from pathlib import Path
+
+from lazy_modules import lazy_import
+from table_export import FORMATS, export
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+LEVELS = ("area", "district", "sector", "unit", "postcode")
+
+# outward = area + district, inward = sector digit + unit letters
+_POSTCODE = r"^(?P<area>[A-Z]{1,2})(?P<district>\d[A-Z\d]?)(?P<inward>\d[A-Z]{2})?$"
+
+
+# ------------------------------------------------------------------
+# 1. Postcode granularity
+# ------------------------------------------------------------------
+def postcode_level(postcodes: pd.Series, level: str = "district") -> pd.Series:
+    """Vectorised postcode → area / district / sector / unit ("n/a" if unparseable)."""
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}, got {level!r}")
+    raw = postcodes.fillna("").astype(str)
+    if level == "postcode":
+        return raw.str.strip().replace("", "n/a")
+
+    compact = raw.str.upper().str.replace(r"[^A-Z0-9]", "", regex=True)
+    parts = compact.str.extract(_POSTCODE)
+    district = parts["area"] + parts["district"]
+    if level == "area":
+        out = parts["area"]
+    elif level == "district":
+        out = district
+    elif level == "sector":
+        out = district + " " + parts["inward"].str[0]
+    else:
+        out = district + " " + parts["inward"]
+    return out.fillna("n/a")
+
+
+def regional_shares(
+    df: pd.DataFrame, level: str = "district", value_col: str = "penalty_value"
+) -> pd.Series:
+    """Share of the total penalty value per region at `level`."""
+    values = df[value_col].to_numpy(dtype=float)
+    if level not in LEVELS and level in df.columns:
+        region = df[level].fillna("n/a").astype(str)
+    else:
+        region = postcode_level(df["postcode"], level)
+    sums = pd.Series(values).groupby(region.to_numpy(), sort=True).sum()
+    return sums / np.nansum(values)
+
+
+# ------------------------------------------------------------------
+# 2. Scenarios
+# ------------------------------------------------------------------
+def quarter_label(base: str, ahead: np.ndarray) -> np.ndarray:
+    """'2024_Q3' + [1, 2] → ['2024_Q4', '2025_Q1']."""
+    year, q = int(base[:4]), int(base[-1])
+    idx = year * 4 + (q - 1) + np.asarray(ahead)
+    return np.char.add(
+        np.char.add((idx // 4).astype(str), "_Q"), (idx % 4 + 1).astype(str)
+    )
+
+
+def scenario_grid(growth, horizons, base_period: str = "2024_Q3") -> pd.DataFrame:
+    """
+    Cartesian product of quarterly growth rates and horizons.
+
+    factor = (1 + growth) ** horizon, i.e. growth compounds per quarter.
+    """
+    g = np.asarray(growth, dtype=float)
+    h = np.asarray(horizons, dtype=int)
+    gg, hh = np.meshgrid(g, h, indexing="ij")
+    gg, hh = gg.ravel(), hh.ravel()
+    return pd.DataFrame(
+        {
+            "growth": gg,
+            "horizon": hh,
+            "period": quarter_label(base_period, hh),
+            "factor": (1 + gg) ** hh,
+        }
+    )
+
+
+# ------------------------------------------------------------------
+# 3. Cube
+# ------------------------------------------------------------------
+def forecast_cube(
+    df: pd.DataFrame,
+    scenarios: pd.DataFrame,
+    level: str = "district",
+    value_col: str = "penalty_value",
+) -> pd.DataFrame:
+    """
+    Long-format cube: every column of `scenarios` (which must carry a
+    `factor`) × every region, with forecast_penalty = base × factor × share.
+    """
+    shares = regional_shares(df, level, value_col)
+    base = float(df[value_col].sum())
+    factor = scenarios["factor"].to_numpy(dtype=float)
+
+    values = np.round(base * np.outer(factor, shares.to_numpy()), 2).ravel()
+    n_reg = len(shares)
+    out = scenarios.drop(columns="factor").iloc[np.repeat(np.arange(len(scenarios)), n_reg)]
+    out = out.reset_index(drop=True)
+    out["region"] = np.tile(shares.index.to_numpy(), len(scenarios))
+    out["forecast_penalty"] = values
+    return out
+
+
+def write_cube(cube: pd.DataFrame, path: str | Path, fmt: str | None = None) -> Path:
+    """Write the cube as xlsx, parquet, feather or csv (picked from the suffix)."""
+    path = Path(path)
+    fmt = (fmt or path.suffix.lstrip(".")).lower()
+    if fmt == "feather":
+        cube.to_feather(path)
+    elif fmt in FORMATS:
+        path = export({"forecast": cube}, path, formats=[fmt])[0]
+    else:
+        raise ValueError(f"Unknown output format {fmt!r}")
+    return path
+
+
+# ------------------------------------------------------------------
+# 4. CLI
+# ------------------------------------------------------------------
+def _range(spec: str, cast=float) -> np.ndarray:
+    """'0:0.5:0.01' → arange (stop inclusive), '1-8' → 1..8, '0.1,-0.05' → list."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        return np.arange(start, stop + step / 2, step).astype(cast)
+    if "," not in spec and "-" in spec[1:]:
+        lo, hi = spec.split("-")
+        return np.arange(int(lo), int(hi) + 1).astype(cast)
+    return np.array([cast(x) for x in spec.split(",")])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scenario forecasts for the illegal-working penalty list")
+    ap.add_argument("enriched", help="workflow Excel output (first sheet is read)")
+    ap.add_argument("--growth", default="0.15,0.25", help="quarterly growth rates")
+    ap.add_argument("--horizons", default="1-2", help="quarters ahead")
+    ap.add_argument("--level", default="district", help=f"{'|'.join(LEVELS)} or a column")
+    ap.add_argument("--base-period", default="2024_Q3")
+    ap.add_argument("--out", default="forecast_cube.parquet")
+    args = ap.parse_args(argv)
+
+    df = pd.read_excel(args.enriched, sheet_name=0)
+    grid = scenario_grid(
+        _range(args.growth), _range(args.horizons, int), args.base_period
+    )
+    cube = forecast_cube(df, grid, args.level)
+    out = write_cube(cube, args.out)
+    print(f"{len(grid):,} scenarios × {cube['region'].nunique():,} regions "
+          f"= {len(cube):,} rows → {out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
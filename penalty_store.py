@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+penalty_store.py
+––––––––––––––––
+Append-only, quarter-partitioned Parquet store for the penalty lists.
+
+    penalty_store/
+      penalties/quarter=2024_Q3/part-0.parquet   one row per penalty
+      companies.parquet                          one row per company number
+
+• append_quarter() writes a quarter once; re-running it is a no-op.
+• Companies House columns (title, SIC codes, nationalities, status) are
+  split off and kept once per company number, latest quarter wins.
+• load() / trend() read only the partitions and columns they need.
+• Every partition is written with the same Arrow schema (PENALTY_TYPES),
+  so quarters stored with and without POSTCODE_INDEX – geo columns all
+  empty in the latter – still read as one dataset.
+
+Usage
+-----
+    python penalty_store.py trend
+    python penalty_store.py trend --by region
+"""
+
+from __future__ import annotations
+
+import argparse, shutil, sys
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+pa = lazy_import("pyarrow")
+pd = lazy_import("pandas")
+
+
+STORE_DIR = Path("penalty_store")
+
+PENALTY_COLUMNS = [
+    "liable_party", "business_name", "address", "postcode", "penalty_value",
+    "company_number", "match_confidence",
+    "region_code", "region", "la_code", "lat", "lon",  # from postcode_index.py
+]
+# pinned per column: an all-empty column would otherwise be stored as double
+PENALTY_TYPES = {
+    "liable_party": "string", "business_name": "string", "address": "string",
+    "postcode": "string", "penalty_value": "float64",
+    "company_number": "string", "match_confidence": "float64",
+    "region_code": "string", "region": "string", "la_code": "string",
+    "lat": "float32", "lon": "float32",
+}
+COMPANY_COLUMNS = [
+    "company_number", "official_title", "sic_codes",
+    "director_nationalities", "status",
+]
+
+
+# ------------------------------------------------------------------
+# 1. Layout helpers
+# ------------------------------------------------------------------
+def _penalties_dir(root: Path) -> Path:
+    return Path(root) / "penalties"
+
+
+def _partition(root: Path, quarter: str) -> Path:
+    return _penalties_dir(root) / f"quarter={quarter}"
+
+
+def penalty_schema(columns=PENALTY_COLUMNS, quarter: bool = False) -> pa.Schema:
+    """The Arrow schema of a partition (plus the `quarter` partition key)."""
+    arrow = {"string": pa.string(), "float64": pa.float64(), "float32": pa.float32()}
+    fields = [pa.field(c, arrow[PENALTY_TYPES[c]]) for c in columns]
+    return pa.schema(fields + ([pa.field("quarter", pa.string())] if quarter else []))
+
+
+def quarters(root: Path = STORE_DIR) -> list[str]:
+    """Quarters already in the store, oldest first."""
+    d = _penalties_dir(root)
+    if not d.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in d.glob("quarter=*") if p.is_dir())
+
+
+# ------------------------------------------------------------------
+# 2. Ingestion
+# ------------------------------------------------------------------
+def append_quarter(
+    df: pd.DataFrame, quarter: str, root: Path = STORE_DIR, overwrite: bool = False
+) -> bool:
+    """
+    Add one quarter of (optionally enriched) penalties.
+
+    Returns False, writing nothing, if the quarter is already stored.
+    """
+    root = Path(root)
+    part = _partition(root, quarter)
+    if part.exists() and not overwrite:
+        return False
+
+    penalties = df.reindex(columns=PENALTY_COLUMNS)
+    penalties["company_number"] = penalties["company_number"].fillna("").astype(str)
+    penalties = penalties.astype(PENALTY_TYPES)
+
+    # write next to the final location, then swap in, so readers never
+    # see a half-written partition
+    tmp = part.with_name("_tmp-" + part.name)  # "_" prefix: ignored by readers
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    penalties.to_parquet(tmp / "part-0.parquet", index=False, schema=penalty_schema())
+    if part.exists():
+        shutil.rmtree(part)
+    tmp.rename(part)
+
+    if "company_number" in df.columns:
+        _upsert_companies(root, df, quarter)
+    return True
+
+
+def _upsert_companies(root: Path, df: pd.DataFrame, quarter: str):
+    new = (
+        df.reindex(columns=COMPANY_COLUMNS)
+        .loc[lambda d: d["company_number"].fillna("").astype(str) != ""]
+        .assign(last_seen=quarter)
+    )
+    path = Path(root) / "companies.parquet"
+    if path.exists():
+        new = pd.concat([pd.read_parquet(path), new], ignore_index=True)
+    new = (
+        new.sort_values("last_seen", kind="stable")
+        .drop_duplicates("company_number", keep="last")
+        .sort_values("company_number")
+    )
+    tmp = path.with_suffix(".parquet.tmp")
+    new.to_parquet(tmp, index=False)
+    tmp.replace(path)
+
+
+# ------------------------------------------------------------------
+# 3. Queries
+# ------------------------------------------------------------------
+def load(
+    root: Path = STORE_DIR,
+    quarters_: list[str] | None = None,
+    columns: list[str] | None = None,
+    with_companies: bool = True,
+) -> pd.DataFrame:
+    """Penalties (with a `quarter` column) joined to the company table."""
+    root = Path(root)
+    filters = [("quarter", "in", list(quarters_))] if quarters_ else None
+    wanted = None if columns is None else set(columns) | {"quarter", "company_number"}
+    cols = None if wanted is None else [c for c in PENALTY_COLUMNS + ["quarter"] if c in wanted]
+    # the explicit schema also casts partitions written before it was pinned
+    schema = penalty_schema(PENALTY_COLUMNS, quarter=True)
+    if quarters(root):
+        df = pd.read_parquet(_penalties_dir(root), columns=cols, filters=filters, schema=schema)
+    else:  # fresh store: no partitions, same columns
+        df = schema.empty_table().to_pandas()
+        df = df if cols is None else df[cols]
+    df["quarter"] = df["quarter"].astype(str)
+
+    companies = root / "companies.parquet"
+    if with_companies and companies.exists():
+        comp = pd.read_parquet(companies).drop(columns="last_seen")
+        if wanted is not None:
+            comp = comp[[c for c in comp.columns if c in wanted]]
+        df = df.merge(comp, on="company_number", how="left")
+    elif with_companies:  # nothing enriched yet: same columns, all missing
+        extra = [c for c in COMPANY_COLUMNS[1:] if wanted is None or c in wanted]
+        df = df.reindex(columns=[*df.columns, *extra])
+    return df
+
+
+def trend(root: Path = STORE_DIR, by: str | None = None) -> pd.DataFrame:
+    """Penalty count / total / mean per quarter (optionally × `by`)."""
+    cols = ["penalty_value", "postcode", "region"] if by in (None, "region") else ["penalty_value", by]
+    df = load(root, columns=cols, with_companies=by not in (None, "region", "postcode"))
+    keys = ["quarter"]
+    if by == "region":
+        # ONS region from the postcode index, postcode area where missing
+        from penalty_forecast import postcode_level
+
+        df["region"] = df["region"].fillna(postcode_level(df["postcode"], "area"))
+        keys.append("region")
+    elif by:
+        keys.append(by)
+    return (
+        df.groupby(keys, dropna=False)["penalty_value"]
+        .agg(penalties="count", total="sum", mean="mean")
+        .reset_index()
+    )
+
+
+# ------------------------------------------------------------------
+# 4. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Quarter-partitioned Parquet store for the penalty lists")
+    ap.add_argument("command", choices=["quarters", "trend"])
+    ap.add_argument("--by", default=None, help="extra grouping column, or 'region'")
+    ap.add_argument("--root", default=str(STORE_DIR))
+    args = ap.parse_args(argv)
+
+    if args.command == "quarters":
+        print("\n".join(quarters(args.root)) or "(empty store)")
+    else:
+        print(trend(args.root, args.by).to_string(index=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
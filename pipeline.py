@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+–––––––––––
+The hand-run scripts as one stage graph:
+
+    scrape ─────────────► soc_build ───► search_index   (soc2020/)
+    extract_table1 ─┬───► map_table1               (HC997/)
+    extract_table2 ─┼───► map_table2
+                    └───► validate_rates
+    soc_build + extract_table1/2 ► occupation_db (soc2020/)
+    penalties
+
+• Each stage is a script run as a subprocess, declared with the data
+  files it reads and the files it writes.  The code it runs is found by
+  walking the script's imports: the script and every repo module it
+  imports, directly or not, count as inputs too.  A stage depends on
+  whichever stages write its inputs – no order is hard-coded.
+• The stages that reach the network (scrape, penalties) run only when
+  named or with --online; otherwise their outputs are plain inputs.
+• Before a stage runs, its inputs are hashed (sha256, cached by size +
+  mtime in .pipeline/state.json).  Same hashes as its last successful run
+  and every output present → skipped.
+• Stages whose dependencies are done start at once, on a thread each
+  (the work happens in the child processes), so the scrape, the two PDF
+  extractions and the penalties workflow overlap.
+• Stage output goes to .pipeline/logs/<stage>.log; a failure prints the
+  tail of its log and blocks everything downstream of it.
+• Ends with a per-stage timing report.
+
+Usage
+-----
+    python pipeline.py                       # everything offline that's stale
+    python pipeline.py --online              # … plus scrape and penalties
+    python pipeline.py map_table1 soc_build  # just these + their upstream
+    python pipeline.py --force scrape        # rerun scrape (and so soc_build)
+    python pipeline.py --force all -j 2
+    python pipeline.py --dry-run
+"""
+
+import argparse, ast, hashlib, json, os, subprocess, sys, threading, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+STATE_DIR = HERE / ".pipeline"
+STATE_FILE = STATE_DIR / "state.json"
+LOG_DIR = STATE_DIR / "logs"
+PY = sys.executable
+
+PDF = "E03394848_-_HC_997_-_Immigration_Rules_Changes__Web_Accessible_.pdf"
+SOC_XLSX = "soc2020/soc2020volume1structureanddescriptionofunitgroupsexcel16042025.xlsx"
+TABLE1_XLSX = "HC997/table_1_and_1a_data.xlsx"
+TABLE2_XLSX = "HC997/table_2_and_related_data.xlsx"
+
+# where the scripts' imports resolve (they add the repo root to sys.path)
+MODULE_DIRS = [HERE, HERE / "soc2020", HERE / "HC997"]
+
+# name → cmd (run in cwd), data inputs, outputs; all paths relative to the
+# repo root.  The code inputs are added by code_inputs().  "network" stages
+# run only when asked for (see --online).
+STAGES = {
+    "scrape": {
+        "cmd": [PY, "../scraper.py"], "cwd": "soc2020", "network": True,
+        "inputs": [],
+        "outputs": ["soc2020/eligible_occupations.xlsx"],
+    },
+    "soc_build": {
+        "cmd": [PY, "getdata.py", "--force"], "cwd": "soc2020",
+        "inputs": [SOC_XLSX, "soc2020/eligible_occupations.xlsx"],
+        "outputs": ["soc2020/schema.prisma", "soc2020/seed.ts", "soc2020/soc2020.ndjson"],
+    },
+    "search_index": {
+        "cmd": [PY, "search_index.py", "--build"], "cwd": "soc2020",
+        "inputs": ["soc2020/soc2020.ndjson"],
+        "outputs": ["soc2020/soc2020.search.npz"],
+    },
+    "occupation_db": {
+        "cmd": [PY, "occupation_db.py", "--build"], "cwd": "soc2020",
+        "inputs": ["soc2020/soc2020.ndjson", TABLE1_XLSX, TABLE2_XLSX],
+        "outputs": ["soc2020/occupations.sqlite"],
+    },
+    "extract_table1": {
+        "cmd": [PY, "extract_table1.py", TABLE1_XLSX], "cwd": ".",
+        "inputs": [PDF],
+        "outputs": [TABLE1_XLSX],
+    },
+    "extract_table2": {
+        "cmd": [PY, "extract_table2.py", TABLE2_XLSX], "cwd": ".",
+        "inputs": [PDF],
+        "outputs": [TABLE2_XLSX],
+    },
+    "map_table1": {
+        "cmd": [PY, "extract_table1_for_prisma.py"], "cwd": "HC997",
+        "inputs": [TABLE1_XLSX],
+        "outputs": ["HC997/table1_mapped_to_schema.json"],
+    },
+    "map_table2": {
+        "cmd": [PY, "extract_table2_for_prisma.py"], "cwd": "HC997",
+        "inputs": [TABLE2_XLSX],
+        "outputs": ["HC997/table2_mapped_to_schema.json"],
+    },
+    "validate_rates": {
+        "cmd": [PY, "rate_validator.py", "--csv", "HC997/rate_violations.csv", "--show", "0"], "cwd": ".",
+        "inputs": [TABLE1_XLSX, TABLE2_XLSX],
+        "outputs": ["HC997/rate_violations.csv"],
+    },
+    "penalties": {
+        "cmd": [PY, "illegal_penalties_workflow.py"], "cwd": ".", "network": True,
+        "inputs": [],
+        "outputs": ["illegal_working_Q3_2024_enriched.xlsx"],
+    },
+}
+NETWORK = {name for name, st in STAGES.items() if st.get("network")}
+
+
+# ------------------------------------------------------------------
+# 0. Code inputs
+# ------------------------------------------------------------------
+def _imported_names(path: Path) -> set:
+    """Top-level module names imported anywhere in `path` (lazy imports too)."""
+    names = set()
+    for node in ast.walk(ast.parse(path.read_bytes(), str(path))):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+        elif (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "lazy_import"
+              and node.args and isinstance(node.args[0], ast.Constant)):
+            names.add(str(node.args[0].value).split(".")[0])
+    return names
+
+
+def code_inputs(stage: dict) -> list:
+    """The stage's script and every repo module it imports, transitively."""
+    script = (HERE / stage["cwd"] / stage["cmd"][1]).resolve()
+    found, todo = set(), [script]
+    while todo:
+        path = todo.pop()
+        if path in found:
+            continue
+        found.add(path)
+        for name in _imported_names(path):
+            for d in [path.parent, *MODULE_DIRS]:
+                if (d / f"{name}.py").is_file():
+                    todo.append((d / f"{name}.py").resolve())
+                    break
+    return sorted(p.relative_to(HERE).as_posix() for p in found)
+
+
+def with_code_inputs(stages: dict = STAGES) -> None:
+    """Prepend each stage's code inputs to its declared (data) inputs."""
+    for st in stages.values():
+        code = code_inputs(st)
+        st["inputs"] = code + [i for i in st["inputs"] if i not in code]
+
+
+# ------------------------------------------------------------------
+# 1. Graph
+# ------------------------------------------------------------------
+def dependencies(stages: dict = STAGES) -> dict:
+    """stage → set of stages that write one of its inputs."""
+    writer = {out: name for name, st in stages.items() for out in st["outputs"]}
+    return {name: {writer[i] for i in st["inputs"] if i in writer and writer[i] != name}
+            for name, st in stages.items()}
+
+
+def upstream(targets, deps: dict) -> set:
+    """`targets` plus everything they (transitively) depend on."""
+    todo, seen = list(targets), set()
+    while todo:
+        name = todo.pop()
+        if name not in seen:
+            seen.add(name)
+            todo.extend(deps[name])
+    return seen
+
+
+def downstream(names, deps: dict) -> set:
+    found, grew = set(names), True
+    while grew:
+        more = {n for n, d in deps.items() if d & found} - found
+        found |= more
+        grew = bool(more)
+    return found
+
+
+def topo_order(selected: set, deps: dict) -> list:
+    order, done = [], set()
+    while len(order) < len(selected):
+        ready = sorted(n for n in selected - done if deps[n] & selected <= done)
+        if not ready:
+            raise SystemExit(f"❌ dependency cycle among: {', '.join(sorted(selected - done))}")
+        order += ready
+        done.update(ready)
+    return order
+
+
+# ------------------------------------------------------------------
+# 2. State (input hashes)
+# ------------------------------------------------------------------
+class State:
+    """Last successful input hashes per stage + a (size, mtime) → sha256 memo."""
+
+    def __init__(self, path: Path = STATE_FILE):
+        self.path = path
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        self.stages = data.get("stages", {})
+        self.files = data.get("files", {})
+        self._lock = threading.Lock()
+
+    def file_hash(self, rel: str) -> str | None:
+        path = HERE / rel
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            memo = self.files.get(rel)
+        if memo and memo[:2] == stamp:
+            return memo[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        with self._lock:
+            self.files[rel] = stamp + [h.hexdigest()]
+        return h.hexdigest()
+
+    def fingerprint(self, stage: dict) -> dict:
+        return {"cmd": stage["cmd"][1:], "inputs": {i: self.file_hash(i) for i in stage["inputs"]}}
+
+    def up_to_date(self, name: str, stage: dict) -> bool:
+        if not all((HERE / out).exists() for out in stage["outputs"]):
+            return False
+        with self._lock:
+            last = self.stages.get(name)
+        return last is not None and last == self.fingerprint(stage)
+
+    def record(self, name: str, stage: dict):
+        fp = self.fingerprint(stage)
+        with self._lock:
+            self.stages[name] = fp
+            self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages, "files": self.files}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ------------------------------------------------------------------
+# 3. Run
+# ------------------------------------------------------------------
+def missing_inputs(stage: dict) -> list:
+    return [i for i in stage["inputs"] if not (HERE / i).exists()]
+
+
+def run_stage(name: str, stage: dict) -> tuple[int, float]:
+    """Run one stage's command, output → its log. Returns (exit code, seconds)."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    t0 = time.perf_counter()
+    with open(LOG_DIR / f"{name}.log", "w", encoding="utf-8") as log:
+        proc = subprocess.run(stage["cmd"], cwd=HERE / stage["cwd"], env=env,
+                              stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    return proc.returncode, time.perf_counter() - t0
+
+
+def log_tail(name: str, lines: int = 15) -> str:
+    path = LOG_DIR / f"{name}.log"
+    if not path.exists():
+        return ""
+    return "\n".join("      " + l for l in path.read_text(encoding="utf-8", errors="replace").splitlines()[-lines:])
+
+
+def execute(selected: set, deps: dict, force: set, jobs: int, state: State) -> dict:
+    """Run `selected` in dependency order, independent stages concurrently.
+    Returns {stage: (status, seconds)}."""
+    results, running = {}, {}
+    pending = set(selected)
+
+    def settle(name, status, seconds=0.0):
+        results[name] = (status, seconds)
+        print(f"  {_ICON[status]} {name:<16} {status:<8} {seconds:7.2f}s", flush=True)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in sorted(pending):
+                needs = deps[name] & selected
+                if any(results.get(d, ("",))[0] in ("failed", "blocked") for d in needs):
+                    pending.discard(name)
+                    settle(name, "blocked")
+                    continue
+                if not needs <= results.keys():
+                    continue
+                pending.discard(name)
+                stage = STAGES[name]
+                # inputs are final now, so a rebuilt-but-identical input still skips
+                if name not in force and state.up_to_date(name, stage):
+                    settle(name, "skipped")
+                elif missing := missing_inputs(stage):
+                    settle(name, "failed")
+                    print(f"      missing input: {', '.join(missing)}")
+                else:
+                    print(f"  ▶ {name:<16} {' '.join(Path(c).name if c == PY else c for c in stage['cmd'])}",
+                          flush=True)
+                    running[pool.submit(run_stage, name, stage)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                code, seconds = fut.result()
+                if code == 0:
+                    state.record(name, STAGES[name])
+                    settle(name, "ran", seconds)
+                else:
+                    settle(name, "failed", seconds)
+                    print(f"      exit {code}, see {LOG_DIR.relative_to(HERE) / (name + '.log')}:\n{log_tail(name)}")
+    return results
+
+
+_ICON = {"ran": "✅", "skipped": "⏭ ", "failed": "❌", "blocked": "⛔"}
+
+
+def report(results: dict, order: list, wall: float) -> str:
+    lines = ["", f"  {'stage':<16} {'status':<8} {'seconds':>8}", "  " + "─" * 34]
+    for name in order:
+        status, seconds = results[name]
+        lines.append(f"  {name:<16} {status:<8} {seconds:8.2f}")
+    busy = sum(s for _, s in results.values())
+    lines.append("  " + "─" * 34)
+    lines.append(f"  {'wall':<25} {wall:8.2f}   (stage time {busy:.2f}s)")
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------------------
+# 4. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the scripts as one incremental stage graph")
+    ap.add_argument("stages", nargs="*", metavar="STAGE", help=f"targets (default: all) – {', '.join(STAGES)}")
+    ap.add_argument("--force", action="append", default=[], metavar="STAGE",
+                    help="rerun STAGE even if up to date ('all' for every stage); repeatable")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 2, help="stages run at once")
+    ap.add_argument("--online", action="store_true",
+                    help=f"include the network stages ({', '.join(sorted(NETWORK))}) without naming them")
+    ap.add_argument("--dry-run", action="store_true", help="show what is stale, run nothing")
+    args = ap.parse_args(argv)
+
+    unknown = set(args.stages) | set(args.force) - {"all"}
+    if unknown - STAGES.keys():
+        ap.error(f"unknown stage(s): {', '.join(sorted(unknown - STAGES.keys()))}")
+
+    with_code_inputs()
+    deps = dependencies()
+    selected = upstream(args.stages or STAGES, deps)
+    if not args.online:
+        selected -= NETWORK - set(args.stages) - set(args.force)
+        deps = {n: d & selected for n, d in deps.items()}
+    force = selected if "all" in args.force else set(args.force) & selected
+    order = topo_order(selected, deps)
+    state = State()
+
+    if args.dry_run:
+        stale = {n for n in order if n in force or not state.up_to_date(n, STAGES[n])}
+        stale = downstream(stale, deps) & selected  # "run" = may run, pending upstream output
+        for name in order:
+            after = ", ".join(sorted(deps[name] & selected)) or "–"
+            print(f"  {'run ' if name in stale else 'skip'}  {name:<16} after: {after}")
+        return 0
+
+    t0 = time.perf_counter()
+    results = execute(selected, deps, force, max(1, args.jobs), state)
+    state.save()
+    print(report(results, order, time.perf_counter() - t0))
+    return 1 if any(s in ("failed", "blocked") for s, _ in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+postcode_index.py
+–––––––––––––––––
+Local, memory-mapped postcode → region / local authority / coordinates
+lookup, built once from the ONS Postcode Directory (ONSPD) or the
+National Statistics Postcode Lookup (NSPL) CSV.
+
+    postcode_index/
+      keys.npy        sorted compact postcodes ("E16AN"), fixed-width bytes
+      region.npy      uint8  → meta.json["regions"]
+      la.npy          uint16 → meta.json["local_authorities"]
+      lat.npy lon.npy float32
+      meta.json
+
+• build_index() streams the CSV in chunks; terminated postcodes are kept
+  (penalty addresses can be old) but live ones win on duplicates.
+• PostcodeIndex.lookup() resolves a whole column with one searchsorted
+  over the memory-mapped keys, so enrichment is a join, not an API call.
+
+Usage
+-----
+    python postcode_index.py ONSPD_AUG_2024_UK.csv postcode_index/
+    export POSTCODE_INDEX=postcode_index
+"""
+
+from __future__ import annotations
+
+import argparse, json, sys, time
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+KEY_WIDTH = 7  # longest compact postcode: "SW1A1AA"
+CHUNK_ROWS = 500_000
+
+# ONSPD/NSPL header names → ours
+SOURCE_COLUMNS = {
+    "pcds": "postcode",
+    "rgn": "region_code",
+    "oslaua": "la_code",
+    "laua": "la_code",  # NSPL spelling
+    "lat": "lat",
+    "long": "lon",
+    "doterm": "terminated",
+}
+
+REGION_NAMES = {
+    "E12000001": "North East",
+    "E12000002": "North West",
+    "E12000003": "Yorkshire and The Humber",
+    "E12000004": "East Midlands",
+    "E12000005": "West Midlands",
+    "E12000006": "East of England",
+    "E12000007": "London",
+    "E12000008": "South East",
+    "E12000009": "South West",
+    "W99999999": "Wales",
+    "S99999999": "Scotland",
+    "N99999999": "Northern Ireland",
+    "L99999999": "Channel Islands",
+    "M99999999": "Isle of Man",
+}
+
+
+def compact(postcodes: pd.Series) -> pd.Series:
+    """'e1 6an ' → 'E16AN' (vectorised)."""
+    return (
+        postcodes.fillna("").astype(str).str.upper()
+        .str.replace(r"[^A-Z0-9]", "", regex=True)
+    )
+
+
+# ------------------------------------------------------------------
+# 1. Build
+# ------------------------------------------------------------------
+def build_index(csv_path: str | Path, out_dir: str | Path) -> int:
+    """Build the index directory from an ONSPD/NSPL CSV; returns row count."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in header if c in SOURCE_COLUMNS]
+    chunks = []
+    for chunk in pd.read_csv(
+        csv_path, usecols=usecols, dtype=str, chunksize=CHUNK_ROWS, keep_default_na=False
+    ):
+        chunk = chunk.rename(columns=SOURCE_COLUMNS)
+        chunk["key"] = compact(chunk["postcode"])
+        chunk["live"] = chunk.get("terminated", pd.Series("", index=chunk.index)) == ""
+        chunks.append(chunk[["key", "region_code", "la_code", "lat", "lon", "live"]])
+    df = pd.concat(chunks, ignore_index=True)
+    df = df[df["key"].str.len().between(5, KEY_WIDTH)]
+
+    # live rows sort after terminated ones, so keep="last" prefers them
+    df = df.sort_values(["key", "live"], kind="stable").drop_duplicates("key", keep="last")
+
+    regions, region_idx = np.unique(df["region_code"].to_numpy(str), return_inverse=True)
+    las, la_idx = np.unique(df["la_code"].to_numpy(str), return_inverse=True)
+    lat = pd.to_numeric(df["lat"], errors="coerce").to_numpy(np.float32)
+    lon = pd.to_numeric(df["lon"], errors="coerce").to_numpy(np.float32)
+    # ONSPD uses 99.999999 / 0.000000 for "no grid reference"
+    no_grid = lat > 90
+    lat[no_grid] = np.nan
+    lon[no_grid] = np.nan
+
+    np.save(out_dir / "keys.npy", df["key"].to_numpy(f"S{KEY_WIDTH}"))
+    np.save(out_dir / "region.npy", region_idx.astype(np.uint8))
+    np.save(out_dir / "la.npy", la_idx.astype(np.uint16))
+    np.save(out_dir / "lat.npy", lat)
+    np.save(out_dir / "lon.npy", lon)
+    (out_dir / "meta.json").write_text(
+        json.dumps(
+            {
+                "source": Path(csv_path).name,
+                "rows": int(len(df)),
+                "regions": regions.tolist(),
+                "local_authorities": las.tolist(),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return len(df)
+
+
+# ------------------------------------------------------------------
+# 2. Lookup
+# ------------------------------------------------------------------
+class PostcodeIndex:
+    """Memory-mapped view over an index directory."""
+
+    def __init__(self, index_dir: str | Path):
+        d = Path(index_dir)
+        meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+        self.keys = np.load(d / "keys.npy", mmap_mode="r")
+        self.region = np.load(d / "region.npy", mmap_mode="r")
+        self.la = np.load(d / "la.npy", mmap_mode="r")
+        self.lat = np.load(d / "lat.npy", mmap_mode="r")
+        self.lon = np.load(d / "lon.npy", mmap_mode="r")
+        self.region_codes = np.array(meta["regions"], dtype=object)
+        self.la_codes = np.array(meta["local_authorities"], dtype=object)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def positions(self, postcodes: pd.Series) -> np.ndarray:
+        """Row of each postcode in the index, -1 where unknown."""
+        keys = compact(postcodes)
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.intp)
+        # S7 would truncate: "SW1A1AAX" must not match "SW1A1AA"
+        fits = (keys.str.len() <= KEY_WIDTH).to_numpy()
+        q = keys.to_numpy(f"S{KEY_WIDTH}")
+        pos = np.searchsorted(self.keys, q)
+        pos[pos >= len(self.keys)] = 0
+        hit = (self.keys[pos] == q) & fits
+        return np.where(hit, pos, -1)
+
+    def lookup(self, postcodes: pd.Series) -> pd.DataFrame:
+        """region_code, region, la_code, lat, lon for every postcode (NaN if unknown)."""
+        pos = self.positions(postcodes)
+        hit = pos >= 0
+        p = pos[hit]
+
+        out = pd.DataFrame(index=postcodes.index)
+        region_code = np.full(len(pos), None, dtype=object)
+        la_code = np.full(len(pos), None, dtype=object)
+        lat = np.full(len(pos), np.nan, dtype=np.float32)
+        lon = np.full(len(pos), np.nan, dtype=np.float32)
+        region_code[hit] = self.region_codes[self.region[p]]
+        la_code[hit] = self.la_codes[self.la[p]]
+        lat[hit] = self.lat[p]
+        lon[hit] = self.lon[p]
+
+        out["region_code"] = region_code
+        out["region"] = pd.Series(region_code, index=out.index).map(REGION_NAMES)
+        out["la_code"] = la_code
+        out["lat"] = lat
+        out["lon"] = lon
+        return out
+
+
+def geo_enrich(df: pd.DataFrame, index: PostcodeIndex) -> pd.DataFrame:
+    """`df` plus the lookup columns for its `postcode` column (replaced if present)."""
+    geo = index.lookup(df["postcode"])
+    return pd.concat([df.drop(columns=geo.columns, errors="ignore"), geo], axis=1)
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Memory-mapped postcode → region / local authority / coordinates index")
+    ap.add_argument("csv", help="ONSPD or NSPL CSV")
+    ap.add_argument("out_dir", nargs="?", default="postcode_index")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    n = build_index(args.csv, args.out_dir)
+    print(f"Indexed {n:,} postcodes → {args.out_dir}/ in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
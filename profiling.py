@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+profiling.py
+––––––––––––
+One profiling switch for every entry point (extractors, scraper.py,
+soc2020/getdata.py, illegal_penalties_workflow.py).
+
+• Off by default and free when off: stage() is a bare context manager and
+  nothing is imported or started.
+• Switched on by `--profile` on the command line or PROFILE in the
+  environment (which pipeline.py passes through to every stage):
+
+      PROFILE=1 / all     cpu + mem + wall
+      PROFILE=cpu,wall    any subset of cpu (cProfile), mem (tracemalloc),
+                          wall (per-stage wall time only)
+
+• Each profiled run writes to PROFILE_DIR (default .profiles/ next to
+  this file, whichever directory the script runs in):
+
+      <script>-<timestamp>-<pid>.txt    readable report
+      <script>-<timestamp>-<pid>.json   the same numbers, for compare()
+      <script>-<timestamp>-<pid>.prof   raw cProfile dump (snakeviz / pstats)
+
+  (the PID keeps parallel runs started in the same second apart)
+
+  The report has the wall time of each stage() block, the top functions
+  by cumulative and own time (so extract_tables, iterrows, ch_get … show
+  up at the top) and the lines holding the most memory at the end, plus
+  the peak.
+
+Usage
+-----
+    from profiling import run, stage
+
+    def main():
+        with stage("fetch"):
+            ...
+
+    if __name__ == "__main__":
+        run("scraper", main)
+
+    python scraper.py --profile
+    PROFILE=cpu python pipeline.py --force all
+    python profiling.py .profiles/getdata-*.json        # print / compare runs
+"""
+
+import contextlib, json, os, sys, time
+from datetime import datetime
+from pathlib import Path
+
+
+HERE = Path(__file__).resolve().parent
+MODES = ("cpu", "mem", "wall")
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", HERE / ".profiles"))
+TOP_FUNCS = 25
+TOP_LINES = 15
+
+_marks = None  # [(stage, seconds)] while a session is recording
+
+
+def modes(spec: str | None = None) -> set:
+    """'1' / 'all' / 'cpu,wall' → set of modes; empty / '0' → off."""
+    spec = os.environ.get("PROFILE", "") if spec is None else spec
+    spec = spec.strip().lower()
+    if spec in ("", "0", "off", "no", "false"):
+        return set()
+    if spec in ("1", "all", "on", "yes", "true"):
+        return set(MODES)
+    chosen = {m.strip() for m in spec.split(",")}
+    unknown = chosen - set(MODES)
+    if unknown:
+        raise ValueError(f"PROFILE: unknown mode(s) {', '.join(sorted(unknown))} – use {', '.join(MODES)}")
+    return chosen
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a block as one stage of the current session (no-op when off)."""
+    if _marks is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _marks.append((name, time.perf_counter() - t0))
+
+
+# ------------------------------------------------------------------
+# 1. Session
+# ------------------------------------------------------------------
+@contextlib.contextmanager
+def session(name: str, which: set | None = None):
+    """Profile the enclosed block and write the report files on exit."""
+    global _marks
+    which = modes() if which is None else which
+    if not which:
+        yield
+        return
+
+    profiler = None
+    if "cpu" in which:
+        import cProfile
+        profiler = cProfile.Profile()
+    if "mem" in which:
+        import tracemalloc
+        tracemalloc.start()
+
+    _marks = []
+    started = datetime.now()
+    t0 = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - t0
+        result = {
+            "script": name,
+            "started": started.isoformat(timespec="seconds"),
+            "modes": sorted(which),
+            "wall": round(wall, 4),
+            "stages": [{"stage": s, "seconds": round(sec, 4)} for s, sec in _marks],
+        }
+        _marks = None
+        if profiler:
+            result.update(_cpu_stats(profiler))
+        if "mem" in which:
+            result.update(_mem_stats())
+        _write(name, started, result, profiler)
+
+
+def _short(filename: str) -> str:
+    """Repo-relative path, or the part after site-packages / the stdlib dir."""
+    path = filename.replace("\\", "/")
+    here = str(HERE).replace("\\", "/") + "/"
+    if path.startswith(here):
+        return path[len(here):]
+    for marker in ("site-packages/", "/lib/python"):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path
+
+
+def _cpu_stats(profiler) -> dict:
+    import pstats
+
+    stats = pstats.Stats(profiler).stats  # (file, line, func) → (cc, nc, tt, ct, callers)
+    rows = [
+        {"func": f"{_short(f)}:{line}({fn})", "calls": nc, "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+        for (f, line, fn), (cc, nc, tt, ct, _) in stats.items()
+    ]
+    return {
+        "cumulative": sorted(rows, key=lambda r: -r["cumtime"])[:TOP_FUNCS],
+        "own": sorted(rows, key=lambda r: -r["tottime"])[:TOP_FUNCS],
+    }
+
+
+def _mem_stats() -> dict:
+    import tracemalloc
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    top = snapshot.statistics("lineno")[:TOP_LINES]
+    return {
+        "memory": {"current_mb": round(current / 2**20, 2), "peak_mb": round(peak / 2**20, 2)},
+        "allocations": [
+            {"line": f"{_short(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+             "kb": round(s.size / 1024, 1), "blocks": s.count}
+            for s in top
+        ],
+    }
+
+
+# ------------------------------------------------------------------
+# 2. Report
+# ------------------------------------------------------------------
+def format_report(r: dict) -> str:
+    out = [f"{r['script']}  {r['started']}  modes={','.join(r['modes'])}  wall {r['wall']:.3f}s", ""]
+    if r["stages"]:
+        out.append("stage                          seconds   share")
+        for s in r["stages"]:
+            out.append(f"  {s['stage']:<28} {s['seconds']:8.3f}  {s['seconds'] / max(r['wall'], 1e-9):6.1%}")
+        out.append("")
+    for key, title in (("cumulative", "by cumulative time"), ("own", "by own time")):
+        if key in r:
+            out.append(f"top functions {title}:")
+            out.append(f"  {'cumtime':>8} {'tottime':>8} {'calls':>9}  function")
+            for f in r[key]:
+                out.append(f"  {f['cumtime']:8.3f} {f['tottime']:8.3f} {f['calls']:9d}  {f['func']}")
+            out.append("")
+    if "memory" in r:
+        m = r["memory"]
+        out.append(f"memory: peak {m['peak_mb']:.1f} MB, {m['current_mb']:.1f} MB still held at exit")
+        for a in r["allocations"]:
+            out.append(f"  {a['kb']:10.1f} KB {a['blocks']:8d} blocks  {a['line']}")
+    return "\n".join(out).rstrip() + "\n"
+
+
+def _write(name: str, started: datetime, result: dict, profiler=None):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stem = PROFILE_DIR / f"{name}-{started:%Y%m%d-%H%M%S}-{os.getpid()}"
+    stem.with_suffix(".json").write_text(json.dumps(result, indent=2), encoding="utf-8")
+    stem.with_suffix(".txt").write_text(format_report(result), encoding="utf-8")
+    if profiler:
+        profiler.dump_stats(str(stem.with_suffix(".prof")))
+    print(f"⏱  profile → {stem}.txt (wall {result['wall']:.2f}s)", file=sys.stderr)
+
+
+def compare(a: dict, b: dict) -> str:
+    """Stage and function time of run `b` against run `a`."""
+    out = [f"{a['script']} {a['started']} → {b['started']}: wall {a['wall']:.3f}s → {b['wall']:.3f}s "
+           f"({b['wall'] - a['wall']:+.3f}s)", ""]
+    sa = {s["stage"]: s["seconds"] for s in a["stages"]}
+    for s in b["stages"]:
+        before = sa.get(s["stage"])
+        delta = "" if before is None else f"{s['seconds'] - before:+8.3f}"
+        out.append(f"  {s['stage']:<28} {before if before is not None else float('nan'):8.3f} → "
+                   f"{s['seconds']:8.3f} {delta}")
+    if "cumulative" in a and "cumulative" in b:
+        fa = {f["func"]: f["cumtime"] for f in a["cumulative"]}
+        out += ["", "top functions (cumulative), b vs a (n/a = not in a's top):"]
+        for f in b["cumulative"]:
+            before = fa.get(f["func"])
+            note = "(n/a)" if before is None else f"{f['cumtime'] - before:+.3f}"
+            out.append(f"  {f['cumtime']:8.3f} {note:>8}  {f['func']}")
+    return "\n".join(out) + "\n"
+
+
+# ------------------------------------------------------------------
+# 3. Entry-point wrapper
+# ------------------------------------------------------------------
+def run(name: str, main, *args, **kwargs):
+    """
+    Call main(*args, **kwargs), profiled if `--profile[=modes]` is in
+    sys.argv (removed before main sees it) or PROFILE is set.
+    """
+    which = modes()
+    for arg in list(sys.argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            sys.argv.remove(arg)
+            which = modes(arg.partition("=")[2] or "all")
+    with session(name, which):
+        return main(*args, **kwargs)
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Print a profile report, or compare two or more runs")
+    ap.add_argument("reports", nargs="+", help=".json files written by a profiled run")
+    args = ap.parse_args(argv)
+
+    runs = [json.loads(Path(p).read_text(encoding="utf-8")) for p in args.reports]
+    if len(runs) == 1:
+        print(format_report(runs[0]), end="")
+    for a, b in zip(runs, runs[1:]):
+        print(compare(a, b))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
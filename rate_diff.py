@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+rate_diff.py
+––––––––––––
+What changed in the going-rate tables between two Statements of Changes:
+both extracted versions are normalised (rate_tables.normalise) and
+hash-joined on (table, unitGroup) in a single outer merge.
+
+Typed deltas – one row each: table, unitGroup, kind, field, old, new,
+change, row_old, row_new:
+
+    added          unit group only in the new version
+    removed        unit group only in the old version
+    rate_changed   one amount / hourly rate column moved (change = new − old)
+    phd_flipped    "Eligible for PhD points" differs
+    title_changed  group title differs
+
+• Every comparison is a column-wise mask over the joined frame; NaN on
+  both sides counts as equal.  A full rule set diffs in milliseconds.
+• row_old / row_new are the Excel rows (header = row 1) of each version.
+• A unit group listed twice in one table (see rate_validator's
+  code_unique) is diffed on its first occurrence.
+• upsert_ops() turns the deltas into soc2020/bulkload.py's diff format –
+  {"op": "upsert", "id": "Table 2:1111", …new record} for added / changed
+  rows, {"op": "delete", "id": …} for removed ones – so only what moved
+  is written to the database (--sqlite / --postgres, table GoingRate).
+
+Usage
+-----
+    python rate_diff.py --old previous/                  # vs HC997/ workbooks
+    python rate_diff.py --old a/t1.xlsx a/t2.xlsx --new b/ --out deltas.csv
+    python rate_diff.py --old previous/ --ops rates.diff.ndjson --sqlite rates.sqlite
+"""
+
+from __future__ import annotations
+
+import argparse, json, sys, time
+from pathlib import Path
+
+import rate_tables
+from lazy_modules import lazy_import
+from rate_tables import RATE_COLUMNS, WORKBOOKS
+
+pd = lazy_import("pandas")
+
+
+KEY = ["table", "unitGroup"]
+COMPARED = [(c, "rate_changed") for c in RATE_COLUMNS] + [("phd", "phd_flipped"), ("groupTitle", "title_changed")]
+DELTA_COLUMNS = ["table", "unitGroup", "kind", "field", "old", "new", "change", "row_old", "row_new"]
+KIND_ORDER = ["removed", "added", "rate_changed", "phd_flipped", "title_changed"]
+
+DB_TABLE = "GoingRate"
+DB_COLUMNS = ["id", "table", "unitGroup", "groupTitle", "phd", *RATE_COLUMNS]
+
+
+# ------------------------------------------------------------------
+# 1. Versions
+# ------------------------------------------------------------------
+def workbook_paths(paths) -> list[Path]:
+    """Workbooks, or directories holding the two extracted workbooks."""
+    out = []
+    for p in map(Path, paths):
+        out += [p / w.name for w in WORKBOOKS if (p / w.name).exists()] if p.is_dir() else [p]
+    if not out:
+        raise FileNotFoundError(f"No extracted workbooks in {', '.join(map(str, paths))}")
+    return out
+
+
+def keyed(t: pd.DataFrame) -> pd.DataFrame:
+    """Rows with a parsed unit group, one per (table, unitGroup)."""
+    t = t[t["unitGroup"].notna()]
+    return t.drop_duplicates(KEY, keep="first")
+
+
+# ------------------------------------------------------------------
+# 2. Diff
+# ------------------------------------------------------------------
+def _deltas(frame: pd.DataFrame, kind: str, field=None, old=None, new=None, change=None) -> pd.DataFrame:
+    return pd.DataFrame({
+        "table": frame["table"].to_numpy(),
+        "unitGroup": frame["unitGroup"].to_numpy(),
+        "kind": kind,
+        "field": field,
+        "old": old.to_numpy() if old is not None else None,
+        "new": new.to_numpy() if new is not None else None,
+        "change": change.to_numpy() if change is not None else float("nan"),
+        "row_old": frame["row_old"].to_numpy(),
+        "row_new": frame["row_new"].to_numpy(),
+    })
+
+
+def diff(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Typed deltas between two normalised versions (rate_tables.normalise)."""
+    joined = keyed(old).merge(keyed(new), on=KEY, how="outer", suffixes=("_old", "_new"), indicator=True)
+    side = joined.pop("_merge")
+
+    parts = [
+        _deltas(joined[side == "left_only"], "removed"),
+        _deltas(joined[side == "right_only"], "added"),
+    ]
+    both = joined[side == "both"]
+    for col, kind in COMPARED:
+        o, n = both[f"{col}_old"], both[f"{col}_new"]
+        moved = ~(o.eq(n) | (o.isna() & n.isna()))
+        if moved.any():
+            o, n = o[moved], n[moved]
+            change = n - o if kind == "rate_changed" else None
+            parts.append(_deltas(both[moved], kind, col, o.astype(object), n.astype(object), change))
+
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    out = pd.concat(parts, ignore_index=True)[DELTA_COLUMNS]
+    out[["row_old", "row_new"]] = out[["row_old", "row_new"]].astype("Int64")
+    out["kind"] = pd.Categorical(out["kind"], KIND_ORDER, ordered=True)
+    out = out.sort_values(["table", "unitGroup", "kind"], kind="stable").reset_index(drop=True)
+    out["kind"] = out["kind"].astype(str)
+    return out
+
+
+def diff_tables(old_tables: dict, new_tables: dict) -> pd.DataFrame:
+    """Same, from raw extracted {sheet: DataFrame} dicts."""
+    return diff(rate_tables.normalise(old_tables), rate_tables.normalise(new_tables))
+
+
+def summary(deltas: pd.DataFrame) -> str:
+    if deltas.empty:
+        return "✅ no going-rate changes"
+    counts = deltas.groupby(["kind", "table"]).size().rename("deltas").reset_index()
+    groups = deltas[KEY].drop_duplicates()
+    return f"Δ {len(deltas)} changes across {len(groups)} unit groups\n" + counts.to_string(index=False)
+
+
+# ------------------------------------------------------------------
+# 3. Upsert ops
+# ------------------------------------------------------------------
+def record_id(table, unit_group) -> str:
+    return f"{table}:{int(unit_group)}"
+
+
+def upsert_ops(deltas: pd.DataFrame, new: pd.DataFrame) -> list[dict]:
+    """bulkload.apply_diff ops: upsert added / changed groups, delete removed ones."""
+    removed = deltas[deltas["kind"] == "removed"]
+    touched = deltas.loc[deltas["kind"] != "removed", KEY].drop_duplicates()
+
+    rows = keyed(new).merge(touched, on=KEY)[DB_COLUMNS[1:]]
+    rows = rows.astype(object).where(rows.notna(), None)
+    ops = [{"op": "upsert", "id": record_id(r["table"], r["unitGroup"]), **r} for r in rows.to_dict("records")]
+    ops += [{"op": "delete", "id": record_id(t, u)} for t, u in zip(removed["table"], removed["unitGroup"])]
+    return ops
+
+
+def write_ops(ops: list[dict], path: str | Path) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        for op in ops:
+            fh.write(json.dumps(op, ensure_ascii=False) + "\n")
+
+
+def apply_ops(ops: list[dict], sqlite: str | None = None, postgres: str | None = None) -> tuple[int, int]:
+    """Upsert / delete through bulkload's sinks into the GoingRate table."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "soc2020"))
+    from bulkload import PostgresSink, SqliteSink, apply_diff
+
+    if postgres:
+        sink = PostgresSink(postgres, table=DB_TABLE, columns=DB_COLUMNS)
+    else:
+        sink = SqliteSink(sqlite, table=DB_TABLE, columns=DB_COLUMNS)
+    return apply_diff(ops, sink)
+
+
+# ------------------------------------------------------------------
+# 4. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Going-rate changes between two extracted rule versions")
+    ap.add_argument("--old", nargs="+", required=True, help="previous workbooks or their directory")
+    ap.add_argument("--new", nargs="+", default=[str(w) for w in WORKBOOKS], help="default: HC997/ workbooks")
+    ap.add_argument("--out", help="write every delta here (.xlsx / .csv / .parquet)")
+    ap.add_argument("--ops", help="write bulkload upsert / delete ops (NDJSON) here")
+    ap.add_argument("--show", type=int, default=20, help="print the first N deltas")
+    db = ap.add_mutually_exclusive_group()
+    db.add_argument("--sqlite", metavar="FILE", help=f"apply the ops to {DB_TABLE} in this SQLite file")
+    db.add_argument("--postgres", metavar="DSN", help=f"apply the ops to {DB_TABLE} in Postgres")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    old = rate_tables.load(workbook_paths(args.old))
+    new = rate_tables.load(workbook_paths(args.new))
+    t1 = time.perf_counter()
+    deltas = diff(old, new)
+    t2 = time.perf_counter()
+
+    print(summary(deltas))
+    if args.show and not deltas.empty:
+        print(deltas.head(args.show).to_string(index=False))
+    print(f"⏱  {len(old)} → {len(new)} rows: load {t1 - t0:.3f}s, diff {(t2 - t1) * 1000:.1f} ms")
+
+    if args.out:
+        from table_export import export
+
+        export({"deltas": deltas}, args.out, formats=[Path(args.out).suffix.lstrip(".") or "csv"])
+    if args.ops or args.sqlite or args.postgres:
+        ops = upsert_ops(deltas, new)
+        if args.ops:
+            write_ops(ops, args.ops)
+        if args.sqlite or args.postgres:
+            n_up, n_del = apply_ops(ops, args.sqlite, args.postgres)
+            print(f"✅  {n_up:,} upserts, {n_del:,} deletes → {DB_TABLE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
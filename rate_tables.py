@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+rate_tables.py
+––––––––––––––
+Every extracted HC997 going-rate table (1, 1a, 2, 2aa, 2a, 2b, 3a) in one
+normalised, typed frame – one row per (table, unit group):
+
+    table  row  unitGroup  groupTitle  phd
+    base_amount  base_rate   p90_amount p90_rate   p80_amount p80_rate
+    p70_amount   p70_rate    new_entrant_amount new_entrant_rate
+
+• `row` is the 1-based Excel row of the source sheet (header = row 1), so
+  anything derived from this frame can point back at the cell.
+• Tables 1/1a/2 have amount and hourly rate in separate columns; 2aa, 2a,
+  2b and 3a hold "£29,400 (£15.08 per hour)" in one cell. LAYOUTS maps
+  both shapes onto the same levels, and all parsing is str.extract on
+  whole columns.
+• "Not applicable" and blanks become NaN.
+
+Input is either the two workbooks (through workbook_cache) or the
+{sheet: DataFrame} dict that hc997_pipeline.extract() returns.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from lazy_modules import lazy_import
+from workbook_cache import read_sheets, sheet_names
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+HC997_DIR = Path(__file__).resolve().parent / "HC997"
+WORKBOOKS = [HC997_DIR / "table_1_and_1a_data.xlsx", HC997_DIR / "table_2_and_related_data.xlsx"]
+
+CODE_COL = "SOC 2020 occupation code"
+PHD_COL = "Eligible for PhD points (SW)?"
+LEVELS = ["base", "p90", "p80", "p70", "new_entrant"]
+FACTORS = {"p90": 0.9, "p80": 0.8, "p70": 0.7}
+HOURS_PER_YEAR = 37.5 * 52  # 1950; how the rules derive the hourly rate
+RATE_COLUMNS = [f"{level}_{kind}" for level in LEVELS for kind in ("amount", "rate")]
+COLUMNS = ["table", "row", "unitGroup", "groupTitle", "phd", *RATE_COLUMNS]
+
+_T1 = {
+    "base": ("Going rate (SW – options A and D) - Amount", "Going rate (SW – options A and D) - Rate"),
+    "p90": ("90% of going rate (SW – option B) - Amount", "90% of going rate (SW – option B) - Rate"),
+    "p80": ("80% of going rate (SW – option C) - Amount", "80% of going rate (SW – option C) - Rate"),
+    "p70": ("70% of going rate (SW – option E) - Amount", "70% of going rate (SW – option E) - Rate"),
+}
+_T2 = {
+    "base": ("Going rate amount (SW – options F and I, GBM and SCU)",
+             "Going rate per hour (SW – options F and I, GBM and SCU)"),
+    "p90": ("90% going rate amount (SW – option G)", "90% going rate per hour (SW – option G)"),
+    "p80": ("80% going rate amount (SW – option H)", "80% going rate per hour (SW – option H)"),
+    "p70": ("70% going rate amount (SW – option J, GTR)", "70% going rate per hour (SW – option J, GTR)"),
+}
+_T2AA = {
+    "base": "Going rate (SW – options F and I, GBM and SCU)",
+    "p90": "90% of going rate (SW – option G)",
+    "p80": "80% of going rate (SW – option H)",
+    "p70": "70% of going rate (SW – option J, GTR)",
+}
+_HOURLY_ONLY = {"base": "Going rate per hour", "new_entrant": "New entrant rate per hour"}
+
+# sheet → {level: (amount col, rate col) | combined "£x (£y per hour)" col}
+LAYOUTS = {
+    "Table 1": _T1, "Table 1a": _T1,
+    "Table 2": _T2, "Table 2aa": _T2AA,
+    "Table 2a": _HOURLY_ONLY, "Table 2b": _HOURLY_ONLY, "Table 3a": _HOURLY_ONLY,
+}
+
+
+# ------------------------------------------------------------------
+# 1. Column parsing
+# ------------------------------------------------------------------
+def _flat(col: pd.Series) -> pd.Series:
+    return col.astype(object).where(col.notna(), "").astype(str).str.replace(r"\s+", " ", regex=True)
+
+
+def _number(text: pd.Series) -> pd.Series:
+    return pd.to_numeric(text.str.replace(",", "", regex=False), errors="coerce").astype(float)
+
+
+def parse_amount(col: pd.Series) -> pd.Series:
+    """'£88,100' / '£88,100 (£45.18 per hour)' → 88100.0."""
+    return _number(_flat(col).str.extract(r"^\s*£\s*([\d,]+(?:\.\d+)?)", expand=False))
+
+
+def parse_hourly(col: pd.Series) -> pd.Series:
+    """'£29,400 (£15.08 per hour)' → 15.08."""
+    return _number(_flat(col).str.extract(r"£\s*([\d.,]+)\s*per\s*hour", expand=False))
+
+
+def normalise_sheet(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    layout = LAYOUTS[name]
+    code = _flat(df[CODE_COL]).str.strip()
+    keys = code.str.extract(r"^(?P<unitGroup>\d{4})\s*(?P<groupTitle>.*)$")
+
+    out = pd.DataFrame({
+        "table": name,
+        "row": np.arange(len(df)) + 2,
+        "unitGroup": pd.to_numeric(keys["unitGroup"], errors="coerce").astype("Int64"),
+        "groupTitle": keys["groupTitle"],
+    }, index=df.index)
+    if PHD_COL in df.columns:
+        phd = _flat(df[PHD_COL]).str.strip().str.lower()
+        out["phd"] = phd.map({"yes": True, "no": False})
+    else:
+        out["phd"] = None
+
+    for level in LEVELS:
+        src = layout.get(level)
+        if src is None:
+            amount = rate = pd.Series(np.nan, index=df.index)
+        elif isinstance(src, tuple):
+            amount, rate = parse_amount(df[src[0]]), parse_amount(df[src[1]])
+        else:
+            amount, rate = parse_amount(df[src]), parse_hourly(df[src])
+        out[f"{level}_amount"], out[f"{level}_rate"] = amount, rate
+    return out.reset_index(drop=True)
+
+
+# ------------------------------------------------------------------
+# 2. Loading
+# ------------------------------------------------------------------
+def normalise(tables: dict) -> pd.DataFrame:
+    """{sheet: raw DataFrame} → one normalised frame (unknown sheets ignored)."""
+    parts = [normalise_sheet(name, df) for name, df in tables.items() if name in LAYOUTS and not df.empty]
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS).astype({"unitGroup": "Int64", **dict.fromkeys(RATE_COLUMNS, float)})
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_workbooks(paths=WORKBOOKS) -> dict:
+    """{sheet: raw DataFrame} for every known sheet in the extracted workbooks."""
+    tables = {}
+    for path in map(Path, paths):
+        sheets = [s for s in sheet_names(path) if s in LAYOUTS]
+        tables.update(read_sheets(path, sheets))
+    return tables
+
+
+def load(paths=WORKBOOKS) -> pd.DataFrame:
+    return normalise(read_workbooks(paths))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+rate_validator.py
+–––––––––––––––––
+Consistency rules over every extracted going-rate table at once
+(rate_tables.normalise → one frame, one row per table × unit group).
+
+Rules – each is a boolean mask over the whole frame, never a row loop:
+
+    code_parse        first column doesn't start with a 4-digit SOC code
+    code_unique       unit group appears more than once in the same table
+    base_missing      no going-rate amount
+    pct_of_base       90/80/70% amount is not 0.9/0.8/0.7 × going rate
+                      (± ROUNDING), unless it sits on the table's salary floor
+    pct_above_base    a percentage amount is above the going rate
+    hourly_mismatch   hourly rate ≠ annual amount / 1950 (± 1p)
+    new_entrant_high  new-entrant rate above the going rate
+    cross_phd         PhD flag differs between Table 1/1a and Table 2/2aa
+    cross_title       group titles disagree between those tables
+    cross_rate_order  Table 2/2aa going rate above the Table 1/1a one
+
+Every violation keeps its provenance: table, Excel row, unit group.
+
+Usage
+-----
+    python rate_validator.py                       # extracted workbooks
+    python rate_validator.py --csv violations.csv --strict
+"""
+
+from __future__ import annotations
+
+import argparse, sys, time
+
+import rate_tables
+from lazy_modules import lazy_import
+from rate_tables import FACTORS, HOURS_PER_YEAR
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+ROUNDING = 100.0  # published amounts are rounded to the nearest £100
+PENNY = 0.011
+FAMILIES = {"Table 1": "1", "Table 1a": "1", "Table 2": "2", "Table 2aa": "2"}
+VIOLATION_COLUMNS = ["table", "row", "unitGroup", "rule", "detail"]
+
+
+def _violations(t: pd.DataFrame, mask, rule: str, detail) -> pd.DataFrame:
+    """Rows of `t` under `mask`; `detail` is a string or fn(mask) → Series,
+    so messages are only formatted for the rows that actually fail."""
+    mask = np.asarray(mask, dtype=bool)
+    hit = t.loc[mask, ["table", "row", "unitGroup"]].copy()
+    hit["rule"] = rule
+    if callable(detail):
+        hit["detail"] = detail(mask) if mask.any() else ""
+    else:
+        hit["detail"] = detail
+    return hit
+
+
+def _money(s: pd.Series) -> pd.Series:
+    return s.map("£{:,.2f}".format, na_action="ignore").astype(object)
+
+
+# ------------------------------------------------------------------
+# 1. Per-row rules
+# ------------------------------------------------------------------
+def row_rules(t: pd.DataFrame) -> list[pd.DataFrame]:
+    out = [
+        _violations(t, t["unitGroup"].isna(), "code_parse", "no 4-digit SOC code"),
+        _violations(t, t["unitGroup"].notna() & t.duplicated(["table", "unitGroup"], keep=False),
+                    "code_unique", "duplicate unit group in table"),
+        _violations(t, t["base_amount"].isna(), "base_missing", "no going-rate amount"),
+    ]
+
+    base = t["base_amount"]
+    # lowest amount quoted anywhere in the table = its salary floor
+    amounts = t[[f"{lvl}_amount" for lvl in ("base", *FACTORS)]]
+    floor = amounts.min(axis=1).groupby(t["table"]).transform("min")
+    for lvl, factor in FACTORS.items():
+        amt = t[f"{lvl}_amount"]
+        expected = base * factor
+        present = amt.notna() & base.notna()
+        on_floor = np.isclose(amt, floor) & (expected <= floor + ROUNDING)
+        off = present & ((amt - expected).abs() > ROUNDING) & ~on_floor
+        out.append(_violations(t, off, "pct_of_base", lambda m, amt=amt, expected=expected:
+                               lvl + " " + _money(amt[m]) + " vs " + _money(expected[m]) + " expected"))
+        out.append(_violations(t, present & (amt > base), "pct_above_base", lambda m, amt=amt:
+                               lvl + " " + _money(amt[m]) + " > going rate " + _money(base[m])))
+
+    for lvl in ("base", *FACTORS, "new_entrant"):
+        amt, rate = t[f"{lvl}_amount"], t[f"{lvl}_rate"]
+        expected = (amt / HOURS_PER_YEAR).round(2)
+        off = amt.notna() & rate.notna() & ((rate - expected).abs() > PENNY)
+        out.append(_violations(t, off, "hourly_mismatch", lambda m, amt=amt, rate=rate, expected=expected:
+                               lvl + " " + _money(rate[m]) + "/h vs " + _money(amt[m]) + " / 1950 = " + _money(expected[m])))
+
+    ne = t["new_entrant_amount"]
+    out.append(_violations(t, ne.notna() & base.notna() & (ne > base), "new_entrant_high", lambda m:
+                           "new entrant " + _money(ne[m]) + " > going rate " + _money(base[m])))
+    return out
+
+
+# ------------------------------------------------------------------
+# 2. Cross-table rules (Table 1/1a ⋈ Table 2/2aa on unit group)
+# ------------------------------------------------------------------
+def _title_key(s: pd.Series) -> pd.Series:
+    return s.fillna("").str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+
+
+def cross_rules(t: pd.DataFrame) -> list[pd.DataFrame]:
+    fam = t["table"].map(FAMILIES)
+    cols = ["table", "row", "unitGroup", "groupTitle", "phd", "base_amount"]
+    left = t.loc[fam.eq("1") & t["unitGroup"].notna(), cols]
+    right = t.loc[fam.eq("2") & t["unitGroup"].notna(), cols]
+    j = right.merge(left, on="unitGroup", suffixes=("", "_1"))
+    if j.empty:
+        return []
+
+    def against(col, m, fmt=lambda v: v.astype(str)):
+        return " vs " + j["table_1"][m] + " row " + j["row_1"][m].astype(str) + ": " + fmt(j[col][m])
+
+    # extraction truncates wrapped titles, so a prefix counts as agreement
+    a, b = _title_key(j["groupTitle"]), _title_key(j["groupTitle_1"])
+    short, long_ = a.where(a.str.len() <= b.str.len(), b), b.where(a.str.len() <= b.str.len(), a)
+    title_ok = np.char.startswith(long_.to_numpy(str), short.to_numpy(str))
+
+    phd_off = j["phd"].notna() & j["phd_1"].notna() & (j["phd"] != j["phd_1"])
+    rate_off = j["base_amount"].notna() & j["base_amount_1"].notna() & (j["base_amount"] > j["base_amount_1"])
+    return [
+        _violations(j, phd_off, "cross_phd", lambda m:
+                    "PhD " + j["phd"][m].astype(str) + against("phd_1", m)),
+        _violations(j, ~title_ok, "cross_title", lambda m:
+                    "'" + j["groupTitle"][m] + "'" + against("groupTitle_1", m)),
+        _violations(j, rate_off, "cross_rate_order", lambda m:
+                    "going rate " + _money(j["base_amount"][m]) + " above" + against("base_amount_1", m, _money)),
+    ]
+
+
+# ------------------------------------------------------------------
+# 3. Driver
+# ------------------------------------------------------------------
+def validate(normalised: pd.DataFrame) -> pd.DataFrame:
+    """All violations, one row each: table, row, unitGroup, rule, detail."""
+    parts = [p for p in row_rules(normalised) + cross_rules(normalised) if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    out = pd.concat(parts, ignore_index=True)[VIOLATION_COLUMNS]
+    return out.sort_values(["table", "row", "rule"], kind="stable").reset_index(drop=True)
+
+
+def validate_tables(tables: dict) -> pd.DataFrame:
+    """Same, from raw extracted {sheet: DataFrame} (e.g. hc997_pipeline.extract())."""
+    return validate(rate_tables.normalise(tables))
+
+
+def summary(violations: pd.DataFrame) -> str:
+    if violations.empty:
+        return "✅ all going-rate rules pass"
+    counts = violations.groupby(["rule", "table"]).size().rename("rows").reset_index()
+    return f"⚠️ {len(violations)} rule violations\n" + counts.to_string(index=False)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Consistency rules over every extracted going-rate table")
+    ap.add_argument("--csv", help="write every violation here")
+    ap.add_argument("--strict", action="store_true", help="exit 1 on any violation")
+    ap.add_argument("--show", type=int, default=20, help="print the first N violations")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    normalised = rate_tables.load()
+    t1 = time.perf_counter()
+    violations = validate(normalised)
+    t2 = time.perf_counter()
+
+    print(summary(violations))
+    if args.show and not violations.empty:
+        print(violations.head(args.show).to_string(index=False))
+    print(f"⏱  {len(normalised)} rows: load {t1 - t0:.3f}s, validate {(t2 - t1) * 1000:.1f} ms")
+    if args.csv:
+        violations.to_csv(args.csv, index=False)
+    return 1 if args.strict and not violations.empty else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
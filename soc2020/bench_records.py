@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+bench_records.py
+ - Times getdata.build_records (column-wise) against the original per-row
+   iterrows loop, on the 412 unit groups and on an input scaled up to the
+   size of the SOC 2020 coding index (~30k titles).
+ - Both implementations must produce identical records.
+
+    python bench_records.py                      # synthetic 30k rows
+    python bench_records.py --rows 100000
+    python bench_records.py --coding-index soc2020volume2thecodingindexexcel.xlsx \\
+        --code-col "SOC 2020" --title-col "INDEXOCC - natural word order"
+"""
+import argparse, time
+import pandas as pd
+
+from getdata import (ELIGIBLE_FILE, SOC_FILE, TEXT_COLS, TITLE_COL, UNIT_COL,
+                     build_records, eligibility, join_units, load_soc, read_sheet, title_tables)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. Reference: the original row-by-row assembly
+# ──────────────────────────────────────────────────────────────────────────────
+def _opt(x):
+    return None if x is None or x != x or not x else x
+
+
+def _clean_list(x):
+    return [t.lstrip("~").strip() for t in str(x).splitlines() if t.strip()] if _opt(x) else []
+
+
+def build_records_iterrows(joined, titles, elig):
+    major_title, sub_title, minor_title = (titles[k].to_dict() for k in ("major", "sub", "minor"))
+    eligibility_map = elig.to_dict()
+    records = []
+    for _, r in joined.iterrows():
+        ug = int(r[UNIT_COL])
+        major, sub, minor = ug // 1000, ug // 100, ug // 10
+        records.append({
+            "id": r["Unique ID"],
+            "majorGroup": major, "majorGroupTitle": major_title[major],
+            "subMajorGroup": sub, "subMajorGroupTitle": sub_title[sub],
+            "minorGroup": minor, "minorGroupTitle": minor_title[minor],
+            "unitGroup": ug, "groupTitle": r[TITLE_COL].strip(),
+            **{field: _opt(r[src]) for field, src in TEXT_COLS.items()},
+            "relatedJobTitles": _clean_list(r["Related Job Titles"]),
+            "eligibleForSkilledWorker": bool(eligibility_map.get(ug, False)),
+        })
+    return records
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. Scaled inputs
+# ──────────────────────────────────────────────────────────────────────────────
+def scale_synthetic(joined, rows):
+    """Repeat the joined unit groups until there are `rows`, with unique ids."""
+    reps = -(-rows // len(joined))
+    big = pd.concat([joined] * reps, ignore_index=True).iloc[:rows].copy()
+    big["Unique ID"] = big["Unique ID"] + "-" + big.index.astype(str)
+    return big
+
+
+def scale_coding_index(joined, path, code_col, title_col):
+    """One row per coding-index title, carrying its unit group's description."""
+    idx = pd.read_excel(path, dtype=str)[[code_col, title_col]].dropna()
+    idx[code_col] = idx[code_col].str.strip()
+    big = idx.merge(joined, left_on=code_col, right_on=UNIT_COL, how="inner")
+    big["Related Job Titles"] = big[title_col]
+    big["Unique ID"] = big["Unique ID"] + "-" + big.index.astype(str)
+    return big[joined.columns]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. Timing
+# ──────────────────────────────────────────────────────────────────────────────
+def timed(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def run(label, joined, titles, elig, repeat):
+    t_new, new = timed(lambda: build_records(joined, titles, elig), repeat)
+    t_old, old = timed(lambda: build_records_iterrows(joined, titles, elig), 1)
+    assert new == old, f"{label}: column-wise records differ from the per-row reference"
+    print(f"{label:<22} {len(new):>8,} rows   iterrows {t_old * 1000:9.1f} ms   "
+          f"column-wise {t_new * 1000:8.1f} ms   ×{t_old / t_new:5.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark SOC2020 record assembly")
+    ap.add_argument("--rows", type=int, default=30_000)
+    ap.add_argument("--coding-index")
+    ap.add_argument("--code-col", default="SOC 2020")
+    ap.add_argument("--title-col", default="INDEXOCC - natural word order")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    desc, fw = load_soc(SOC_FILE)
+    joined = join_units(desc[desc[UNIT_COL].notna()], fw[fw["SOC2020 Unit Group"].notna()])
+    titles = title_tables(fw)
+    elig = eligibility(read_sheet(ELIGIBLE_FILE, 0, dtype=str))
+
+    run("SOC2020 unit groups", joined, titles, elig, args.repeat)
+    if args.coding_index:
+        big = scale_coding_index(joined, args.coding_index, args.code_col, args.title_col)
+        run("coding index", big, titles, elig, args.repeat)
+    else:
+        run("synthetic scale-up", scale_synthetic(joined, args.rows), titles, elig, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+bulkload.py
+ - Streams soc2020.ndjson (written by getdata.py) into the database in
+   batches instead of one giant prisma.soc2020.createMany.
+ - Postgres: COPY ... FROM STDIN (psycopg 3, or psycopg2 if that is what
+   is installed).  SQLite: executemany, as a local stand-in for tests.
+ - --copy-out writes the same COPY text stream to a file for `psql \\copy`.
+ - --diff applies soc2020.diff.ndjson (upsert/delete ops from getdata.py)
+   instead of a full load.
+ - The sinks take table= / columns=, so other keyed tables (e.g. the going
+   rates from ../rate_diff.py) go through the same upsert / delete path.
+
+    python bulkload.py soc2020.ndjson --postgres "$DATABASE_URL" --truncate
+    python bulkload.py soc2020.ndjson --sqlite soc2020.sqlite --batch-size 100
+    python bulkload.py soc2020.diff.ndjson --diff --postgres "$DATABASE_URL"
+"""
+import argparse, json, sqlite3, sys, time
+from itertools import islice
+from pathlib import Path
+
+TABLE = "Soc2020"
+COLUMNS = [
+    "id",
+    "majorGroup", "majorGroupTitle",
+    "subMajorGroup", "subMajorGroupTitle",
+    "minorGroup", "minorGroupTitle",
+    "unitGroup", "groupTitle",
+    "groupsClassifiedWithin", "groupDescription", "entryRoutes", "tasks",
+    "relatedJobTitles",
+    "eligibleForSkilledWorker",
+]
+DEFAULT_BATCH = 5_000
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. Streaming input
+# ──────────────────────────────────────────────────────────────────────────────
+def iter_records(path):
+    """One dict per NDJSON line; never holds the whole file in memory."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(it, size):
+    it = iter(it)
+    while batch := list(islice(it, size)):
+        yield batch
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. COPY text format
+# ──────────────────────────────────────────────────────────────────────────────
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _pg_array(items):
+    inner = ",".join('"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"' for s in items)
+    return "{" + inner + "}"
+
+
+def _copy_field(v):
+    if v is None or v != v:  # None / NaN
+        return "\\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    if isinstance(v, list):
+        v = _pg_array(v)
+    return str(v).translate(_COPY_ESCAPES)
+
+
+def copy_text(batch, columns=COLUMNS):
+    """Render a batch of records as COPY text-format rows."""
+    return "".join(
+        "\t".join(_copy_field(rec.get(c)) for c in columns) + "\n" for rec in batch
+    )
+
+
+def copy_sql(columns=COLUMNS, table=TABLE):
+    cols = ", ".join(f'"{c}"' for c in columns)
+    return f'COPY "{table}" ({cols}) FROM STDIN'
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. Sinks
+# ──────────────────────────────────────────────────────────────────────────────
+class PostgresSink:
+    def __init__(self, dsn, truncate=False, table=TABLE, columns=COLUMNS):
+        self.table, self.columns = table, columns
+        try:
+            import psycopg
+            self.con, self.v3 = psycopg.connect(dsn), True
+        except ImportError:
+            import psycopg2
+            self.con, self.v3 = psycopg2.connect(dsn), False
+        if truncate:
+            with self.con.cursor() as cur:
+                cur.execute(f'TRUNCATE "{table}"')
+
+    def write(self, batch):
+        data = copy_text(batch, self.columns)
+        sql = copy_sql(self.columns, self.table)
+        with self.con.cursor() as cur:
+            if self.v3:
+                with cur.copy(sql) as cp:
+                    cp.write(data)
+            else:
+                import io
+                cur.copy_expert(sql, io.StringIO(data))
+        return len(data.encode("utf-8"))
+
+    def upsert(self, batch):
+        cols = ", ".join(f'"{c}"' for c in self.columns)
+        marks = ", ".join(["%s"] * len(self.columns))
+        sets = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in self.columns[1:])
+        sql = f'INSERT INTO "{self.table}" ({cols}) VALUES ({marks}) ON CONFLICT ("id") DO UPDATE SET {sets}'
+        with self.con.cursor() as cur:
+            cur.executemany(sql, [tuple(rec.get(c) for c in self.columns) for rec in batch])
+
+    def delete(self, ids):
+        with self.con.cursor() as cur:
+            cur.execute(f'DELETE FROM "{self.table}" WHERE "id" = ANY(%s)', (list(ids),))
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+
+class SqliteSink:
+    """Same table shape; String[] is stored as a JSON array."""
+
+    def __init__(self, path, truncate=False, table=TABLE, columns=COLUMNS):
+        self.con = sqlite3.connect(path)
+        self.table, self.columns = table, columns
+        cols = ", ".join(
+            f'"{c}" TEXT PRIMARY KEY' if c == "id" else f'"{c}"' for c in columns
+        )
+        self.con.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({cols})')
+        if truncate:
+            self.con.execute(f'DELETE FROM "{table}"')
+        marks = ", ".join("?" * len(columns))
+        self.values = f'INTO "{table}" VALUES ({marks})'
+
+    def _rows(self, batch):
+        return [
+            tuple(
+                json.dumps(v, ensure_ascii=False) if isinstance(v, list) else v
+                for v in (rec.get(c) for c in self.columns)
+            )
+            for rec in batch
+        ]
+
+    def write(self, batch):
+        rows = self._rows(batch)
+        self.con.executemany("INSERT " + self.values, rows)
+        return sum(len(json.dumps(r, ensure_ascii=False)) for r in rows)
+
+    def upsert(self, batch):
+        self.con.executemany("INSERT OR REPLACE " + self.values, self._rows(batch))
+
+    def delete(self, ids):
+        self.con.executemany(f'DELETE FROM "{self.table}" WHERE "id" = ?', [(i,) for i in ids])
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+
+class CopyFileSink:
+    """COPY text into a file for `psql \\copy`; the file is always rewritten."""
+
+    def __init__(self, path):
+        self.fh = open(path, "w", encoding="utf-8")
+
+    def write(self, batch):
+        data = copy_text(batch)
+        self.fh.write(data)
+        return len(data.encode("utf-8"))
+
+    def close(self):
+        self.fh.close()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4. Driver
+# ──────────────────────────────────────────────────────────────────────────────
+def load(records, sink, batch_size=DEFAULT_BATCH, verbose=False):
+    """Stream `records` into `sink`; returns a throughput summary dict."""
+    rows = nbytes = batches = 0
+    t0 = time.perf_counter()
+    try:
+        for batch in batched(records, batch_size):
+            tb = time.perf_counter()
+            nbytes += sink.write(batch)
+            rows += len(batch)
+            batches += 1
+            if verbose:
+                dt = time.perf_counter() - tb
+                print(f"  batch {batches:>4}: {len(batch):>6,} rows in {dt * 1000:7.1f} ms")
+    finally:
+        sink.close()
+    secs = time.perf_counter() - t0
+    return {
+        "rows": rows,
+        "batches": batches,
+        "seconds": secs,
+        "rows_per_sec": rows / secs if secs else float("inf"),
+        "mb_per_sec": nbytes / 1e6 / secs if secs else float("inf"),
+    }
+
+
+def apply_diff(ops, sink, batch_size=DEFAULT_BATCH):
+    """Apply {"op": "upsert"|"delete", ...record} lines; returns (upserts, deletes)."""
+    n_up = n_del = 0
+    try:
+        for batch in batched(ops, batch_size):
+            ups = [r for r in batch if r["op"] == "upsert"]
+            dels = [r["id"] for r in batch if r["op"] == "delete"]
+            if ups:
+                sink.upsert(ups)
+            if dels:
+                sink.delete(dels)
+            n_up, n_del = n_up + len(ups), n_del + len(dels)
+    finally:
+        sink.close()
+    return n_up, n_del
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Batch-load soc2020.ndjson")
+    ap.add_argument("ndjson", nargs="?", default="soc2020.ndjson")
+    dest = ap.add_mutually_exclusive_group(required=True)
+    dest.add_argument("--postgres", metavar="DSN")
+    dest.add_argument("--sqlite", metavar="FILE")
+    dest.add_argument("--copy-out", metavar="FILE")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH)
+    ap.add_argument("--truncate", action="store_true", help="empty the table first")
+    ap.add_argument("-v", "--verbose", action="store_true", help="per-batch timings")
+    ap.add_argument("--diff", action="store_true", help="input is soc2020.diff.ndjson")
+    args = ap.parse_args(argv)
+    if args.copy_out and (args.diff or args.truncate):
+        ap.error("--diff / --truncate need a database (--postgres or --sqlite)")
+
+    if args.postgres:
+        sink = PostgresSink(args.postgres, args.truncate)
+    elif args.sqlite:
+        sink = SqliteSink(args.sqlite, args.truncate)
+    else:
+        sink = CopyFileSink(args.copy_out)
+
+    if args.diff:
+        t0 = time.perf_counter()
+        n_up, n_del = apply_diff(iter_records(Path(args.ndjson)), sink, args.batch_size)
+        print(f"✅  {n_up:,} upserts, {n_del:,} deletes in {time.perf_counter() - t0:.2f}s")
+        return
+
+    s = load(iter_records(Path(args.ndjson)), sink, args.batch_size, args.verbose)
+    print(
+        f"✅  {s['rows']:,} rows in {s['batches']} batches, {s['seconds']:.2f}s "
+        f"({s['rows_per_sec']:,.0f} rows/s, {s['mb_per_sec']:.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
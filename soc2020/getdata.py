@@ -2,105 +2,157 @@
 """
 build_soc2020_prisma.py
  - Rebuilds schema.prisma & seed.ts with Skilled-Worker flag handled correctly.
+ - Also writes soc2020.ndjson (one record per line) for bulkload.py and
+   the streaming seed_stream.ts.
+ - Skips the run when neither input workbook changed (--force to override);
+   otherwise diffs against the previous soc2020.ndjson per unit group and
+   writes seed_upsert.ts + soc2020.diff.ndjson with only the changes.
+ - Records are assembled column-wise (see build_frame); bench_records.py
+   times it against the old per-row loop.
+ - Workbooks are read through workbook_cache.py: both SOC sheets in one
+   openpyxl pass, then from memory-mapped Feather until the file changes.
+ - --profile (or PROFILE=1) writes a cProfile / tracemalloc / per-stage
+   report to ../.profiles/ (see profiling.py).
 """
-import json, pathlib, textwrap, re, pandas as pd
+import hashlib, json, pathlib, sys, textwrap, re
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+from lazy_modules import lazy_import  # noqa: E402
+from profiling import run, stage  # noqa: E402
+from workbook_cache import read_sheet, read_sheets  # noqa: E402
+
+pd = lazy_import("pandas")  # not needed when the inputs are unchanged
 
 SOC_FILE      = "soc2020volume1structureanddescriptionofunitgroupsexcel16042025.xlsx"
 ELIGIBLE_FILE = "eligible_occupations.xlsx"
+STATE_FILE    = ".build_state.json"
+SNAPSHOT_FILE = "soc2020.ndjson"
+
+UNIT_COL  = "SOC 2020 Unit Group"
+TITLE_COL = "SOC\n2020 \nGroup Title"
+TEXT_COLS = {
+    "groupsClassifiedWithin": "Groups Classified Within Sub-Groups ",
+    "groupDescription":       "Group  Description",
+    "entryRoutes":            "Typical Entry Routes And Associated Qualifications",
+    "tasks":                  "Tasks",
+}
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 1. Load SOC2020 sheets
+# 0. Skip when the inputs are unchanged
 # ──────────────────────────────────────────────────────────────────────────────
-desc = pd.read_excel(SOC_FILE, sheet_name="SOC2020 descriptions", dtype=str).replace({"<blank>": None})
-fw   = pd.read_excel(SOC_FILE, sheet_name="SOC2020 Framework",   dtype=str).replace({"<blank>": None})
+def fingerprint(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-fw_units = fw[fw["SOC2020 Unit Group"].notna()]
-fw_major = fw[(fw["SOC2020\nMajor Group"].notna()) & fw["SOC2020 Unit Group"].isna()]
-fw_sub   = fw[(fw["SOC2020\nSub-Major Group"].notna()) & fw["SOC2020 Unit Group"].isna()]
-fw_minor = fw[(fw["SOC2020\nMinor Group"].notna()) & fw["SOC2020 Unit Group"].isna()]
 
-units = desc[desc["SOC 2020 Unit Group"].notna()]
+def load_state():
+    state_path = pathlib.Path(STATE_FILE)
+    return json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 2. Maps: code ➜ title
+# 1. Load SOC2020 sheets
 # ──────────────────────────────────────────────────────────────────────────────
-major_title = {int(c): t for c, t in zip(fw_major["SOC2020\nMajor Group"],  fw_major["SOC2020 Group Title"])}
-sub_title   = {int(c): t for c, t in zip(fw_sub["SOC2020\nSub-Major Group"], fw_sub["SOC2020 Group Title"])}
-minor_title = {int(c): t for c, t in zip(fw_minor["SOC2020\nMinor Group"],   fw_minor["SOC2020 Group Title"])}
+def load_soc(path=SOC_FILE):
+    sheets = read_sheets(path, ["SOC2020 descriptions", "SOC2020 Framework"], dtype=str)
+    desc, fw = (df.replace({"<blank>": None}) for df in sheets.values())
+    return desc, fw
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 3. Build eligibility map  (code -> True/False)
+# 2. Tables: code ➜ title, one Series per level
 # ──────────────────────────────────────────────────────────────────────────────
-elig_df = pd.read_excel(ELIGIBLE_FILE, sheet_name=0, dtype=str)
+def title_tables(fw):
+    group_rows = fw[fw["SOC2020 Unit Group"].isna()]
+    out = {}
+    for level, col in (("major", "SOC2020\nMajor Group"),
+                       ("sub",   "SOC2020\nSub-Major Group"),
+                       ("minor", "SOC2020\nMinor Group")):
+        rows = group_rows[group_rows[col].notna()]
+        out[level] = pd.Series(rows["SOC2020 Group Title"].to_numpy(object),
+                               index=rows[col].astype(int).to_numpy(), name=f"{level}Title")
+    return out
 
-code_col = next(c for c in elig_df.columns if re.search(r"code", c, re.I))
-elig_col = next(c for c in elig_df.columns if re.search(r"eligible", c, re.I))
-
-elig_df["elig_bool"] = elig_df[elig_col].str.strip().str.lower().isin(["yes", "y", "true", "1"])
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. Eligibility  (code -> True/False)
+# ──────────────────────────────────────────────────────────────────────────────
+def eligibility(elig_df):
+    code_col = next(c for c in elig_df.columns if re.search(r"code", c, re.I))
+    elig_col = next(c for c in elig_df.columns if re.search(r"eligible", c, re.I))
 
-# same code may appear multiple times; use `.max()` so any Yes wins
-eligibility_map = {
-    int(code): bool(flag)
-    for code, flag in (
-        elig_df
-        .dropna(subset=[code_col])
-        .assign(code_int=lambda d: d[code_col].str.strip())
-        .query("code_int.str.isdigit()")
-        .groupby("code_int")["elig_bool"]
-        .max()
-        .items()
-    )
-}
+    codes = elig_df[code_col].str.strip()
+    flags = elig_df[elig_col].str.strip().str.lower().isin(["yes", "y", "true", "1"])
+    ok = codes.notna() & codes.str.isdigit().fillna(False).astype(bool)
+    # same code may appear multiple times; `.max()` so any Yes wins
+    return flags[ok].groupby(codes[ok].astype(int).to_numpy()).max()
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 4. Merge for Unique-ID & assemble records
+# 4. Assemble records column-wise
 # ──────────────────────────────────────────────────────────────────────────────
-joined = units.merge(
-    fw_units[["Unique ID", "SOC2020 Unit Group"]],
-    left_on="SOC 2020 Unit Group",
-    right_on="SOC2020 Unit Group",
-    how="left",
-    validate="1:1",
-)
+def optional_text(col):
+    """Blank / NaN → None, everything else unchanged (object dtype)."""
+    col = col.astype(object)
+    return col.where(col.notna() & (col != ""), None)
 
-assert joined["Unique ID"].notna().all(), "Some Unit-Groups are missing Unique ID"
 
-def clean_list(x):
-    return [t.lstrip("~").strip() for t in str(x).splitlines() if t.strip()] if x else []
+def split_job_titles(col):
+    """'~A\n~B\n' → ['A', 'B'] for a whole column at once."""
+    # one list per cell, built straight from the split lines: regrouping an
+    # exploded Series goes through a per-group Python path
+    texts = col.astype(object).where(col.notna(), "").astype(str)
+    return pd.Series([[t.lstrip("~").strip() for t in text.splitlines() if t.strip()] for text in texts],
+                     index=col.index, dtype=object)
 
-records = []
-for _, r in joined.iterrows():
-    ug = int(r["SOC 2020 Unit Group"])   # 4-digit code
+
+def join_units(units, fw_units):
+    """Descriptions + the framework's Unique ID, one row per unit group."""
+    joined = units.merge(
+        fw_units[["Unique ID", "SOC2020 Unit Group"]],
+        left_on=UNIT_COL,
+        right_on="SOC2020 Unit Group",
+        how="left",
+        validate="1:1",
+    )
+    assert joined["Unique ID"].notna().all(), "Some Unit-Groups are missing Unique ID"
+    return joined
+
+
+def build_frame(joined, titles, elig):
+    """One row per joined row, columns in record order."""
+    ug = joined[UNIT_COL].astype(int)   # 4-digit code
     major, sub, minor = ug // 1000, ug // 100, ug // 10
 
-    records.append(
-        {
-            "id": r["Unique ID"],
+    df = pd.DataFrame({
+        "id": joined["Unique ID"].astype(object),
 
-            "majorGroup": major,
-            "majorGroupTitle":  major_title[major],
-            "subMajorGroup":    sub,
-            "subMajorGroupTitle": sub_title[sub],
-            "minorGroup":       minor,
-            "minorGroupTitle":  minor_title[minor],
+        "majorGroup":         major,
+        "majorGroupTitle":    major.map(titles["major"]),
+        "subMajorGroup":      sub,
+        "subMajorGroupTitle": sub.map(titles["sub"]),
+        "minorGroup":         minor,
+        "minorGroupTitle":    minor.map(titles["minor"]),
 
-            "unitGroup": ug,
-            "groupTitle": r["SOC\n2020 \nGroup Title"].strip(),
+        "unitGroup":  ug,
+        "groupTitle": joined[TITLE_COL].str.strip().astype(object),
+    })
+    for field, src in TEXT_COLS.items():
+        df[field] = optional_text(joined[src])
+    df["relatedJobTitles"] = split_job_titles(joined["Related Job Titles"])
+    df["eligibleForSkilledWorker"] = ug.map(elig).fillna(False).astype(bool)
 
-            "groupsClassifiedWithin": r["Groups Classified Within Sub-Groups "] or None,
-            "groupDescription":       r["Group  Description"] or None,
-            "entryRoutes":            r["Typical Entry Routes And Associated Qualifications"] or None,
-            "tasks":                  r["Tasks"] or None,
-            "relatedJobTitles":       clean_list(r["Related Job Titles"]),
+    for level in ("majorGroupTitle", "subMajorGroupTitle", "minorGroupTitle"):
+        assert df[level].notna().all(), f"Missing {level} for some unit groups"
+    return df
 
-            "eligibleForSkilledWorker": eligibility_map.get(ug, False),
-        }
-    )
+
+def build_records(joined, titles, elig):
+    return build_frame(joined, titles, elig).to_dict(orient="records")
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 5. Prisma schema
 # ──────────────────────────────────────────────────────────────────────────────
-schema = textwrap.dedent("""
+SCHEMA = textwrap.dedent("""
     datasource db {
       provider = "postgresql"
       url      = env("DATABASE_URL")
@@ -134,9 +186,12 @@ schema = textwrap.dedent("""
 """).lstrip()
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 6. seed.ts
+# 6. seed.ts / seed_upsert.ts
 # ──────────────────────────────────────────────────────────────────────────────
-seed_ts = textwrap.dedent(f"""
+# (the JSON payload is indented less than the template, so dedent leaves the
+#  template's 4-space indent in place; keep it at 4 to match existing seeds)
+def seed_ts(records):
+    return textwrap.dedent(f"""
     import {{ PrismaClient }} from '@prisma/client';
     const prisma = new PrismaClient();
 
@@ -149,12 +204,94 @@ seed_ts = textwrap.dedent(f"""
     main()
       .catch(e => {{ console.error(e); process.exit(1); }})
       .finally(() => prisma.$disconnect());
-""").lstrip()
+    """).lstrip()
+
+
+def seed_upsert_ts(added, changed, removed):
+    upserts = added + changed
+    return textwrap.dedent(f"""
+    import {{ PrismaClient }} from '@prisma/client';
+    const prisma = new PrismaClient();
+
+    // {len(added)} added, {len(changed)} changed, {len(removed)} removed unit groups
+    const upserts = {json.dumps(upserts, ensure_ascii=False, indent=2)};
+    const deleteIds = {json.dumps([r["id"] for r in removed])};
+
+    async function main() {{
+      await prisma.$transaction([
+        ...upserts.map(data =>
+          prisma.soc2020.upsert({{ where: {{ id: data.id }}, create: data, update: data }})),
+        prisma.soc2020.deleteMany({{ where: {{ id: {{ in: deleteIds }} }} }}),
+      ]);
+    }}
+
+    main()
+      .catch(e => {{ console.error(e); process.exit(1); }})
+      .finally(() => prisma.$disconnect());
+    """).lstrip()
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 7. Write files
+# 7. Per-unit-group diff against the previous snapshot
 # ──────────────────────────────────────────────────────────────────────────────
-pathlib.Path("schema.prisma").write_text(schema, encoding="utf-8")
-pathlib.Path("seed.ts").write_text(seed_ts, encoding="utf-8")
+def read_snapshot(path=SNAPSHOT_FILE):
+    snapshot = pathlib.Path(path)
+    if not snapshot.exists():
+        return {}
+    with open(snapshot, encoding="utf-8") as fh:
+        return {r["unitGroup"]: r for r in map(json.loads, filter(str.strip, fh))}
+
+
+def diff_records(previous, records):
+    current = {r["unitGroup"]: r for r in records}
+    added   = [current[u] for u in sorted(current.keys() - previous.keys())]
+    removed = [previous[u] for u in sorted(previous.keys() - current.keys())]
+    changed = [current[u] for u in sorted(current.keys() & previous.keys()) if current[u] != previous[u]]
+    return added, changed, removed
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 8. Main
+# ──────────────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    inputs = {f: fingerprint(f) for f in (SOC_FILE, ELIGIBLE_FILE)}
+    if (
+        "--force" not in argv
+        and load_state().get("inputs") == inputs
+        and pathlib.Path(SNAPSHOT_FILE).exists()
+    ):
+        print("✅  Inputs unchanged since last build – nothing to do (use --force to rebuild).")
+        return
+
+    with stage("load workbooks"):
+        desc, fw = load_soc(SOC_FILE)
+        fw_units = fw[fw["SOC2020 Unit Group"].notna()]
+        units    = desc[desc[UNIT_COL].notna()]
+        elig     = eligibility(read_sheet(ELIGIBLE_FILE, 0, dtype=str))
+    with stage("build records"):
+        records  = build_records(join_units(units, fw_units), title_tables(fw), elig)
+
+    with stage("write seed.ts"):
+        pathlib.Path("schema.prisma").write_text(SCHEMA, encoding="utf-8")
+        pathlib.Path("seed.ts").write_text(seed_ts(records), encoding="utf-8")
+
+    with stage("diff + upsert"):
+        added, changed, removed = diff_records(read_snapshot(), records)
+        with open("soc2020.diff.ndjson", "w", encoding="utf-8") as fh:
+            for op, recs in (("upsert", added + changed), ("delete", removed)):
+                for rec in recs:
+                    fh.write(json.dumps({"op": op, **rec}, ensure_ascii=False) + "\n")
+        pathlib.Path("seed_upsert.ts").write_text(seed_upsert_ts(added, changed, removed), encoding="utf-8")
+
+    with stage("write snapshot"), open(SNAPSHOT_FILE, "w", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    pathlib.Path(STATE_FILE).write_text(
+        json.dumps({"inputs": inputs, "rows": len(records)}, indent=2), encoding="utf-8"
+    )
+
+    print(f"✅  Rebuilt schema.prisma, seed.ts & {SNAPSHOT_FILE} – {len(records)} rows; Skilled-Worker flag is correct.")
+    print(f"   Δ vs previous build: {len(added)} added, {len(changed)} changed, {len(removed)} removed → seed_upsert.ts")
+
 
-print(f"✅  Rebuilt schema.prisma & seed.ts – {len(records)} rows; Skilled-Worker flag is correct.")
+if __name__ == "__main__":
+    run("getdata", main)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+occupation_db.py
+ - Materialises one denormalised row per SOC 2020 unit group into
+   occupations.sqlite: the hierarchy codes and titles, description,
+   tasks, related job titles and Skilled-Worker eligibility from
+   soc2020.ndjson (getdata.py), plus every going-rate table from HC997
+   (rate_tables.py – Tables 1, 1a, 2, 2aa, 2a, 2b, 3a) and the PhD flag.
+ - Rate columns are <table>_<level>_<amount|rate>, e.g. t1_base_amount,
+   t2aa_p70_rate, t3a_new_entrant_rate; levels a table doesn't publish are
+   left out.  rateTables lists the tables a unit group appears in, and phd
+   is its "Eligible for PhD points" flag (first table that states one).
+ - unitGroup is the INTEGER PRIMARY KEY (the rowid itself), so "everything
+   about 2134" is one B-tree read; the hierarchy columns, eligibility and
+   phd carry secondary indexes for the roll-up questions.
+ - Built into a temporary file and swapped in, so readers never see a
+   half-written database.
+
+    python occupation_db.py --build
+    python occupation_db.py 2134
+    python occupation_db.py --sql "SELECT unitGroup, groupTitle, t2_base_amount FROM Occupation WHERE minorGroup = 213"
+"""
+import argparse, json, os, pathlib, sqlite3, sys, time
+
+HERE = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from lazy_modules import lazy_import  # noqa: E402
+
+pd = lazy_import("pandas")
+
+DB_FILE = HERE / "occupations.sqlite"
+TABLE   = "Occupation"
+
+SOC_COLUMNS = [
+    "unitGroup", "groupTitle",
+    "majorGroup", "majorGroupTitle",
+    "subMajorGroup", "subMajorGroupTitle",
+    "minorGroup", "minorGroupTitle",
+    "groupsClassifiedWithin", "groupDescription", "entryRoutes", "tasks",
+    "relatedJobTitles",
+    "eligibleForSkilledWorker",
+]
+# rate_tables sheet → column prefix
+PREFIXES = {
+    "Table 1": "t1", "Table 1a": "t1a",
+    "Table 2": "t2", "Table 2aa": "t2aa",
+    "Table 2a": "t2a", "Table 2b": "t2b", "Table 3a": "t3a",
+}
+INDEXED = ["majorGroup", "subMajorGroup", "minorGroup", "eligibleForSkilledWorker", "phd"]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. Inputs
+# ──────────────────────────────────────────────────────────────────────────────
+def load_soc():
+    """One row per unit group from soc2020.ndjson (or the workbooks)."""
+    from soc_index import load_units
+
+    units = load_units()[SOC_COLUMNS].copy()
+    units["relatedJobTitles"] = [json.dumps(v or [], ensure_ascii=False) for v in units["relatedJobTitles"]]
+    return units.sort_values("unitGroup").set_index("unitGroup")
+
+
+def load_rates(tables=None):
+    """Every going-rate table pivoted wide: one row per unit group."""
+    import rate_tables
+    from rate_tables import LEVELS
+
+    t = rate_tables.load() if tables is None else rate_tables.normalise(tables)
+    t = t[t["unitGroup"].notna()].drop_duplicates(["table", "unitGroup"])
+    t = t.assign(unitGroup=t["unitGroup"].astype(int), prefix=t["table"].map(PREFIXES))
+
+    values = [f"{level}_{kind}" for level in LEVELS for kind in ("amount", "rate")]
+    wide = t.pivot(index="unitGroup", columns="prefix", values=values)
+    wide.columns = [f"{prefix}_{col}" for col, prefix in wide.columns]
+    order = [f"{p}_{v}" for p in PREFIXES.values() for v in values]
+    wide = wide[[c for c in order if c in wide.columns]].dropna(axis=1, how="all").astype(float)
+
+    facts = pd.DataFrame({
+        "rateTables": t.groupby("unitGroup")["table"].agg(", ".join),
+        "phd": t.dropna(subset=["phd"]).groupby("unitGroup")["phd"].first(),
+    })
+    return facts.join(wide, how="outer")
+
+
+def build_frame(units=None, rates=None):
+    units = load_soc() if units is None else units
+    rates = load_rates() if rates is None else rates
+    out = units.join(rates, how="left")
+    out["eligibleForSkilledWorker"] = out["eligibleForSkilledWorker"].astype(bool)
+    return out.reset_index()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. SQLite
+# ──────────────────────────────────────────────────────────────────────────────
+def _sql_type(name, dtype):
+    if name == "unitGroup":
+        return "INTEGER PRIMARY KEY"  # alias of the rowid: lookups are one B-tree read
+    if pd.api.types.is_bool_dtype(dtype) or name == "phd":
+        return "INTEGER"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _rows(frame):
+    clean = frame.astype(object).where(frame.notna(), None)
+    return [tuple(int(v) if isinstance(v, bool) else v for v in row)
+            for row in clean.itertuples(index=False, name=None)]
+
+
+def write_db(frame, path=DB_FILE):
+    """Write `frame` as TABLE with its indexes; swaps the finished file in."""
+    path = pathlib.Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+
+    con = sqlite3.connect(tmp)
+    try:
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        cols = ", ".join(f'"{c}" {_sql_type(c, frame[c].dtype)}' for c in frame.columns)
+        con.execute(f'CREATE TABLE "{TABLE}" ({cols})')
+        marks = ", ".join("?" * len(frame.columns))
+        con.executemany(f'INSERT INTO "{TABLE}" VALUES ({marks})', _rows(frame))
+        for c in INDEXED:
+            con.execute(f'CREATE INDEX "{TABLE}_{c}" ON "{TABLE}" ("{c}")')
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    return path
+
+
+def build(path=DB_FILE):
+    frame = build_frame()
+    write_db(frame, path)
+    return frame
+
+
+def lookup(unit_group, path=DB_FILE):
+    """Everything about one unit group (None if unknown) – one primary-key read."""
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        con.row_factory = sqlite3.Row
+        row = con.execute(f'SELECT * FROM "{TABLE}" WHERE "unitGroup" = ?', (int(unit_group),)).fetchone()
+        return dict(row) if row else None
+    finally:
+        con.close()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. CLI
+# ──────────────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Denormalised SOC 2020 + going-rate occupation table (SQLite)")
+    ap.add_argument("unit_group", nargs="?", type=int)
+    ap.add_argument("--build", action="store_true", help=f"(re)build {DB_FILE.name}")
+    ap.add_argument("--sql", help="run one query against the table and print the rows")
+    args = ap.parse_args(argv)
+
+    if args.build:
+        t0 = time.perf_counter()
+        frame = build()
+        print(f"✅  {DB_FILE.name}: {len(frame)} unit groups × {len(frame.columns)} columns, "
+              f"{frame['rateTables'].notna().sum()} with going rates, in {time.perf_counter() - t0:.2f}s")
+    elif not DB_FILE.exists():
+        ap.error(f"{DB_FILE.name} not built yet – run with --build")
+
+    if args.unit_group is not None:
+        t0 = time.perf_counter()
+        row = lookup(args.unit_group)
+        ms = (time.perf_counter() - t0) * 1000
+        if row is None:
+            ap.error(f"{args.unit_group} is not a SOC 2020 unit group")
+        width = max(map(len, row))
+        for k, v in row.items():
+            if v is not None:
+                print(f"  {k:<{width}}  {v}")
+        print(f"⏱  {ms:.2f} ms")
+    if args.sql:
+        con = sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True)
+        print(pd.read_sql_query(args.sql, con).to_string(index=False))
+        con.close()
+    if not (args.build or args.sql or args.unit_group is not None):
+        ap.error("give a unit group, --sql or --build")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+search_index.py
+ - Full-text search over the SOC 2020 unit groups in soc2020.ndjson
+   (getdata.py): group title, related job titles, description, tasks and
+   entry routes – instead of scanning seed.ts or LIKE queries in the db.
+ - Inverted index in CSR form: a sorted vocabulary, postings offsets, and
+   per posting the unit group, its field-weighted term frequency (FIELDS)
+   and its precomputed BM25 score, so a query is a few array slices and
+   one add per term.
+ - Prefix queries ("engin*", or prefix=True for the last word typed) need
+   no extra structure: the terms sharing a prefix are one range of the
+   sorted vocabulary, and their postings one contiguous slice.  The
+   expansions are scored as one term – term frequencies summed per unit
+   group, one idf for the groups matching any of them – so a rare
+   expansion ("nursery") does not outrank the common ones ("nurse",
+   "nursing").
+ - Persisted as soc2020.search.npz next to the seed output (plain arrays,
+   no pickle); it is rebuilt when soc2020.ndjson changes (source hash
+   stored in the file).  Loading takes milliseconds, a query well under one.
+
+    python search_index.py --build
+    python search_index.py "software developer"
+    python search_index.py "nurs* midwife" -k 5
+    python search_index.py --bench
+"""
+import argparse, hashlib, json, pathlib, re, sys, time
+from collections import Counter, defaultdict
+
+HERE = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from lazy_modules import lazy_import  # noqa: E402
+
+np = lazy_import("numpy")
+
+SNAPSHOT_FILE = HERE / "soc2020.ndjson"
+INDEX_FILE    = HERE / "soc2020.search.npz"
+
+# field → weight in the term frequency and document length (BM25F-style)
+FIELDS = {
+    "groupTitle":       3.0,
+    "relatedJobTitles": 2.0,
+    "groupDescription": 1.0,
+    "tasks":            1.0,
+    "entryRoutes":      1.0,
+}
+K1, B = 1.2, 0.75
+_TOKEN = re.compile(r"[a-z0-9]+")
+_QUERY = re.compile(r"[a-z0-9]+\*?")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. Text
+# ──────────────────────────────────────────────────────────────────────────────
+def tokens(text):
+    """Lower-case alphanumeric runs; "co-ordinate" → co, ordinate."""
+    if not text:
+        return []
+    if isinstance(text, list):
+        text = "\n".join(text)
+    return _TOKEN.findall(text.lower().replace("’", "").replace("'", ""))
+
+
+def read_records(path=SNAPSHOT_FILE):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def file_hash(path):
+    return hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+
+def _idf(n, df):
+    return np.log1p((n - df + 0.5) / (df + 0.5))
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. Index
+# ──────────────────────────────────────────────────────────────────────────────
+class SearchIndex:
+    """
+    Arrays (CSR over the sorted vocabulary):
+      vocab            sorted terms (ASCII bytes)
+      offsets          postings of vocab[i] = docs/scores[offsets[i]:offsets[i + 1]]
+      docs, tfs, scores
+                       document position, weighted term frequency and BM25
+                       score per posting
+      norms            document position → K1 · (1 - B + B · length / avgdl)
+      unit_groups      document position → unit group code
+      titles           document position → group title
+    """
+
+    ARRAYS = ("vocab", "offsets", "docs", "tfs", "scores", "norms", "unit_groups", "titles")
+
+    def __init__(self, vocab, offsets, docs, tfs, scores, norms, unit_groups, titles, source=""):
+        self.vocab, self.offsets, self.docs, self.tfs, self.scores = vocab, offsets, docs, tfs, scores
+        self.norms, self.unit_groups, self.titles, self.source = norms, unit_groups, titles, source
+
+    @classmethod
+    def build(cls, records, source=""):
+        tfs, lengths = [], []
+        for rec in records:
+            tf = Counter()
+            for field, weight in FIELDS.items():
+                for tok in tokens(rec.get(field)):
+                    tf[tok] += weight
+            tfs.append(tf)
+            lengths.append(sum(tf.values()))
+
+        n = len(records)
+        avgdl = (sum(lengths) / n) if n else 1.0
+        norms = [K1 * (1 - B + B * length / avgdl) for length in lengths]
+        postings = defaultdict(list)
+        for d, tf in enumerate(tfs):
+            for term, f in tf.items():
+                postings[term].append((d, f))
+
+        vocab = sorted(postings)
+        offsets, docs, freqs, scores = [0], [], [], []
+        for term in vocab:
+            plist = postings[term]
+            idf = _idf(n, len(plist))
+            for d, f in plist:
+                docs.append(d)
+                freqs.append(f)
+                scores.append(idf * f * (K1 + 1) / (f + norms[d]))
+            offsets.append(len(docs))
+
+        return cls(
+            np.array(vocab, dtype=bytes),  # tokens are ASCII: 1 byte per char, not 4
+            np.array(offsets, dtype=np.int64),
+            np.array(docs, dtype=np.int32),
+            np.array(freqs, dtype=np.float32),
+            np.array(scores, dtype=np.float32),
+            np.array(norms, dtype=np.float32),
+            np.array([r["unitGroup"] for r in records], dtype=np.int32),
+            np.array([r.get("groupTitle") or "" for r in records], dtype=str),
+            source,
+        )
+
+    # ── persistence ──────────────────────────────────────────────────────────
+    def save(self, path=INDEX_FILE):
+        with open(path, "wb") as fh:  # a file object: np.savez would append .npz to the name
+            np.savez(fh, source=np.array(self.source), **{a: getattr(self, a) for a in self.ARRAYS})
+        return pathlib.Path(path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with np.load(path, allow_pickle=False) as z:
+            return cls(*(z[a] for a in cls.ARRAYS), source=str(z["source"]))
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def term_range(self, term, prefix=False):
+        """[lo, hi) of `term` – or of every term starting with it – in vocab."""
+        term = term.encode("ascii")
+        lo = int(np.searchsorted(self.vocab, term, "left"))
+        hi = int(np.searchsorted(self.vocab, term + b"\xff" if prefix else term, "right"))
+        return lo, hi
+
+    def scores_for(self, query, prefix=False):
+        """BM25 score per document; "term*" is a prefix, and so is the last word if `prefix`."""
+        words = _QUERY.findall(query.lower().replace("’", "").replace("'", ""))
+        total = np.zeros(len(self.unit_groups), dtype=np.float32)
+        for i, word in enumerate(words):
+            is_prefix = word.endswith("*") or (prefix and i == len(words) - 1)
+            lo, hi = self.term_range(word.rstrip("*"), is_prefix)
+            a, b = self.offsets[lo], self.offsets[hi]
+            if a == b:
+                continue
+            if hi - lo == 1:  # one term: its documents are distinct
+                total[self.docs[a:b]] += self.scores[a:b]
+            else:  # the expansions as one term
+                f = np.bincount(self.docs[a:b], self.tfs[a:b], len(total))
+                hit = np.flatnonzero(f)
+                f = f[hit]
+                idf = _idf(len(total), len(hit))
+                total[hit] += idf * f * (K1 + 1) / (f + self.norms[hit])
+        return total
+
+    def search(self, query, k=10, prefix=False):
+        """Top `k` (unitGroup, groupTitle, score), best first."""
+        total = self.scores_for(query, prefix)
+        hits = np.flatnonzero(total)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-total[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-total[hits], kind="stable")]
+        return [(int(self.unit_groups[d]), str(self.titles[d]), float(total[d])) for d in hits]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. Build / load
+# ──────────────────────────────────────────────────────────────────────────────
+def build_index(snapshot=SNAPSHOT_FILE, path=INDEX_FILE):
+    idx = SearchIndex.build(read_records(snapshot), file_hash(snapshot))
+    idx.save(path)
+    return idx
+
+
+def load_index(snapshot=SNAPSHOT_FILE, path=INDEX_FILE):
+    """The saved index, rebuilt first if it is missing, older than SearchIndex.ARRAYS
+    or soc2020.ndjson changed."""
+    if pathlib.Path(path).exists():
+        try:
+            idx = SearchIndex.load(path)
+        except KeyError:  # written before an array was added
+            idx = None
+        if idx is not None and (not pathlib.Path(snapshot).exists() or idx.source == file_hash(snapshot)):
+            return idx
+    return build_index(snapshot, path)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 4. CLI
+# ──────────────────────────────────────────────────────────────────────────────
+BENCH_QUERIES = ["software developer", "nurse", "engin*", "chef restaurant kitchen",
+                 "teach* secondary school", "care worker", "electrician wiring", "account*"]
+
+
+def bench(path=INDEX_FILE, repeat=200):
+    t0 = time.perf_counter()
+    idx = SearchIndex.load(path)
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"load  {load_ms:6.2f} ms  ({len(idx.vocab):,} terms, {len(idx.docs):,} postings, "
+          f"{len(idx.unit_groups)} unit groups, {pathlib.Path(path).stat().st_size / 1024:.0f} KiB)")
+    for q in BENCH_QUERIES:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            hits = idx.search(q)
+        us = (time.perf_counter() - t0) / repeat * 1e6
+        top = f"{hits[0][0]} {hits[0][1]}" if hits else "–"
+        print(f"  {us:7.1f} µs  {q!r:<28} → {top}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BM25 search over SOC 2020 unit groups")
+    ap.add_argument("query", nargs="*")
+    ap.add_argument("-k", type=int, default=10, help="number of hits")
+    ap.add_argument("--prefix", action="store_true", help="treat the last word as a prefix")
+    ap.add_argument("--build", action="store_true", help=f"(re)build {INDEX_FILE.name} from {SNAPSHOT_FILE.name}")
+    ap.add_argument("--bench", action="store_true", help="time load + sample queries")
+    args = ap.parse_args(argv)
+
+    if args.build:
+        t0 = time.perf_counter()
+        idx = build_index()
+        print(f"✅  {INDEX_FILE.name}: {len(idx.unit_groups)} unit groups, {len(idx.vocab):,} terms "
+              f"in {time.perf_counter() - t0:.2f}s")
+    if args.bench:
+        load_index()
+        bench()
+    if args.query:
+        for ug, title, score in load_index().search(" ".join(args.query), args.k, args.prefix):
+            print(f"{score:7.2f}  {ug}  {title}")
+    elif not (args.build or args.bench):
+        ap.error("give a query, --build or --bench")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+// Streaming seed: reads an NDJSON file (soc2020.ndjson from getdata.py, or a
+// *_mapped_to_schema.ndjson from the HC997 mappers) line by line and inserts
+// it in createMany batches, so the data never sits in memory or in the script.
+//
+//   npx ts-node seed_stream.ts                                   # soc2020.ndjson → soc2020
+//   npx ts-node seed_stream.ts ../HC997/table1_mapped_to_schema.ndjson goingRateTable1
+import { createReadStream } from 'fs';
+import { createInterface } from 'readline';
+import { PrismaClient } from '@prisma/client';
+
+const prisma = new PrismaClient();
+const file = process.argv[2] ?? 'soc2020.ndjson';
+const model = process.argv[3] ?? 'soc2020';
+const BATCH = Number(process.env.SEED_BATCH ?? 1000);
+
+async function main() {
+  const delegate = (prisma as any)[model];
+  if (!delegate) throw new Error(`Unknown Prisma model: ${model}`);
+
+  const lines = createInterface({ input: createReadStream(file), crlfDelay: Infinity });
+  let batch: unknown[] = [];
+  let rows = 0;
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    batch.push(JSON.parse(line));
+    if (batch.length === BATCH) {
+      await delegate.createMany({ data: batch });
+      rows += batch.length;
+      batch = [];
+    }
+  }
+  if (batch.length) {
+    await delegate.createMany({ data: batch });
+    rows += batch.length;
+  }
+  console.log(`✅ ${rows} rows from ${file} → ${model}`);
+}
+
+main()
+  .catch(e => { console.error(e); process.exit(1); })
+  .finally(() => prisma.$disconnect());
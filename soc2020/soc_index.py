@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+soc_index.py
+ - In-memory SOC 2020 hierarchy (major ➜ sub-major ➜ minor ➜ unit group)
+   held as one sorted code array per level, so that:
+     • parent / children / node lookup are O(1) array reads,
+     • every node's unit groups are one contiguous slice of the unit level,
+     • going-rate and Skilled-Worker rollups are precomputed per node.
+ - Unit groups come from soc2020.ndjson (getdata.py) – or straight from the
+   workbooks if it hasn't been written yet – and going rates from the
+   HC997 table1/table2 *_mapped_to_schema.json files.
+
+    python soc_index.py 21                 # children, rollup and units under 21
+    python soc_index.py 2136 --level unit
+    python soc_index.py --rollups minor > minor_rollups.csv
+"""
+import argparse, json, pathlib, sys
+
+HERE = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from lazy_modules import lazy_import  # noqa: E402
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+RATE_FILES = [HERE.parent / "HC997" / "table1_mapped_to_schema.json",
+              HERE.parent / "HC997" / "table2_mapped_to_schema.json"]
+
+LEVELS = ("major", "sub", "minor", "unit")
+DIGITS = {"major": 1, "sub": 2, "minor": 3, "unit": 4}
+STATS  = ("count", "min", "median", "mean", "max")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 1. Inputs
+# ──────────────────────────────────────────────────────────────────────────────
+def load_units(snapshot=HERE / "soc2020.ndjson"):
+    """unitGroup, groupTitle, eligibleForSkilledWorker + the group titles."""
+    if pathlib.Path(snapshot).exists():
+        with open(snapshot, encoding="utf-8") as fh:
+            records = [json.loads(line) for line in fh if line.strip()]
+    else:
+        from getdata import (ELIGIBLE_FILE, SOC_FILE, build_records, eligibility,
+                             join_units, load_soc, read_sheet, title_tables, UNIT_COL)
+        desc, fw = load_soc(HERE / SOC_FILE)
+        joined = join_units(desc[desc[UNIT_COL].notna()], fw[fw["SOC2020 Unit Group"].notna()])
+        elig = eligibility(read_sheet(HERE / ELIGIBLE_FILE, 0, dtype=str))
+        records = build_records(joined, title_tables(fw), elig)
+    return pd.DataFrame(records)
+
+
+def load_rates(paths=RATE_FILES):
+    """One row per unit group with every rate* column found (outer join);
+    a unit group listed twice in one table keeps its first row."""
+    frames = []
+    for path in map(pathlib.Path, paths):
+        if path.exists():
+            df = pd.DataFrame(json.loads(path.read_text(encoding="utf-8"))).drop_duplicates("unitGroup")
+            frames.append(df.set_index("unitGroup").filter(regex=r"^rate"))
+    if not frames:
+        return pd.DataFrame(index=pd.Index([], name="unitGroup"))
+    return pd.concat(frames, axis=1).apply(pd.to_numeric, errors="coerce")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 2. Index
+# ──────────────────────────────────────────────────────────────────────────────
+class SocIndex:
+    """
+    Level arrays (all aligned by position within the level):
+      codes[lvl]        sorted int codes
+      parent[lvl]       position of the parent in the level above (-1 for major)
+      child_lo/hi[lvl]  children = codes[next level][lo:hi]
+      unit_lo/hi[lvl]   unit groups = codes["unit"][lo:hi]
+      rollup[lvl]       DataFrame of precomputed rollups, same order as codes
+    """
+
+    def __init__(self, units, rates=None):
+        units = units.sort_values("unitGroup").reset_index(drop=True)
+        ug = units["unitGroup"].to_numpy(np.int64)
+        self.codes = {lvl: np.unique(ug // 10 ** (4 - DIGITS[lvl])) for lvl in LEVELS}
+        self.titles = {}
+        for code_col, title_col in (("majorGroup", "majorGroupTitle"), ("subMajorGroup", "subMajorGroupTitle"),
+                                    ("minorGroup", "minorGroupTitle"), ("unitGroup", "groupTitle")):
+            self.titles.update(units.drop_duplicates(code_col).set_index(code_col)[title_col].to_dict())
+
+        self.parent, self.child_lo, self.child_hi, self.unit_lo, self.unit_hi = {}, {}, {}, {}, {}
+        unit_codes = self.codes["unit"]
+        for i, lvl in enumerate(LEVELS):
+            codes = self.codes[lvl]
+            scale = 10 ** (4 - DIGITS[lvl])
+            self.unit_lo[lvl] = np.searchsorted(unit_codes, codes * scale)
+            self.unit_hi[lvl] = np.searchsorted(unit_codes, (codes + 1) * scale)
+            if i:
+                self.parent[lvl] = np.searchsorted(self.codes[LEVELS[i - 1]], codes // 10)
+            else:
+                self.parent[lvl] = np.full(len(codes), -1)
+            if i < len(LEVELS) - 1:
+                nxt = self.codes[LEVELS[i + 1]]
+                self.child_lo[lvl] = np.searchsorted(nxt, codes * 10)
+                self.child_hi[lvl] = np.searchsorted(nxt, codes * 10 + 10)
+        self._pos = {(lvl, int(c)): p for lvl in LEVELS for p, c in enumerate(self.codes[lvl])}
+
+        # unit-level facts, in unit-code order
+        facts = units.set_index("unitGroup")[["eligibleForSkilledWorker"]].astype(float)
+        if rates is not None and len(rates.columns):
+            facts = facts.join(rates, how="left")
+        self.rate_columns = [c for c in facts.columns if c.startswith("rate")]
+        self.units = facts
+        self.rollup = {lvl: self._rollups(lvl) for lvl in LEVELS}
+
+    # ── rollups ──────────────────────────────────────────────────────────────
+    def _rollups(self, lvl):
+        key = self.units.index.to_numpy() // 10 ** (4 - DIGITS[lvl])
+        grouped = self.units.groupby(key, sort=True)
+        elig = grouped["eligibleForSkilledWorker"]
+        out = pd.DataFrame({
+            "unitGroups":        grouped.size(),
+            "eligibleUnitGroups": elig.sum().astype(int),
+            "eligibleShare":     elig.mean(),
+        })
+        if self.rate_columns:
+            stats = grouped[self.rate_columns].agg(list(STATS))
+            stats.columns = [f"{col}_{stat}" for col, stat in stats.columns]
+            out = out.join(stats)
+        out.index.name = lvl
+        return out.reindex(self.codes[lvl])
+
+    # ── navigation ───────────────────────────────────────────────────────────
+    @staticmethod
+    def level_of(code):
+        return LEVELS[len(str(int(code))) - 1]
+
+    def node(self, code):
+        """(level, position) of `code`; KeyError if it isn't in the index."""
+        lvl = self.level_of(code)
+        return lvl, self._pos[(lvl, int(code))]
+
+    def __contains__(self, code):
+        try:
+            self.node(code)
+        except (KeyError, IndexError):
+            return False
+        return True
+
+    def title(self, code):
+        return self.titles.get(int(code))
+
+    def parent_of(self, code):
+        lvl, p = self.node(code)
+        if lvl == "major":
+            return None
+        up = LEVELS[LEVELS.index(lvl) - 1]
+        return int(self.codes[up][self.parent[lvl][p]])
+
+    def children(self, code):
+        lvl, p = self.node(code)
+        if lvl == "unit":
+            return self.codes["unit"][:0]
+        nxt = LEVELS[LEVELS.index(lvl) + 1]
+        return self.codes[nxt][self.child_lo[lvl][p]:self.child_hi[lvl][p]]
+
+    def unit_range(self, code):
+        """[lo, hi) of `code`'s unit groups within codes["unit"]."""
+        lvl, p = self.node(code)
+        return int(self.unit_lo[lvl][p]), int(self.unit_hi[lvl][p])
+
+    def descendants(self, code, level="unit"):
+        """Codes at `level` under `code` (a contiguous, sorted view)."""
+        lo, hi = self.unit_range(code)
+        units = self.codes["unit"][lo:hi]
+        return units if level == "unit" else np.unique(units // 10 ** (4 - DIGITS[level]))
+
+    def ancestors(self, code):
+        code, out = int(code), []
+        while (code := self.parent_of(code)) is not None:
+            out.append(code)
+        return out[::-1]
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def rollup_of(self, code):
+        lvl, p = self.node(code)
+        return self.rollup[lvl].iloc[p]
+
+    def units_under(self, code):
+        """Unit-level rows (title, eligibility, rates) under `code`."""
+        lo, hi = self.unit_range(code)
+        out = self.units.iloc[lo:hi].copy()
+        out.insert(0, "groupTitle", [self.titles[int(u)] for u in out.index])
+        return out
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 3. CLI
+# ──────────────────────────────────────────────────────────────────────────────
+def load_index():
+    return SocIndex(load_units(), load_rates())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SOC 2020 hierarchy + going-rate rollups")
+    ap.add_argument("code", nargs="?", type=int)
+    ap.add_argument("--level", choices=LEVELS, default="unit",
+                    help="level of the descendants to list")
+    ap.add_argument("--rate", default="rateADAmount", help="rate column to summarise")
+    ap.add_argument("--rollups", choices=LEVELS, help="dump one level's rollups as CSV")
+    args = ap.parse_args(argv)
+
+    idx = load_index()
+    if args.rollups:
+        idx.rollup[args.rollups].to_csv(sys.stdout)
+        return
+    if args.code is None:
+        ap.error("give a SOC code or --rollups LEVEL")
+    if args.code not in idx:
+        ap.error(f"{args.code} is not a SOC 2020 code")
+
+    path = " ➜ ".join(f"{c} {idx.title(c)}" for c in idx.ancestors(args.code) + [args.code])
+    print(path)
+    r = idx.rollup_of(args.code)
+    print(f"  {r['unitGroups']:.0f} unit groups, {r['eligibleUnitGroups']:.0f} Skilled-Worker eligible")
+    if f"{args.rate}_median" in r:
+        print(f"  {args.rate}: median {r[f'{args.rate}_median']:,.2f} "
+              f"(min {r[f'{args.rate}_min']:,.2f}, max {r[f'{args.rate}_max']:,.2f}, "
+              f"n={r[f'{args.rate}_count']:.0f})")
+    for c in idx.descendants(args.code, args.level):
+        print(f"    {c}  {idx.title(c)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+table_export.py
+–––––––––––––––
+One export layer for every table the scripts write: Excel, CSV and
+Parquet from the same call.
+
+• export({sheet: DataFrame}, "out.xlsx", formats=("xlsx", "csv", "parquet"))
+  xlsx    → one workbook, one sheet per table, written by xlsxwriter in
+            constant_memory mode (each row is flushed as soon as it is
+            complete, so memory stays flat however long the sheet is)
+  csv     → <stem>.csv for a single table, <stem>.<sheet>.csv otherwise
+  parquet → likewise, next to the workbook
+• Column rules are declared by column name instead of hand-built
+  xlsxwriter formats – width, wrap, num_format:
+      {"Related job titles": {"width": 50, "wrap": True}, "*": {"width": 12}}
+  "*" applies to every column without a rule of its own.
+• Cells go through the typed xlsxwriter calls (write_string,
+  write_number …): text that looks like a formula or URL stays text and
+  NaN / None / NaT become empty cells, as with DataFrame.to_excel.
+• A workbook is a single stream, so its sheets are written one after
+  the other; the CSV / Parquet files of all tables are written alongside
+  it on a thread pool (pandas' CSV writer and pyarrow release the GIL
+  for most of the work).
+• EXPORT_FORMATS (env, e.g. "csv,parquet") adds formats to every
+  script's default at once.  The workbook is always written: later
+  stages read it.  Without xlsxwriter it is written through openpyxl,
+  column rules included.
+
+Usage
+-----
+    from table_export import export
+    export({"Table 1": t1, "Table 1a": t1a}, "table_1_and_1a_data.xlsx")
+
+    EXPORT_FORMATS=csv,parquet python extract_table2.py
+"""
+
+from __future__ import annotations
+
+import datetime as dt, os, re, sys, warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+pd = lazy_import("pandas")
+try:
+    xlsxwriter = lazy_import("xlsxwriter")
+except ImportError:
+    xlsxwriter = None
+
+
+FORMATS = ("xlsx", "csv", "parquet")
+# the env var only adds formats: the workbook is a declared output of the callers
+EXTRA_FORMATS = tuple(f.strip() for f in os.environ.get("EXPORT_FORMATS", "").split(",") if f.strip())
+DEFAULT_FORMATS = tuple(dict.fromkeys(("xlsx", *EXTRA_FORMATS)))
+EXCEL_MAX_ROWS = 1_048_575  # one row is the header
+
+# the header style DataFrame.to_excel uses
+HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    "strings_to_urls": False,
+    "nan_inf_to_errors": True,
+    "remove_timezone": True,
+    "default_date_format": "yyyy-mm-dd hh:mm:ss",
+}
+
+
+# ------------------------------------------------------------------
+# 1. Column rules
+# ------------------------------------------------------------------
+def column_rule(columns: dict | None, name) -> dict:
+    """The rule for one column: its own, else "*", else none."""
+    columns = columns or {}
+    return columns.get(name, columns.get("*", {}))
+
+
+def _cell_format(rule: dict) -> dict:
+    props = {}
+    if rule.get("wrap"):
+        props.update(text_wrap=True, valign="top")
+    if rule.get("num_format"):
+        props["num_format"] = rule["num_format"]
+    return props
+
+
+def output_path(path: Path, sheet: str, fmt: str, single: bool) -> Path:
+    """<stem>.<fmt> for a single table, <stem>.<sheet>.<fmt> otherwise."""
+    if single:
+        return path.with_suffix(f".{fmt}")
+    slug = re.sub(r"[^\w.-]+", "_", str(sheet)).strip("_")
+    return path.with_name(f"{path.stem}.{slug}.{fmt}")
+
+
+# ------------------------------------------------------------------
+# 2. Writers
+# ------------------------------------------------------------------
+def _write_row(ws, r: int, row) -> None:
+    for c, v in enumerate(row):
+        if isinstance(v, str):
+            ws.write_string(r, c, v)
+        elif v is None or v is pd.NA or v is pd.NaT:
+            continue  # empty cell; the column format still applies
+        elif isinstance(v, bool):
+            ws.write_boolean(r, c, v)
+        elif isinstance(v, (int, float)):
+            if v == v:  # NaN → empty
+                ws.write_number(r, c, v)
+        elif isinstance(v, (dt.datetime, dt.date)):
+            ws.write_datetime(r, c, v)
+        else:
+            ws.write_string(r, c, str(v))
+
+
+def _check_rows(sheet, df: pd.DataFrame) -> None:
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{sheet}: {len(df):,} rows do not fit one Excel sheet – use parquet")
+
+
+def write_xlsx(tables: dict, path: str | Path, columns: dict | None = None) -> Path:
+    """All tables into one workbook, one sheet each, in constant memory."""
+    path = Path(path)
+    if xlsxwriter is None:
+        return _write_xlsx_openpyxl(tables, path, columns)
+
+    wb = xlsxwriter.Workbook(str(path), WORKBOOK_OPTIONS)
+    try:
+        header = wb.add_format(HEADER_FORMAT)
+        formats = {}  # one Format per distinct rule, shared across sheets
+        for sheet, df in tables.items():
+            _check_rows(sheet, df)
+            ws = wb.add_worksheet(str(sheet))
+            # column settings must precede the first row in constant_memory mode
+            for c, name in enumerate(df.columns):
+                rule = column_rule(columns, name)
+                props = _cell_format(rule)
+                fmt = None
+                if props:
+                    key = tuple(sorted(props.items()))
+                    if key not in formats:
+                        formats[key] = wb.add_format(props)
+                    fmt = formats[key]
+                if rule.get("width") is not None or fmt is not None:
+                    ws.set_column(c, c, rule.get("width"), fmt)
+            for c, name in enumerate(df.columns):
+                ws.write_string(0, c, str(name), header)
+            values = [df[col].tolist() for col in df.columns]
+            for r, row in enumerate(zip(*values), start=1):
+                _write_row(ws, r, row)
+    finally:
+        wb.close()
+    return path
+
+
+def _write_xlsx_openpyxl(tables: dict, path: Path, columns: dict | None) -> Path:
+    from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet, df in tables.items():
+            _check_rows(sheet, df)
+            df.to_excel(writer, sheet_name=str(sheet), index=False)
+            ws = writer.sheets[str(sheet)]
+            for c, name in enumerate(df.columns, start=1):
+                rule = column_rule(columns, name)
+                if rule.get("width") is not None:
+                    ws.column_dimensions[get_column_letter(c)].width = rule["width"]
+                if rule.get("wrap") or rule.get("num_format"):
+                    for (cell,) in ws.iter_rows(min_row=2, min_col=c, max_col=c):
+                        if rule.get("wrap"):
+                            cell.alignment = Alignment(wrap_text=True, vertical="top")
+                        if rule.get("num_format"):
+                            cell.number_format = rule["num_format"]
+    return path
+
+
+def write_csv(df: pd.DataFrame, path: str | Path) -> Path:
+    df.to_csv(path, index=False)
+    return Path(path)
+
+
+def write_parquet(df: pd.DataFrame, path: str | Path) -> Path:
+    """Parquet; object columns Arrow can't type (mixed str / float) are written as text."""
+    try:
+        df.to_parquet(path, index=False)
+    except (TypeError, ValueError) as e:  # ArrowTypeError / ArrowInvalid
+        mixed = [c for c in df.columns if df[c].dtype == object]
+        warnings.warn(f"{Path(path).name}: {e} – writing object columns {mixed} as text")
+        df = df.astype({c: "string" for c in mixed})
+        df.to_parquet(path, index=False)
+    return Path(path)
+
+
+WRITERS = {"csv": write_csv, "parquet": write_parquet}
+
+
+# ------------------------------------------------------------------
+# 3. One call, every format
+# ------------------------------------------------------------------
+def export(tables: dict, path: str | Path, formats=None, columns: dict | None = None,
+           workers: int | None = None) -> list[Path]:
+    """
+    Write {sheet name: DataFrame} as every format in `formats`
+    (default: xlsx plus EXPORT_FORMATS).  `path` names the workbook; the CSV /
+    Parquet files are derived from it.  Returns the files written.
+    """
+    path = Path(path)
+    formats = tuple(formats or DEFAULT_FORMATS)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s) {sorted(unknown)} – choose from {FORMATS}")
+
+    single = len(tables) == 1
+    jobs = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if "xlsx" in formats:
+            jobs.append(pool.submit(write_xlsx, tables, path.with_suffix(".xlsx"), columns))
+        for fmt in formats:
+            if fmt in WRITERS:
+                jobs += [pool.submit(WRITERS[fmt], df, output_path(path, sheet, fmt, single))
+                         for sheet, df in tables.items()]
+        return [job.result() for job in jobs]
+
+
+def main(argv=None):
+    """Re-export the sheets of an existing workbook, e.g. to CSV / Parquet."""
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Re-export the sheets of a workbook as Excel / CSV / Parquet")
+    ap.add_argument("workbook")
+    ap.add_argument("out", help="output path; suffix ignored, one file per sheet and format")
+    ap.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help=f"comma-separated: {','.join(FORMATS)}")
+    args = ap.parse_args(argv)
+
+    tables = pd.read_excel(args.workbook, sheet_name=None, dtype=str)
+    for p in export(tables, args.out, args.formats.split(",")):
+        print(p)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
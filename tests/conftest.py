@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# the modules under test live at the repo root (and in soc2020/, HC997/)
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path += [str(ROOT / "soc2020"), str(ROOT / "HC997")]
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
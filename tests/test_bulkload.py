@@ -0,0 +1,55 @@
+import json
+import sqlite3
+
+import pytest
+
+from bulkload import SqliteSink, apply_diff, copy_text, load
+
+COLUMNS = ["id", "title", "lines", "flag", "n"]
+
+
+def record(i, **over):
+    return {"id": f"r{i}", "title": f"Title {i}", "lines": [f"a{i}", f"b{i}"],
+            "flag": i % 2 == 0, "n": i, **over}
+
+
+def rows(path, table="T"):
+    con = sqlite3.connect(path)
+    try:
+        return con.execute(f'SELECT * FROM "{table}" ORDER BY "id"').fetchall()
+    finally:
+        con.close()
+
+
+def test_copy_text_escaping():
+    rec = {"id": "x", "title": "tab\there\nnew\\line\r", "lines": ['say "hi"', "back\\slash"],
+           "flag": True, "n": None}
+    assert copy_text([rec], COLUMNS) == (
+        "x\ttab\\there\\nnew\\\\line\\r"
+        '\t{"say \\\\"hi\\\\"","back\\\\\\\\slash"}'  # array quoting, then COPY escaping
+        "\tt\t\\N\n"
+    )
+    assert copy_text([{"id": "y", "n": float("nan")}], ["id", "n", "missing"]) == "y\t\\N\t\\N\n"
+
+
+def test_load_and_diff_through_sqlite(tmp_path):
+    db = tmp_path / "t.sqlite"
+    stats = load((record(i) for i in range(7)), SqliteSink(db, table="T", columns=COLUMNS), batch_size=3)
+    assert (stats["rows"], stats["batches"]) == (7, 3)
+    assert rows(db)[0] == ("r0", "Title 0", '["a0", "b0"]', 1, 0)
+
+    ops = [{"op": "upsert", **record(1, title="Renamed")}, {"op": "upsert", **record(9)},
+           {"op": "delete", "id": "r2"}]
+    assert apply_diff(ops, SqliteSink(db, table="T", columns=COLUMNS), batch_size=2) == (2, 1)
+    got = {r[0]: r for r in rows(db)}
+    assert len(got) == 7 and "r2" not in got
+    assert got["r1"][1] == "Renamed" and json.loads(got["r9"][2]) == ["a9", "b9"]
+
+
+def test_load_closes_the_sink_on_error(tmp_path):
+    sink = SqliteSink(tmp_path / "t.sqlite", table="T", columns=COLUMNS)
+    dupes = [record(1), record(1)]
+    with pytest.raises(sqlite3.IntegrityError):
+        load(dupes, sink)
+    with pytest.raises(sqlite3.ProgrammingError):  # closed
+        sink.con.execute("SELECT 1")
@@ -0,0 +1,68 @@
+import zipfile
+
+import pytest
+
+from ch_bulk import BulkIndex, api_status, build_index
+from conftest import FIXTURES
+
+SAMPLE = FIXTURES / "BasicCompanyData-sample.csv"
+
+
+@pytest.fixture(params=["csv", "zip"])
+def index(request, tmp_path):
+    src = SAMPLE
+    if request.param == "zip":
+        src = tmp_path / "BasicCompanyDataAsOneFile-2024-10-01.zip"
+        with zipfile.ZipFile(src, "w") as zf:
+            zf.write(SAMPLE, "BasicCompanyDataAsOneFile-2024-10-01.csv")
+    path = tmp_path / "ch_bulk.sqlite"
+    assert build_index(src, path) == 5  # the truncated last row is skipped
+    idx = BulkIndex(path)
+    yield idx
+    idx.close()
+
+
+def test_by_number(index):
+    rec = index.by_number(" sc123456 ")
+    assert rec == {
+        "company_number": "SC123456",
+        "title": "A & B STORES LTD.",
+        "company_status": "liquidation",
+        "sic_codes": ["47110"],
+        "postcode": "G1 1AA",
+    }
+    assert index.by_number("00000000") is None
+
+
+def test_by_name_normalised_prefers_active(index):
+    # "Spice Kitchen Ltd" and "… LIMITED" share a name key; the active one wins
+    rec = index.by_name("Spice Kitchen Limited")
+    assert rec["company_number"] == "09876543"
+    assert rec["sic_codes"] == ["56101", "56103"]
+    assert index.by_name("a and b stores")["company_number"] == "SC123456"
+    assert index.by_name("Nowhere Ltd") is None
+
+
+def test_status_uses_api_vocabulary(index):
+    rec = index.by_number("11223344")
+    assert rec["company_status"] == "active"
+    assert rec["company_status_detail"] == "active-proposal-to-strike-off"
+    assert index.by_number("12345678")["company_status"] == "administration"
+    assert index.by_number("12345678")["sic_codes"] == []  # "None Supplied"
+
+
+def test_candidates_by_block_key(index):
+    cands = index.candidates(["SPICE", "", "GOLDEN"])
+    assert sorted(cands.numbers) == ["01234567", "09876543", "11223344", "12345678"]
+    assert len(index.candidates(["SPIC"])) == 0  # whole first token only
+
+
+@pytest.mark.parametrize("bulk, api", [
+    ("Active", ("active", None)),
+    ("Dissolved", ("dissolved", None)),
+    ("Voluntary Arrangement", ("voluntary-arrangement", None)),
+    ("Converted / Closed", ("converted-closed", None)),
+    ("Some New Status", ("some-new-status", None)),
+])
+def test_api_status(bulk, api):
+    assert api_status(bulk) == api
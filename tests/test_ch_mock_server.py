@@ -0,0 +1,56 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ch_mock_server import MockCompaniesHouse, company_number, search
+
+AUTH = {"Authorization": "Basic dGVzdDo="}  # "test:"
+
+
+def get(url, headers=AUTH):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as r:
+            return r.status, dict(r.headers), json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def test_answers_are_deterministic():
+    assert search("spice  kitchen", 5) == search("SPICE KITCHEN", 5)
+    assert company_number("Spice Kitchen") == company_number("SPICE KITCHEN")
+
+
+def test_quota_answers_429_with_whole_second_retry_after():
+    with MockCompaniesHouse(quota=1, window=1.5) as server:
+        assert get(server.url + "/company/01234567", headers={})[0] == 401
+        status, _, body = get(server.url + "/company/01234567")
+        assert status == 200 and body["company_number"] == "01234567"
+
+        status, headers, _ = get(server.url + "/search/companies?q=spice&items_per_page=5")
+        assert status == 429 and headers["Retry-After"] == "2"
+        assert server.stats() == {"company": 2, "search": 1,
+                                  "status_401": 1, "status_200": 1, "status_429": 1}
+
+
+def test_ch_get_waits_out_retry_after(monkeypatch):
+    for dep in ("bs4", "requests", "tqdm"):
+        pytest.importorskip(dep)
+    import illegal_penalties_workflow as wf
+
+    sleeps, sleep = [], wf.time.sleep
+    monkeypatch.setattr(wf.time, "sleep", lambda s: (sleeps.append(s), sleep(s)))
+    monkeypatch.setattr(wf, "CH_KEY", "test")
+    monkeypatch.setattr(wf, "_ch_cache", {})
+    monkeypatch.setattr(wf, "CH_STATS", wf.Counter())
+    wf.ch_session.cache_clear()
+
+    with MockCompaniesHouse(quota=1, window=1.0) as server:
+        monkeypatch.setattr(wf, "CH_API_URL", server.url)
+        assert wf.ch_get("/company/01234567")["company_number"] == "01234567"
+        assert wf.ch_get("/company/07654321")["company_number"] == "07654321"
+    wf.ch_session.cache_clear()
+
+    assert sleeps == [1.0]  # Retry-After: 1, longer than the first back-off step
+    assert wf.CH_STATS["throttled"] == 1 and wf.CH_STATS["requests"] == 3
@@ -0,0 +1,81 @@
+import json
+
+import pandas as pd
+import pytest
+
+for _dep in ("bs4", "requests", "tqdm"):
+    pytest.importorskip(_dep)
+
+import illegal_penalties_workflow as wf  # noqa: E402
+
+COMPANIES = {"Spice Kitchen": "01234567", "Golden Stores": "07654321"}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Stub ch_get: search / company / officers for COMPANIES; names in `down` fail."""
+    down, calls = set(), []
+
+    def ch_get(endpoint):
+        calls.append(endpoint)
+        if endpoint.startswith("/search/companies"):
+            q = endpoint.split("q=", 1)[1].split("&", 1)[0].replace("+", " ")
+            if q in {n.upper() for n in down}:
+                raise wf.ChUnavailable(endpoint)
+            return {"items": [{"company_number": num, "title": f"{name.upper()} LTD"}
+                              for name, num in COMPANIES.items() if name.upper() == q]}
+        if endpoint.endswith("/officers?items_per_page=100"):
+            return {"items": [{"nationality": "british"}]}
+        return {"sic_codes": ["56101"], "company_status": "active"}
+
+    monkeypatch.setattr(wf, "ch_get", ch_get)
+    monkeypatch.setattr(wf, "CH_KEY", "test")
+    monkeypatch.setattr(wf, "CH_DELAY", 0.0)
+    monkeypatch.setattr(wf, "CH_BULK_INDEX", None)
+    wf.ch_bulk_index.cache_clear()
+    return down, calls
+
+
+def penalties(*names):
+    return pd.DataFrame({
+        "liable_party": list(names), "business_name": list(names), "address": "1 High St",
+        "postcode": "E1 6AN", "penalty_value": [10_000.0 * (i + 1) for i in range(len(names))],
+    })
+
+
+def test_unavailable_rows_are_not_journaled(api, tmp_path):
+    down, calls = api
+    journal = tmp_path / "journal.jsonl"
+    df = penalties("Spice Kitchen Ltd", "Golden Stores Limited", "Nobody Ltd")
+    down.add("Golden Stores")
+
+    first = wf.enrich(df, str(journal))
+    assert list(first.columns) == list(wf.NO_MATCH)
+    assert first["company_number"].tolist() == ["01234567", "", ""]
+    assert first.loc[0, "status"] == "active" and first.loc[0, "director_nationalities"] == "British"
+    assert first.loc[1].to_dict() == wf.NO_MATCH  # unavailable: every column filled
+    assert first.loc[2, "sic_codes"] == ""  # no match: same shape
+    assert len(wf.load_journal(str(journal))) == 2
+
+    down.clear()
+    calls.clear()
+    second = wf.enrich(df, str(journal))
+    assert second["company_number"].tolist() == ["01234567", "07654321", ""]
+    assert all("GOLDEN" in c or "07654321" in c for c in calls)  # only the failed row re-ran
+    assert len(wf.load_journal(str(journal))) == 3
+
+
+def test_torn_journal_line_is_repaired(api, tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    df = penalties("Spice Kitchen Ltd", "Golden Stores Limited")
+    wf.enrich(df, str(journal))
+    first, second = journal.read_text(encoding="utf-8").splitlines()
+    # a foreign line, then a run killed while writing the second row
+    journal.write_text(first + "\n" + '{"no key": 1}\n' + second[:30], encoding="utf-8")
+
+    assert len(wf.load_journal(str(journal))) == 1  # torn and foreign lines skipped
+    out = wf.enrich(df, str(journal))
+    assert out["company_number"].tolist() == ["01234567", "07654321"]
+    lines = journal.read_text(encoding="utf-8").splitlines()
+    assert all(isinstance(json.loads(line), dict) for line in lines)  # appends start clean
+    assert len(wf.load_journal(str(journal))) == 2
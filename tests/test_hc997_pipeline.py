@@ -0,0 +1,91 @@
+import importlib.util, json, sys
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+# the extractors only need pdfplumber.open(), which the fixture below replaces;
+# without the package installed they would not import at all
+_placeholder = importlib.util.find_spec("pdfplumber") is None
+if _placeholder:
+    sys.modules["pdfplumber"] = ModuleType("pdfplumber")
+import extract_table1  # noqa: E402
+import extract_table2  # noqa: E402
+if _placeholder:
+    del sys.modules["pdfplumber"]
+
+import hc997_pipeline  # noqa: E402
+import schema_mapper  # noqa: E402
+import workbook_cache  # noqa: E402
+
+# canned page.extract_tables() output, by 0-based page index
+TABLE1_HEADER = ["SOC 2020 occupation code", "Examples of related job titles (non-exclusive)",
+                 "Going rate (SW – options A and D)", "90% of going rate (SW – option B)",
+                 "80% of going rate (SW – option C)", "70% of going rate (SW – option E)",
+                 "Eligible for PhD points (SW)?"]
+PAGES = {
+    12: [[TABLE1_HEADER,
+          ["1111 Chief\nexecutives and senior\nofficials", "Chief executive\nManaging director",
+           "£117,000 (£60.00 per hour)", "£105,300 (£54.00 per hour)", "£93,600 (£48.00 per hour)",
+           "£81,900 (£42.00 per hour)", "Yes"],
+          ["2136 Programmers and\nsoftware development\nprofessionals", "Software developer",
+           "£58,500 (£30.00 per hour)", "£52,650 (£27.00 per hour)", "£46,800 (£24.00 per hour)",
+           "£40,950 (£21.00 per hour)", "Yes"],
+          ["3556 Sales accounts and\nbusiness development\nmanagers", "Account manager",
+           "£42,900 (£22.00 per hour)", "£38,610 (£19.80 per hour)", "£34,320 (£17.60 per hour)",
+           "£30,030 (£15.40 per hour)", "No"]]],
+    40: [[["1150 Managers and\ndirectors in retail\nand wholesale", "Shop manager",
+           "£39,000 (£20.00 per hour)", "£35,100 (£18.00 per hour)", "£31,200 (£16.00 per hour)",
+           "£27,300 (£14.00 per hour)", "No"],
+          ["9249 Elementary sales\noccupations n.e.c.", "Sales assistant",
+           "Not applicable", "Not applicable", "Not applicable", "Not applicable", "No"]]],
+    59: [[["SOC 2020 occupation code", "Equivalent SOC 2010 occupation code(s)", "Examples", "Going rate",
+           "90%", "80%", "70%", "PhD?"],
+          ["1111 Chief\nexecutives and senior\nofficials", "1115", "Chief executive\nManaging director",
+           "£117,000 (£60.00 per hour)", "£105,300 (£54.00 per hour)", "£93,600 (£48.00 per hour)",
+           "£81,900 (£42.00 per hour)", "Yes"],
+          ["2136 Programmers and\nsoftware development\nprofessionals", "2136, 2137", "Software developer",
+           "£58,500 (£30.00 per hour)", "£52,650 (£27.00 per hour)", None, None, "Yes"],
+          ["3556 Sales accounts and\nbusiness development\nmanagers", None, "Account manager",
+           "£42,900 (£22.00 per hour)", "£38,610 (£19.80 per hour)", "£34,320 (£17.60 per hour)",
+           "£30,030 (£15.40 per hour)", "No"]]],
+}
+
+
+class FakePdf:
+    pages = [SimpleNamespace(extract_tables=lambda i=i: PAGES.get(i, []), extract_text=lambda: "")
+             for i in range(121)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def fake_pdfplumber(monkeypatch, tmp_path):
+    fake = SimpleNamespace(open=lambda path: FakePdf())
+    monkeypatch.setattr(extract_table1, "pdfplumber", fake)
+    monkeypatch.setattr(extract_table2, "pdfplumber", fake)
+    monkeypatch.setattr(workbook_cache, "CACHE_DIRNAME", str(tmp_path / "cache"))
+
+
+def test_in_memory_path_matches_excel_round_trip(tmp_path, monkeypatch):
+    direct, workbooks = tmp_path / "direct", tmp_path / "workbooks"
+    direct.mkdir()
+    workbooks.mkdir()
+    monkeypatch.setattr(hc997_pipeline, "HC997_DIR", workbooks)
+
+    counts = hc997_pipeline.run("fake.pdf", out_dir=direct, excel=True)
+    assert counts == {"table1_mapped_to_schema.json": 3, "table2_mapped_to_schema.json": 3}
+
+    for spec in (hc997_pipeline.TABLE1_SPEC, hc997_pipeline.TABLE2_SPEC):
+        schema_mapper.run(spec, base=workbooks)
+        expected = json.loads((workbooks / spec["output"]).read_text(encoding="utf-8"))
+        assert json.loads((direct / spec["output"]).read_text(encoding="utf-8")) == expected
+
+    table1 = json.loads((direct / "table1_mapped_to_schema.json").read_text(encoding="utf-8"))
+    assert table1[0] == {"unitGroup": 1111, "groupTitle": "Chief executives and senior officials",
+                         "rateADAmount": 117000.0, "rateADRate": 60.0, "rateBAmount": 105300.0,
+                         "rateBRate": 54.0, "rateCAmount": 93600.0, "rateCRate": 48.0,
+                         "rateEAmount": 81900.0, "rateERate": 42.0, "eligibleForPhD": True}
@@ -0,0 +1,43 @@
+import pytest
+
+from name_matching import CandidateSet, block_key, match_names, normalize, variants
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("A & B Stores Ltd.", "A AND B STORES"),
+    ("a and b stores limited", "A AND B STORES"),
+    ("The Spice Kitchen (UK) Ltd", "SPICE KITCHEN"),
+    ("Mr  Ali   Khan", "ALI KHAN"),
+    ("Limited", "LIMITED"),  # a lone suffix is the name
+    (None, ""),
+])
+def test_normalize(raw, key):
+    assert normalize(raw) == key
+
+
+def test_variants_business_first():
+    assert variants("Mr Ali Khan trading as Spice Kitchen Ltd") == ["SPICE KITCHEN", "ALI KHAN"]
+    assert variants("Ali Khan t/a Ali Khan") == ["ALI KHAN"]
+    assert block_key("SPICE KITCHEN") == "SPICE"
+
+
+PAIRS = [("01234567", "SPICE KITCHEN LIMITED"), ("07654321", "GOLDEN STORES LTD"),
+         ("09999999", "ROYAL SPICE KITCHEN LTD"), ("05555555", "GOLDEN STAR LTD")]
+
+
+def test_match_names_bulk():
+    out = match_names(["Spice Kitchen Ltd", "Mr X trading as Golden Store", "Nobody Ltd", ""],
+                      CandidateSet(PAIRS))
+    assert out["company_number"].tolist() == ["01234567", "07654321", "", ""]
+    assert out["official_title"].iloc[0] == "SPICE KITCHEN LIMITED"
+    assert out["match_confidence"].iloc[0] == 1.0
+    assert 0.85 <= out["match_confidence"].iloc[1] < 1.0
+    assert out["match_confidence"].iloc[2] == 0.0
+
+
+def test_unblocked_set_keeps_search_hits_with_another_first_word():
+    # the search API's hit for "Kitchen Royal Spice" starts with "ROYAL"
+    query = ["Kitchen Royal Spice Ltd"]
+    assert match_names(query, CandidateSet(PAIRS[2:3]))["company_number"].tolist() == [""]
+    hit = match_names(query, CandidateSet(PAIRS[2:3], blocking=False))
+    assert hit["company_number"].tolist() == ["09999999"]
@@ -0,0 +1,62 @@
+import json
+import sqlite3
+
+import pandas as pd
+
+import occupation_db
+
+
+def units():
+    rows = []
+    for code, title, eligible in ((2136, "Programmers and software development professionals", True),
+                                  (5431, "Butchers", False)):
+        rows.append({"unitGroup": code, "groupTitle": title,
+                     "majorGroup": code // 1000, "majorGroupTitle": f"Major {code // 1000}",
+                     "subMajorGroup": code // 100, "subMajorGroupTitle": f"Sub-major {code // 100}",
+                     "minorGroup": code // 10, "minorGroupTitle": f"Minor {code // 10}",
+                     "groupsClassifiedWithin": None, "groupDescription": f"{title} do things.",
+                     "entryRoutes": None, "tasks": None,
+                     "relatedJobTitles": json.dumps(["Software developer"] if code == 2136 else []),
+                     "eligibleForSkilledWorker": eligible})
+    return pd.DataFrame(rows).set_index("unitGroup")
+
+
+TABLES = {
+    "Table 2aa": pd.DataFrame({
+        "SOC 2020 occupation code": ["2136 Programmers and software development professionals",
+                                     "2136 Programmers (repeated)"],
+        "Going rate (SW – options F and I, GBM and SCU)": ["£49,400 (£25.33 per hour)", "£1 (£0.01 per hour)"],
+        "90% of going rate (SW – option G)": ["£44,460 (£22.80 per hour)", None],
+        "80% of going rate (SW – option H)": ["£39,520 (£20.27 per hour)", None],
+        "70% of going rate (SW – option J, GTR)": ["£34,580 (£17.73 per hour)", None],
+        "Eligible for PhD points (SW)?": ["Yes", "No"],
+    }),
+    "Table 3a": pd.DataFrame({
+        "SOC 2020 occupation code": ["2136 Programmers and software development professionals"],
+        "Going rate per hour": ["£25.33 per hour"],
+        "New entrant rate per hour": ["£17.73 per hour"],
+    }),
+}
+
+
+def test_occupation_row_by_primary_key(tmp_path):
+    frame = occupation_db.build_frame(units(), occupation_db.load_rates(TABLES))
+    path = occupation_db.write_db(frame, tmp_path / "occupations.sqlite")
+    assert not (tmp_path / "occupations.sqlite.tmp").exists()
+
+    row = occupation_db.lookup(2136, path)
+    assert row["groupTitle"] == "Programmers and software development professionals"
+    assert (row["majorGroup"], row["subMajorGroup"], row["minorGroup"]) == (2, 21, 213)
+    assert row["eligibleForSkilledWorker"] == 1 and row["phd"] == 1
+    assert row["rateTables"] == "Table 2aa, Table 3a"
+    assert row["t2aa_base_amount"] == 49400.0 and row["t2aa_p70_rate"] == 17.73  # first of the duplicates
+    assert row["t3a_new_entrant_rate"] == 17.73
+    assert json.loads(row["relatedJobTitles"]) == ["Software developer"]
+
+    row = occupation_db.lookup(5431, path)
+    assert row["eligibleForSkilledWorker"] == 0 and row["rateTables"] is None and row["t2aa_base_amount"] is None
+    assert occupation_db.lookup(9999, path) is None
+
+    with sqlite3.connect(path) as con:
+        plan = con.execute(f'EXPLAIN QUERY PLAN SELECT * FROM "{occupation_db.TABLE}" WHERE "unitGroup" = 2136')
+        assert "INTEGER PRIMARY KEY" in plan.fetchone()[-1]
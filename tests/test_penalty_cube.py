@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+import penalty_cube
+import penalty_store
+
+
+def quarter(sic_codes, nationalities):
+    n = len(sic_codes)
+    return pd.DataFrame({
+        "liable_party": [f"Party {i}" for i in range(n)],
+        "postcode": ["E1 6AN"] * n,
+        "penalty_value": [10_000.0] * n,
+        "company_number": [f"0000000{i}" for i in range(n)],
+        "sic_codes": sic_codes,
+        "director_nationalities": nationalities,
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    # penalty 0 fans out to 2 sections × 2 nationalities = 4 cells
+    penalty_store.append_quarter(
+        quarter(["56101;47110", "56103"], ["Indian;British", "Turkish"]), "2024_Q3", tmp_path
+    )
+    assert penalty_cube.refresh_cube(tmp_path) == ["2024_Q3"]
+    return tmp_path
+
+
+def test_allocated_measures_sum_to_the_truth(store):
+    by_quarter = penalty_cube.slice_cube(store, by=["quarter"])
+    assert list(by_quarter.columns) == ["quarter", *penalty_cube.ADDITIVE]
+    assert by_quarter["penalties_allocated"].tolist() == [2.0]
+    assert by_quarter["penalty_allocated"].tolist() == [20_000.0]
+
+    cells = penalty_cube.slice_cube(store, by=penalty_cube.DIMENSIONS)
+    assert len(cells) == 5
+    assert cells["penalties"].sum() == 5  # cells touched, not penalties
+    assert cells["penalties_allocated"].sum() == pytest.approx(2.0)
+
+    section_i = penalty_cube.slice_cube(store, by=["sic_section"], sic_section="I")
+    assert section_i["penalties_allocated"].tolist() == [1.5]
+
+
+def test_refresh_rebuilds_after_re_enrichment(store):
+    assert penalty_cube.refresh_cube(store) == []
+    penalty_store.append_quarter(
+        quarter(["56101", "56103"], ["Indian", "Turkish"]), "2024_Q3", store, overwrite=True
+    )
+    assert penalty_cube.refresh_cube(store) == ["2024_Q3"]
+    cells = penalty_cube.slice_cube(store, by=penalty_cube.DIMENSIONS)
+    assert cells["penalties"].tolist() == [1, 1]
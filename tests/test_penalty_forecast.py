@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from penalty_forecast import _range, forecast_cube, postcode_level, scenario_grid
+
+
+@pytest.mark.parametrize("spec, cast, expected", [
+    ("0:0.2:0.1", float, [0.0, 0.1, 0.2]),
+    ("1-4", int, [1, 2, 3, 4]),
+    ("0.1,-0.05", float, [0.1, -0.05]),
+    ("-0.05", float, [-0.05]),
+])
+def test_range(spec, cast, expected):
+    assert _range(spec, cast).tolist() == pytest.approx(expected)
+
+
+def test_scenario_grid_compounds_per_quarter():
+    grid = scenario_grid([0.1, -0.05], [1, 2], "2024_Q4")
+    assert grid["period"].tolist() == ["2025_Q1", "2025_Q2"] * 2
+    assert grid["factor"].to_numpy() == pytest.approx([1.1, 1.21, 0.95, 0.9025])
+
+
+def test_forecast_cube_splits_by_share():
+    df = pd.DataFrame({"postcode": ["E1 6AN", "e1 7aa", "LS1 4AP", None],
+                       "penalty_value": [10_000.0, 30_000.0, 60_000.0, 0.0]})
+    assert postcode_level(df["postcode"], "sector").tolist() == ["E1 6", "E1 7", "LS1 4", "n/a"]
+    cube = forecast_cube(df, scenario_grid([0.5], [1, 2]), level="district")
+    assert len(cube) == 2 * 3
+    q4 = cube[cube["horizon"] == 1].set_index("region")["forecast_penalty"]
+    assert q4.to_dict() == {"E1": 60_000.0, "LS1": 90_000.0, "n/a": 0.0}
+    assert np.isclose(cube["forecast_penalty"].sum(), 100_000 * (1.5 + 2.25))
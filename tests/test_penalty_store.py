@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+import penalty_cube
+import penalty_store
+from conftest import FIXTURES
+from postcode_index import PostcodeIndex, build_index, geo_enrich
+
+ONSPD = FIXTURES / "ONSPD-sample.csv"
+
+
+@pytest.fixture(scope="module")
+def postcodes(tmp_path_factory):
+    out = tmp_path_factory.mktemp("onspd")
+    assert build_index(ONSPD, out) == 5  # the terminated LS1 4AP row is dropped
+    return PostcodeIndex(out)
+
+
+def quarter(*postcodes_):
+    n = len(postcodes_)
+    return pd.DataFrame({
+        "liable_party": [f"Party {i}" for i in range(n)],
+        "business_name": [f"Business {i}" for i in range(n)],
+        "address": ["1 High Street"] * n,
+        "postcode": list(postcodes_),
+        "penalty_value": [10_000.0 * (i + 1) for i in range(n)],
+        "company_number": ["01234567"] + [None] * (n - 1),
+        "match_confidence": [1.0] + [0.0] * (n - 1),
+    })
+
+
+def test_postcode_lookup(postcodes):
+    geo = postcodes.lookup(pd.Series(["ls14ap", "GY1 1AA", "ZZ9 9ZZ"]))
+    assert geo["region"].tolist()[0] == "Yorkshire and The Humber"
+    assert geo["lat"].iloc[0] == pytest.approx(53.79969)  # live row, not the terminated one
+    assert pd.isna(geo["lat"].iloc[1])  # 99.999999 = no grid reference
+    assert pd.isna(geo["region_code"].iloc[2])
+
+
+def test_postcode_lookup_edge_cases(postcodes, tmp_path):
+    assert postcodes.positions(pd.Series(["SW1A1AAX", "SW1A 1AA"])).tolist()[0] == -1
+    assert postcodes.positions(pd.Series(["SW1A 1AA"])).tolist()[0] >= 0
+
+    empty = tmp_path / "empty.csv"
+    empty.write_text(ONSPD.read_text().splitlines()[0] + "\n")
+    build_index(empty, tmp_path / "empty")
+    assert PostcodeIndex(tmp_path / "empty").positions(pd.Series(["E1 6AN"])).tolist() == [-1]
+
+    once = geo_enrich(quarter("E1 6AN"), postcodes)
+    twice = geo_enrich(once, postcodes)
+    assert list(twice.columns) == list(once.columns)
+    assert twice["region"].tolist() == ["London"]
+
+
+def test_quarters_with_and_without_geo(postcodes, tmp_path):
+    # a quarter stored before POSTCODE_INDEX was set, then one enriched by it
+    penalty_store.append_quarter(quarter("E1 6AN", "LS1 4AP"), "2024_Q2", tmp_path)
+    enriched = geo_enrich(quarter("SW1A 1AA", "CF10 1EP", "ZZ9 9ZZ"), postcodes)
+    penalty_store.append_quarter(enriched, "2024_Q3", tmp_path)
+
+    df = penalty_store.load(tmp_path)
+    assert len(df) == 5
+    assert df["lat"].dtype == "float32"
+    q3 = df[df["quarter"] == "2024_Q3"].set_index("postcode")
+    assert q3.loc["SW1A 1AA", "region"] == "London"
+    assert q3.loc["CF10 1EP", "la_code"] == "W06000015"
+    assert df.loc[df["quarter"] == "2024_Q2", "region_code"].isna().all()
+
+    by_region = penalty_store.trend(tmp_path, by="region")
+    assert by_region["penalties"].sum() == 5
+    assert set(by_region.loc[by_region["quarter"] == "2024_Q3", "region"]) >= {"London", "Wales"}
+
+    assert penalty_cube.refresh_cube(tmp_path) == ["2024_Q2", "2024_Q3"]
+    assert not penalty_cube.slice_cube(tmp_path, by=["quarter"]).empty
+
+
+def test_fresh_store(tmp_path):
+    df = penalty_store.load(tmp_path / "none")
+    assert df.empty and "region_code" in df and "status" in df
+    assert penalty_store.trend(tmp_path / "none", by="region").empty
+    assert penalty_store.trend(tmp_path / "none", by="status").empty
@@ -0,0 +1,16 @@
+import pipeline
+
+
+def test_code_inputs_follow_imports():
+    code = pipeline.code_inputs(pipeline.STAGES["penalties"])
+    assert {"illegal_penalties_workflow.py", "ch_bulk.py", "lazy_modules.py",
+            "profiling.py", "table_export.py"} <= set(code)
+    assert "table_export.py" in pipeline.code_inputs(pipeline.STAGES["extract_table1"])
+    assert "soc2020/soc_index.py" in pipeline.code_inputs(pipeline.STAGES["occupation_db"])
+
+
+def test_network_stages_are_opt_in(capsys):
+    assert pipeline.main(["--dry-run"]) == 0
+    assert not {"scrape", "penalties"} & set(capsys.readouterr().out.split())
+    pipeline.main(["--dry-run", "--online"])
+    assert {"scrape", "penalties"} <= set(capsys.readouterr().out.split())
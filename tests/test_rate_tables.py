@@ -0,0 +1,16 @@
+import pandas as pd
+
+import rate_diff
+import rate_tables
+import rate_validator
+
+
+def test_normalise_without_known_sheets():
+    # hc997_pipeline validates before it skips an extraction that found nothing
+    tables = {"Table 1": pd.DataFrame(), "Contents": pd.DataFrame({"x": [1]})}
+    t = rate_tables.normalise(tables)
+    assert t.empty
+    assert list(t.columns) == rate_tables.COLUMNS
+    assert t["unitGroup"].dtype == "Int64"
+    assert rate_validator.validate_tables(tables).empty
+    assert rate_diff.diff_tables(tables, {}).empty
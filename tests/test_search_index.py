@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pytest
+
+import search_index
+
+RECORDS = [
+    {"unitGroup": 2231, "groupTitle": "Nurses", "tasks": ["Provides nursing care", "Assesses patients"]},
+    {"unitGroup": 2232, "groupTitle": "Specialist nurses", "tasks": ["Nursing in theatres"]},
+    {"unitGroup": 6131, "groupTitle": "Nursing auxiliaries and assistants", "tasks": ["Helps nurses"]},
+    {"unitGroup": 5113, "groupTitle": "Horticultural trades", "relatedJobTitles": ["Nurseryman"],
+     "tasks": ["Grows plants in a nursery"]},
+    {"unitGroup": 2136, "groupTitle": "Programmers and software development professionals",
+     "tasks": ["Writes software"]},
+    {"unitGroup": 5431, "groupTitle": "Butchers", "tasks": ["Cuts meat"]},
+]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "soc2020.ndjson"
+    path.write_text("".join(json.dumps(r) + "\n" for r in RECORDS), encoding="utf-8")
+    return path
+
+
+def test_search(snapshot, tmp_path):
+    idx = search_index.build_index(snapshot, tmp_path / "index.npz")
+    assert idx.search("software")[0][:2] == (2136, "Programmers and software development professionals")
+    assert idx.search("butchers meat", k=1)[0][0] == 5431
+    assert idx.search("astronaut") == []
+    assert [ug for ug, _, _ in idx.search("software", prefix=True)] == [2136]
+
+
+def test_prefix_scores_expansions_as_one_term(snapshot, tmp_path):
+    idx = search_index.build_index(snapshot, tmp_path / "index.npz")
+    ranked = [ug for ug, _, _ in idx.search("nurs*")]
+    assert sorted(ranked[:3]) == [2231, 2232, 6131] and ranked[3] == 5113
+    # a prefix with one expansion scores like the term itself
+    np.testing.assert_allclose(idx.scores_for("butch*"), idx.scores_for("butchers"), rtol=1e-6)
+
+
+def test_load_round_trip(snapshot, tmp_path):
+    built = search_index.build_index(snapshot, tmp_path / "index.npz")
+    loaded = search_index.SearchIndex.load(tmp_path / "index.npz")
+    for name in search_index.SearchIndex.ARRAYS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(built, name))
+    assert loaded.source == search_index.file_hash(snapshot)
+    assert loaded.search("nurs*") == built.search("nurs*")
+
+
+def test_rebuilt_when_snapshot_changes(snapshot, tmp_path):
+    path = tmp_path / "index.npz"
+    search_index.load_index(snapshot, path)
+    assert search_index.load_index(snapshot, path).search("welder") == []
+
+    with open(snapshot, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"unitGroup": 5215, "groupTitle": "Welding trades", "relatedJobTitles": ["Welder"]}) + "\n")
+    assert search_index.load_index(snapshot, path).search("welder")[0][0] == 5215
+    assert search_index.SearchIndex.load(path).source == search_index.file_hash(snapshot)
+
+
+def test_rebuilt_when_index_predates_an_array(snapshot, tmp_path):
+    path = tmp_path / "index.npz"
+    idx = search_index.build_index(snapshot, path)
+    with open(path, "wb") as fh:
+        np.savez(fh, source=np.array(idx.source), vocab=idx.vocab, offsets=idx.offsets, docs=idx.docs)
+    assert search_index.load_index(snapshot, path).search("nurs*") == idx.search("nurs*")
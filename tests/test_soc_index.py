@@ -0,0 +1,57 @@
+import json
+
+import pandas as pd
+import pytest
+
+import soc_index
+
+
+def unit(code, title, eligible):
+    code = int(code)
+    return {"unitGroup": code, "groupTitle": title, "eligibleForSkilledWorker": eligible,
+            "majorGroup": code // 1000, "majorGroupTitle": f"Major {code // 1000}",
+            "subMajorGroup": code // 100, "subMajorGroupTitle": f"Sub-major {code // 100}",
+            "minorGroup": code // 10, "minorGroupTitle": f"Minor {code // 10}"}
+
+
+UNITS = pd.DataFrame([
+    unit(2134, "Programmers", True),
+    unit(2136, "Software developers", True),
+    unit(2137, "Web designers", False),
+    unit(2211, "Doctors", True),
+    unit(5431, "Butchers", False),
+])
+
+
+@pytest.fixture
+def index(tmp_path):
+    table1 = [{"unitGroup": 2134, "rateADAmount": 40000.0},
+              {"unitGroup": 2136, "rateADAmount": 50000.0},
+              {"unitGroup": 2137, "rateADAmount": 30000.0},
+              {"unitGroup": 2137, "rateADAmount": 99000.0},  # listed twice: the first row counts
+              {"unitGroup": 2211, "rateADAmount": 70000.0}]
+    table2 = [{"unitGroup": 2136, "rateFIAmount": 45000.0}]
+    paths = [tmp_path / "table1.json", tmp_path / "table2.json"]
+    for path, records in zip(paths, (table1, table2)):
+        path.write_text(json.dumps(records), encoding="utf-8")
+    return soc_index.SocIndex(UNITS, soc_index.load_rates(paths))
+
+
+def test_rollup_median(index):
+    r = index.rollup_of(213)
+    assert r["unitGroups"] == 3 and r["eligibleUnitGroups"] == 2
+    assert r["rateADAmount_median"] == 40000.0
+    assert r["rateADAmount_max"] == 50000.0
+    assert r["rateFIAmount_count"] == 1
+
+    r = index.rollup_of(2)
+    assert r["rateADAmount_median"] == 45000.0 and r["rateADAmount_count"] == 4
+    assert pd.isna(index.rollup_of(5)["rateADAmount_median"])
+
+
+def test_hierarchy(index):
+    assert index.parent_of(2136) == 213 and index.ancestors(2136) == [2, 21, 213]
+    assert list(index.children(2)) == [21, 22] and list(index.children(21)) == [213]
+    assert list(index.descendants(2, "minor")) == [213, 221]
+    assert 9999 not in index and 2136 in index
+    assert list(index.units_under(213)["groupTitle"]) == ["Programmers", "Software developers", "Web designers"]
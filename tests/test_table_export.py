@@ -0,0 +1,16 @@
+import importlib
+
+import pandas as pd
+
+import table_export
+
+
+def test_export_formats_only_adds(monkeypatch, tmp_path):
+    monkeypatch.setenv("EXPORT_FORMATS", "parquet")
+    te = importlib.reload(table_export)
+    try:
+        written = te.export({"Table 1": pd.DataFrame({"code": ["1111"]})}, tmp_path / "t1.xlsx")
+        assert sorted(p.name for p in written) == ["t1.parquet", "t1.xlsx"]
+    finally:
+        monkeypatch.delenv("EXPORT_FORMATS")
+        importlib.reload(table_export)
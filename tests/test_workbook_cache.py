@@ -0,0 +1,43 @@
+import warnings
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import workbook_cache
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(workbook_cache, "CACHE_DIRNAME", str(tmp_path / "cache"))
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as xl:
+        pd.DataFrame({"code": ["1111", "2134"], 2024: [1.5, 2.5], "note": ["a", None]}).to_excel(
+            xl, sheet_name="Rates", index=False)
+        pd.DataFrame([[1, "x", 3]], columns=["a", "b", "c"]).to_excel(xl, sheet_name="Plain", index=False)
+    return path
+
+
+@pytest.mark.parametrize("dtype", [None, str])
+def test_cached_read_equals_read_excel(workbook, dtype):
+    expected = pd.read_excel(workbook, sheet_name=["Rates", "Plain"], dtype=dtype)
+    miss = workbook_cache.read_sheets(workbook, ["Rates", "Plain"], dtype=dtype)
+    hit = workbook_cache.read_sheets(workbook, ["Rates", "Plain"], dtype=dtype)
+    assert len(list((workbook.parent / "cache").glob("*.feather"))) == 2
+    for sheet in expected:
+        pdt.assert_frame_equal(miss[sheet], expected[sheet])
+        pdt.assert_frame_equal(hit[sheet], expected[sheet])
+    assert list(hit["Rates"].columns) == ["code", 2024, "note"]
+
+
+def test_unrepresentable_sheets_are_not_cached(tmp_path):
+    dupes = pd.DataFrame([[1, 2]], columns=["a", "a"])
+    with pytest.warns(UserWarning, match="not caching"):
+        workbook_cache._store(dupes, tmp_path / "dupes.feather")
+    with pytest.warns(UserWarning, match="not caching"):
+        workbook_cache._store(pd.DataFrame({"x": [1, "a"]}), tmp_path / "mixed.feather")
+    assert not list(tmp_path.glob("*.feather"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        workbook_cache._store(pd.DataFrame({"x": [1]}), tmp_path / "ok.feather")
+    assert workbook_cache._load(tmp_path / "ok.feather")["x"].tolist() == [1]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+workbook_cache.py
+–––––––––––––––––
+Columnar snapshots of Excel sheets, so each workbook is parsed by
+openpyxl once per content change instead of once per run.
+
+    <workbook dir>/.workbook_cache/
+      <workbook>.<sha256[:16]>.<sheet>.<opts>.feather   one uncompressed Arrow file per sheet
+
+• The cache key is the workbook's content hash + sheet + read options, so
+  an edited or replaced workbook is re-read and stale entries are simply
+  never hit again (prune() removes them).
+• On a miss every missing sheet is read in a single pd.read_excel call,
+  i.e. one openpyxl parse of the workbook.
+• Hits are read memory-mapped from uncompressed Feather (Arrow IPC).
+• The original column labels (e.g. a 2024 header read as int) are kept
+  in the file's metadata and restored on a hit, so a cached read equals
+  pd.read_excel.
+• Sheets that Arrow can't represent (mixed-type object columns,
+  duplicate or non-scalar labels) are returned uncached with a warning
+  rather than coerced.
+
+Usage
+-----
+    from workbook_cache import read_sheets
+    desc, fw = read_sheets(SOC_FILE, ["SOC2020 descriptions", "SOC2020 Framework"], dtype=str).values()
+
+    python workbook_cache.py soc2020/*.xlsx HC997/*.xlsx   # warm + time
+    python workbook_cache.py --prune HC997/*.xlsx
+"""
+
+from __future__ import annotations
+
+import argparse, glob, hashlib, html, json, os, re, sys, time, warnings, zipfile
+from pathlib import Path
+
+from lazy_modules import lazy_import
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+
+
+CACHE_DIRNAME = os.environ.get("WORKBOOK_CACHE_DIR", ".workbook_cache")
+DISABLED = os.environ.get("WORKBOOK_CACHE", "1") == "0"
+LABELS_KEY = b"workbook_cache.columns"  # JSON list of the original column labels
+
+
+def file_hash(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _feather():
+    import pyarrow.feather as feather  # submodule: imported on first use, like pa
+    return feather
+
+
+def _cache_dir(path: Path) -> Path:
+    d = Path(CACHE_DIRNAME)
+    return d if d.is_absolute() else path.parent / d
+
+
+def _entry(path: Path, digest: str, sheet, dtype) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", str(sheet))
+    opts = "str" if dtype is str else "raw"
+    return _cache_dir(path) / f"{path.stem}.{digest[:16]}.{safe}.{opts}.feather"
+
+
+# ------------------------------------------------------------------
+# 1. Read
+# ------------------------------------------------------------------
+def sheet_names(path: str | Path) -> list[str]:
+    """Sheet names from xl/workbook.xml, without loading the workbook."""
+    with zipfile.ZipFile(path) as zf:
+        xml = zf.read("xl/workbook.xml").decode("utf-8")
+    return [html.unescape(n) for n in re.findall(r'<(?:\w+:)?sheet\b[^>]*?\bname="([^"]*)"', xml)]
+
+
+def read_sheets(path: str | Path, sheets: list, dtype=None) -> dict:
+    """
+    {sheet: DataFrame} for `sheets` (names or 0-based positions), in the
+    order asked, served from the cache where possible.
+    """
+    path = Path(path)
+    if DISABLED:
+        return pd.read_excel(path, sheet_name=list(sheets), dtype=dtype)
+
+    digest = file_hash(path)
+    out, missing = {}, []
+    for sheet in sheets:
+        entry = _entry(path, digest, sheet, dtype)
+        df = _load(entry) if entry.exists() else None
+        if df is None:
+            missing.append(sheet)
+        else:
+            out[sheet] = df
+
+    if missing:
+        fresh = pd.read_excel(path, sheet_name=missing, dtype=dtype)
+        _cache_dir(path).mkdir(exist_ok=True)
+        for sheet, df in fresh.items():
+            _store(df, _entry(path, digest, sheet, dtype))
+            out[sheet] = df
+    return {sheet: out[sheet] for sheet in sheets}
+
+
+def read_sheet(path: str | Path, sheet=0, dtype=None) -> pd.DataFrame:
+    return read_sheets(path, [sheet], dtype=dtype)[sheet]
+
+
+def _load(entry: Path) -> pd.DataFrame | None:
+    """A cached sheet with its original labels; None for entries written without them."""
+    table = _feather().read_table(entry, memory_map=True)
+    labels = (table.schema.metadata or {}).get(LABELS_KEY)
+    if labels is None:
+        return None
+    return table.to_pandas().set_axis(json.loads(labels), axis=1)
+
+
+def _store(df: pd.DataFrame, entry: Path) -> None:
+    labels = list(df.columns)
+    try:
+        if not all(isinstance(c, (str, int, float)) for c in labels):
+            raise ValueError(f"column labels {labels!r} don't round-trip")
+        table = pa.Table.from_pandas(df, preserve_index=False)  # duplicate labels: ValueError
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), LABELS_KEY: json.dumps(labels)})
+    except (ValueError, TypeError) as e:  # ArrowInvalid / ArrowTypeError are among these
+        warnings.warn(f"not caching {entry.name}: {e}")
+        return
+    tmp = entry.with_name("_tmp-" + entry.name)
+    _feather().write_feather(table, tmp, compression="uncompressed")
+    tmp.replace(entry)
+
+
+# ------------------------------------------------------------------
+# 2. Housekeeping
+# ------------------------------------------------------------------
+def prune(path: str | Path) -> int:
+    """Delete cache entries for older versions of `path`; returns count."""
+    path = Path(path)
+    current = f"{path.stem}.{file_hash(path)[:16]}."
+    removed = 0
+    for entry in _cache_dir(path).glob(f"{glob.escape(path.stem)}.*.feather"):
+        if not entry.name.startswith(current):
+            entry.unlink()
+            removed += 1
+    return removed
+
+
+# ------------------------------------------------------------------
+# 3. CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Columnar snapshots of Excel sheets (parse once per content change)")
+    ap.add_argument("workbooks", nargs="+")
+    ap.add_argument("--str", action="store_true", help="cache with dtype=str (as getdata.py reads)")
+    ap.add_argument("--prune", action="store_true", help="drop entries for older versions")
+    args = ap.parse_args(argv)
+
+    for wb in args.workbooks:
+        if args.prune:
+            print(f"{wb}: removed {prune(wb)} stale entries")
+            continue
+        sheets = sheet_names(wb)
+        dtype = str if args.str else None
+        for label in ("cold/warm", "cached"):
+            t0 = time.perf_counter()
+            frames = read_sheets(wb, sheets, dtype=dtype)
+            dt = time.perf_counter() - t0
+            rows = sum(len(df) for df in frames.values())
+            print(f"{wb}: {len(sheets)} sheets, {rows:,} rows – {label} {dt * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())